@@ -0,0 +1,16 @@
+"""Endpoint benchmarks for the RD Motors API.
+
+The suite builds the app with ``create_app`` on a seeded SQLite database in a
+scratch directory and times every route through the Flask test client, so it
+measures the application (routing, auth, ORM, serialization, photo I/O)
+without network noise.
+
+Usage::
+
+    python -m benchmarks run --scale small --iterations 200 --output results.json
+    python -m benchmarks run --save-baseline main            # benchmarks/baselines/main.json
+    python -m benchmarks run --compare main --threshold 0.2  # exit 1 on regressions
+    python -m benchmarks compare baseline.json results.json
+
+Baselines are machine specific: record and compare them on the same host.
+"""
@@ -0,0 +1,107 @@
+"""Command line entry point: ``python -m benchmarks run|compare``."""
+import argparse
+import logging
+import sys
+import tempfile
+
+from benchmarks.cases import select_cases
+from benchmarks.harness import (
+    GALLERIES,
+    baseline_path,
+    compare_results,
+    create_benchmark_app,
+    load_results,
+    print_rows,
+    run_suite,
+    save_results,
+    seed_database,
+)
+
+
+def _report(rows, metric: str) -> int:
+    print_rows(rows, metric)
+    regressions = [row for row in rows if row["status"] == "regression"]
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond the threshold")
+        return 1
+    return 0
+
+
+def cmd_run(args) -> int:
+    cases = select_cases(args.only)
+    if not cases:
+        print("No benchmark case matches --only")
+        return 2
+    with tempfile.TemporaryDirectory(prefix="rdmotors-bench-") as workdir:
+        app = create_benchmark_app(workdir)
+        print(f"Seeding '{args.scale}' dataset...")
+        data = seed_database(app, args.scale, seed=args.seed)
+
+        def progress(name, result):
+            errors = f"  ERRORS: {result['errors'][0]}" if result["errors"] else ""
+            print(f"{name:<32} p50 {result['p50_ms']:>9.3f} ms  p95 {result['p95_ms']:>9.3f} ms  "
+                  f"{result['throughput_rps'] or 0:>9.1f} req/s{errors}")
+
+        results = run_suite(app, cases, data, args.iterations, warmup=args.warmup,
+                            concurrency=args.concurrency, scale=args.scale, progress=progress)
+
+    if args.output:
+        save_results(results, args.output)
+    if args.save_baseline:
+        save_results(results, baseline_path(args.save_baseline))
+        print(f"Baseline saved to {baseline_path(args.save_baseline)}")
+
+    status = 1 if any(result["errors"] for result in results["results"].values()) else 0
+    if args.compare:
+        baseline = load_results(baseline_path(args.compare))
+        rows = compare_results(baseline, results, args.threshold, args.metric, args.min_delta_ms)
+        status = max(status, _report(rows, args.metric))
+    return status
+
+
+def cmd_compare(args) -> int:
+    rows = compare_results(load_results(baseline_path(args.baseline)), load_results(baseline_path(args.current)),
+                           args.threshold, args.metric, args.min_delta_ms)
+    return _report(rows, args.metric)
+
+
+def _add_compare_options(parser) -> None:
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Relative slowdown that counts as a regression (default 0.2 = 20%%)")
+    parser.add_argument("--metric", default="p50_ms",
+                        choices=["mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms"])
+    parser.add_argument("--min-delta-ms", type=float, default=0.5,
+                        help="Ignore absolute changes smaller than this (default 0.5 ms)")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="RD Motors API endpoint benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Seed a scratch database and time every route")
+    run.add_argument("--scale", choices=list(GALLERIES), default="small",
+                     help="Data scale of rdmotorsAPI.datagen")
+    run.add_argument("--seed", type=int, default=42)
+    run.add_argument("--iterations", type=int, default=100)
+    run.add_argument("--warmup", type=int, default=5)
+    run.add_argument("--concurrency", type=int, default=1, help="Threads issuing requests at once")
+    run.add_argument("--only", action="append", help="Run cases whose name contains this (repeatable)")
+    run.add_argument("--output", help="Write results JSON to this file")
+    run.add_argument("--save-baseline", metavar="NAME", help="Save results as benchmarks/baselines/NAME.json")
+    run.add_argument("--compare", metavar="BASELINE", help="Baseline name or JSON file to compare against")
+    _add_compare_options(run)
+    run.set_defaults(func=cmd_run)
+
+    compare = commands.add_parser("compare", help="Compare two results files")
+    compare.add_argument("baseline")
+    compare.add_argument("current")
+    _add_compare_options(compare)
+    compare.set_defaults(func=cmd_compare)
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
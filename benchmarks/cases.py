@@ -0,0 +1,102 @@
+"""Benchmark cases: one per blueprint route and operation.
+
+Cases pick seeded rows round-robin by iteration so detail and update requests
+do not hit the same row every time. Write cases create rows with unique keys
+per iteration (VINs, emails) and never delete, so reruns on the same app keep
+growing the tables a little; the seeded counts dominate at every scale.
+"""
+import io
+from typing import List, Optional
+
+from benchmarks.harness import BenchmarkCase, make_photo_zip
+
+RUN_TAG = "BENCH"
+
+
+def _new_vin(iteration: int) -> str:
+    return f"{RUN_TAG}{iteration:012d}"
+
+
+def _services() -> List[BenchmarkCase]:
+    return [
+        BenchmarkCase("services.list", "GET", "/services"),
+        BenchmarkCase("services.detail", "GET", lambda d, i: f"/services/{d.pick('service_ids', i)}"),
+        BenchmarkCase("services.create", "POST", "/services", expect=(201,), body=lambda d, i: {
+            "name": f"Bench service {i}", "descr": "Benchmark", "price": 100, "currency": "USD",
+            "photo_filename": "bench.jpg",
+        }),
+        BenchmarkCase("services.update", "PUT", lambda d, i: f"/services/{d.pick('service_ids', i)}",
+                      body=lambda d, i: {"price": 100 + i % 50}),
+    ]
+
+
+def _locations() -> List[BenchmarkCase]:
+    return [
+        BenchmarkCase("locations.list", "GET", "/locations"),
+        BenchmarkCase("locations.detail", "GET", lambda d, i: f"/locations/id/{d.pick('location_ids', i)}"),
+    ]
+
+
+def _autousa() -> List[BenchmarkCase]:
+    return [
+        BenchmarkCase("autousa.list", "GET", "/autousa?per_page=50"),
+        BenchmarkCase("autousa.list_deep_page", "GET",
+                      lambda d, i: f"/autousa?per_page=50&page={max(1, d.autos_total // 50)}"),
+        BenchmarkCase("autousa.detail_by_id", "GET", lambda d, i: f"/autousa/id/{d.pick('auto_ids', i)}"),
+        BenchmarkCase("autousa.detail_by_vin", "GET", lambda d, i: f"/autousa/vin/{d.pick('vins', i)}"),
+        BenchmarkCase("autousa.create", "POST", "/autousa", expect=(201,), body=lambda d, i: {
+            "vin": _new_vin(i), "container_number": "BENC1234567", "mark": "Ford", "model": "Focus",
+            "loc_now_id": d.pick("location_ids", i),
+        }),
+        # Moving the car writes a history row, like the yard updates in production
+        BenchmarkCase("autousa.upsert_by_vin", "PUT", lambda d, i: f"/autousa/vin/{d.pick('vins', i)}",
+                      body=lambda d, i: {"loc_now_id": d.pick("location_ids", i + 1),
+                                         "container_number": f"MSCU{i:07d}"}),
+        BenchmarkCase("autousa.history", "GET", lambda d, i: f"/autousa/vin/{d.pick('vins', i)}/history"),
+        BenchmarkCase("autousa.photos", "GET", lambda d, i: f"/autousa/{d.pick('gallery_vins', i)}/photos"),
+        BenchmarkCase("autousa.photos_batch", "GET",
+                      lambda d, i: "/autousa/photos?vins=" + ",".join(d.gallery_vins[:50])),
+        BenchmarkCase("autousa.upload", "POST", lambda d, i: f"/autousa/{d.pick('gallery_vins', i)}/upload",
+                      multipart=True, expect=(201,), body=lambda d, i: {
+                          "file": (io.BytesIO(make_photo_zip(d.photos_per_gallery, seed=i)), "photos.zip"),
+                      }),
+    ]
+
+
+def _cars() -> List[BenchmarkCase]:
+    return [
+        BenchmarkCase("cars.list", "GET", "/cars"),
+        BenchmarkCase("cars.detail", "GET", lambda d, i: f"/cars/{d.pick('car_ids', i)}"),
+        BenchmarkCase("cars.create", "POST", "/cars", expect=(201,), body=lambda d, i: {
+            "mark": "Mazda", "model": "6", "year": 2020, "addi": "", "transmission": "Manual",
+            "mileage": 1000 * i, "fuel_type": "Petrol", "price": 20000, "discount": 0, "quality": 4,
+            "engine": "2.0", "photo_url": "bench.jpg",
+        }),
+        BenchmarkCase("cars.update", "PUT", lambda d, i: f"/cars/{d.pick('car_ids', i)}",
+                      body=lambda d, i: {"price": 15000 + i % 100}),
+    ]
+
+
+def _clients() -> List[BenchmarkCase]:
+    return [
+        BenchmarkCase("clients.list", "GET", "/clients"),
+        BenchmarkCase("clients.detail", "GET", lambda d, i: f"/clients/{d.pick('client_ids', i)}"),
+        BenchmarkCase("clients.create", "POST", "/clients", expect=(201,), body=lambda d, i: {
+            "login": f"bench{i}", "email": f"bench-{RUN_TAG.lower()}-{i}@example.com",
+            "number": "+380500000000", "status": "active",
+        }),
+        BenchmarkCase("clients.update", "PUT", lambda d, i: f"/clients/{d.pick('client_ids', i)}",
+                      body=lambda d, i: {"status": "active" if i % 2 else "vip"}),
+    ]
+
+
+def all_cases() -> List[BenchmarkCase]:
+    return _services() + _locations() + _autousa() + _cars() + _clients()
+
+
+def select_cases(patterns: Optional[List[str]] = None) -> List[BenchmarkCase]:
+    """Cases whose name contains any of the patterns (all cases without patterns)."""
+    cases = all_cases()
+    if not patterns:
+        return cases
+    return [case for case in cases if any(pattern in case.name for pattern in patterns)]
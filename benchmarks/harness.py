@@ -0,0 +1,283 @@
+"""Benchmark app, seeding, timing and baseline comparison."""
+from __future__ import annotations
+
+import datetime
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Union
+from zipfile import ZipFile
+
+from rdmotorsAPI import create_app, db
+from rdmotorsAPI.config import Config
+from rdmotorsAPI.datagen import SCALES as DATA_SCALES
+from rdmotorsAPI.datagen import GenerationReport, generate_data, generate_photo_folders, generated_vins, make_png
+from rdmotorsAPI.models import AutoUsa
+
+API_KEY = "benchmark-api-key"
+AUTH = {"Authorization": f"Bearer {API_KEY}"}
+BASELINES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+# Photo galleries written per data scale: (galleries, photos per gallery)
+GALLERIES = {"tiny": (3, 4), "small": (20, 12), "medium": (100, 24), "large": (500, 24)}
+SAMPLE_SIZE = 1000
+
+
+def make_benchmark_config(workdir: str):
+    """Config class for a benchmark app storing everything under workdir."""
+
+    class BenchmarkConfig(Config):
+        TESTING = True
+        SQLALCHEMY_DATABASE_URI = "sqlite:///" + os.path.join(workdir, "benchmark.db")
+        SQLALCHEMY_ENGINE_OPTIONS = {}
+        API_KEY = globals()["API_KEY"]
+        ENABLE_API_DOCS = False
+        RATELIMIT_ENABLED = False
+        RATELIMIT_STORAGE_URI = "memory://"
+        STATIC_FOLDER = os.path.join(workdir, "static")
+        STATIC_MANIFEST_CHECK_INTERVAL = 0
+        PHOTOS_AUTO_DIR = os.path.join(workdir, "photos", "autousa")
+        PHOTOS_STAGING_DIR = os.path.join(workdir, "staging")
+        PHOTOS_BLOB_DIR = os.path.join(workdir, "blobs")
+        PHOTO_DERIVATIVE_WORKERS = 0
+        PHOTO_JOB_RUNNER = "inline"
+        PHOTO_RECONCILE_INTERVAL = 0
+
+    return BenchmarkConfig
+
+
+def make_photo_zip(count: int, seed: int = 0) -> bytes:
+    buffer = io.BytesIO()
+    with ZipFile(buffer, "w") as zf:
+        for index in range(count):
+            zf.writestr(f"{index:03d}.png", make_png(seed=seed * 1000 + index))
+    return buffer.getvalue()
+
+
+@dataclass
+class SeedData:
+    """Samples of the seeded rows, picked round-robin by the cases."""
+    location_ids: List[int] = field(default_factory=list)
+    auto_ids: List[int] = field(default_factory=list)
+    vins: List[str] = field(default_factory=list)
+    gallery_vins: List[str] = field(default_factory=list)
+    service_ids: List[int] = field(default_factory=list)
+    car_ids: List[int] = field(default_factory=list)
+    client_ids: List[int] = field(default_factory=list)
+    autos_total: int = 0
+    photos_per_gallery: int = 0
+
+    def pick(self, name: str, iteration: int):
+        values = getattr(self, name)
+        return values[iteration % len(values)]
+
+
+def _sample_ids(report: GenerationReport, table: str) -> List[int]:
+    """Up to SAMPLE_SIZE IDs spread evenly over the generated range."""
+    first, last = report.id_ranges[table]
+    step = max(1, (last - first + 1) // SAMPLE_SIZE)
+    return list(range(first, last + 1, step))[:SAMPLE_SIZE]
+
+
+def seed_database(app, scale: str = "small", seed: int = 42) -> SeedData:
+    """Recreate the schema, generate a synthetic dataset (rdmotorsAPI.datagen) and its photo galleries."""
+    galleries, photos = GALLERIES[scale]
+    data = SeedData(photos_per_gallery=photos)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        report = generate_data(DATA_SCALES[scale], seed=seed)
+        data.autos_total = report.rows["autousa"]
+        data.location_ids = _sample_ids(report, "locations")
+        data.auto_ids = _sample_ids(report, "autousa")
+        data.vins = list(db.session.execute(
+            db.select(AutoUsa.vin).where(AutoUsa.id.in_(data.auto_ids)).order_by(AutoUsa.id)
+        ).scalars())
+        data.service_ids = _sample_ids(report, "services")
+        data.car_ids = _sample_ids(report, "cars")
+        data.client_ids = _sample_ids(report, "clients")
+        data.gallery_vins = generated_vins(report, galleries)
+        generate_photo_folders(data.gallery_vins, photos, seed=seed)
+    return data
+
+
+@dataclass
+class BenchmarkCase:
+    """One timed request; path and body may depend on the seed data and the iteration number."""
+    name: str
+    method: str
+    path: Union[str, Callable[[SeedData, int], str]]
+    body: Optional[Callable[[SeedData, int], Any]] = None
+    multipart: bool = False
+    expect: tuple = (200,)
+
+    def request_args(self, data: SeedData, iteration: int) -> Dict[str, Any]:
+        path = self.path(data, iteration) if callable(self.path) else self.path
+        kwargs: Dict[str, Any] = {"method": self.method, "path": path, "headers": AUTH}
+        if self.body is not None:
+            body = self.body(data, iteration)
+            if self.multipart:
+                kwargs.update(data=body, content_type="multipart/form-data")
+            else:
+                kwargs["json"] = body
+        return kwargs
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+def run_case(app, case: BenchmarkCase, data: SeedData, iterations: int, warmup: int = 5,
+             concurrency: int = 1) -> Dict[str, Any]:
+    """Time iterations requests of one case and summarize the latencies."""
+    client = app.test_client()
+    errors: List[str] = []
+
+    def timed_request(iteration: int) -> float:
+        kwargs = case.request_args(data, iteration)
+        started = time.perf_counter()
+        response = client.open(**kwargs)
+        response.get_data()
+        elapsed = time.perf_counter() - started
+        if response.status_code not in case.expect and len(errors) < 5:
+            errors.append(f"{response.status_code}: {response.get_data(as_text=True)[:200]}")
+        return elapsed
+
+    for iteration in range(warmup):
+        timed_request(iteration)
+    errors.clear()
+
+    started = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(concurrency) as pool:
+            latencies = list(pool.map(timed_request, range(warmup, warmup + iterations)))
+    else:
+        latencies = [timed_request(iteration) for iteration in range(warmup, warmup + iterations)]
+    wall = time.perf_counter() - started
+
+    latencies_ms = sorted(latency * 1000 for latency in latencies)
+    kwargs = case.request_args(data, 0)
+    return {
+        "method": kwargs["method"],
+        "path": kwargs["path"],
+        "iterations": iterations,
+        "concurrency": concurrency,
+        "errors": errors,
+        "mean_ms": round(sum(latencies_ms) / len(latencies_ms), 3),
+        "min_ms": round(latencies_ms[0], 3),
+        "p50_ms": round(_percentile(latencies_ms, 0.50), 3),
+        "p95_ms": round(_percentile(latencies_ms, 0.95), 3),
+        "p99_ms": round(_percentile(latencies_ms, 0.99), 3),
+        "max_ms": round(latencies_ms[-1], 3),
+        "throughput_rps": round(iterations / wall, 1) if wall > 0 else None,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(BASELINES_DIR)).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(app, cases: List[BenchmarkCase], data: SeedData, iterations: int, warmup: int = 5,
+              concurrency: int = 1, scale: str = "", progress: Optional[Callable[[str, Dict], None]] = None
+              ) -> Dict[str, Any]:
+    """Run every case and return the results document (the baseline format)."""
+    results = {}
+    for case in cases:
+        results[case.name] = run_case(app, case, data, iterations, warmup, concurrency)
+        if progress is not None:
+            progress(case.name, results[case.name])
+    return {
+        "meta": {
+            "created": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "scale": scale,
+            "iterations": iterations,
+            "concurrency": concurrency,
+        },
+        "results": results,
+    }
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = 0.2,
+                    metric: str = "p50_ms", min_delta_ms: float = 0.5) -> List[Dict[str, Any]]:
+    """
+    Compare two results documents case by case.
+
+    A case regresses when its metric grew by more than threshold (a fraction)
+    and by more than min_delta_ms, which keeps sub-millisecond noise out.
+
+    Returns:
+        One row per case with baseline, current, change and status
+        ("regression", "improvement", "ok", "new" or "missing")
+    """
+    rows = []
+    base_results, current_results = baseline["results"], current["results"]
+    for name in sorted(set(base_results) | set(current_results)):
+        if name not in current_results:
+            rows.append({"case": name, "status": "missing"})
+            continue
+        if name not in base_results:
+            rows.append({"case": name, "status": "new", "current": current_results[name][metric]})
+            continue
+        before, after = base_results[name][metric], current_results[name][metric]
+        change = (after - before) / before if before else 0.0
+        status = "ok"
+        if change > threshold and after - before > min_delta_ms:
+            status = "regression"
+        elif change < -threshold and before - after > min_delta_ms:
+            status = "improvement"
+        rows.append({"case": name, "status": status, "baseline": before, "current": after,
+                     "change": round(change, 4)})
+    return rows
+
+
+def baseline_path(name: str) -> str:
+    """Path of a named baseline, or name itself when it is a path to a file."""
+    if name.endswith(".json") or os.sep in name:
+        return name
+    return os.path.join(BASELINES_DIR, f"{name}.json")
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_results(results: Dict[str, Any], path: str) -> None:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def create_benchmark_app(workdir: str):
+    """create_app on a scratch directory with an empty SPA index."""
+    config = make_benchmark_config(workdir)
+    os.makedirs(config.STATIC_FOLDER, exist_ok=True)
+    with open(os.path.join(config.STATIC_FOLDER, "index.html"), "w", encoding="utf-8") as f:
+        f.write("<!doctype html><html><body>benchmark</body></html>")
+    return create_app(config)
+
+
+def print_rows(rows: List[Dict[str, Any]], metric: str, out=sys.stdout) -> None:
+    for row in rows:
+        if "baseline" in row:
+            out.write(f"{row['status']:<12} {row['case']:<32} {row['baseline']:>10.3f} -> {row['current']:>10.3f} "
+                      f"{metric} ({row['change']:+.1%})\n")
+        else:
+            out.write(f"{row['status']:<12} {row['case']}\n")
@@ -5,14 +5,24 @@ from pathlib import Path
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
-from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from rdmotorsAPI.config import Config, get_missing_database_env_vars
+from rdmotorsAPI.file_serving import FILE_SERVE_MODES, FILE_SERVE_MODE_X_SENDFILE
+from rdmotorsAPI.static_manifest import init_static_manifest
+from rdmotorsAPI.compression import init_compression
+from rdmotorsAPI.server_timing import TimedLimiter, init_server_timing
+from rdmotorsAPI.logging_pipeline import init_request_ids
+from rdmotorsAPI.tracing import init_tracing
+from rdmotorsAPI.query_profiler import init_query_profiler
+from rdmotorsAPI.metrics import init_metrics, instrument_engine_options
+from rdmotorsAPI.profiler import init_profiler
+from rdmotorsAPI.memory import init_memory_diagnostics
+from rdmotorsAPI import ratelimit  # noqa: F401  (registers the sqlite:// limiter storage)
 
 # Initialize extensions
 db = SQLAlchemy()
 cors = CORS()
-limiter = Limiter(key_func=get_remote_address)
+limiter = TimedLimiter(key_func=get_remote_address)
 
 # Import models after db is created (models import db from here)
 from rdmotorsAPI import models  # noqa: E402, F401
@@ -51,11 +61,21 @@ def _prepare_app_config(app: Flask) -> None:
 
     if database_uri.startswith("sqlite"):
         app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {}
+    instrument_engine_options(app.config)
 
     photos_auto_dir = app.config.get("PHOTOS_AUTO_DIR")
     if photos_auto_dir:
         os.makedirs(photos_auto_dir, exist_ok=True)
 
+    file_serve_mode = (app.config.get("FILE_SERVE_MODE") or "direct").strip().lower()
+    if file_serve_mode not in FILE_SERVE_MODES:
+        raise RuntimeError(
+            f"Unsupported FILE_SERVE_MODE '{file_serve_mode}'. "
+            f"Use one of: {', '.join(sorted(FILE_SERVE_MODES))}"
+        )
+    app.config["FILE_SERVE_MODE"] = file_serve_mode
+    app.config["USE_X_SENDFILE"] = file_serve_mode == FILE_SERVE_MODE_X_SENDFILE
+
 
 def create_app(config_object=Config):
     """Application factory pattern"""
@@ -72,10 +92,19 @@ def create_app(config_object=Config):
         resources={r"/*": {"origins": app.config.get("CORS_ORIGINS", [])}},
         allow_headers=['Authorization', 'Content-Type', 'X-CSRF-Token'],
     )
+    init_server_timing(app)
+    init_request_ids(app)
+    init_tracing(app)
+    init_query_profiler(app)
+    init_metrics(app)
+    init_profiler(app)
+    init_memory_diagnostics(app)
     limiter.init_app(app)
+    init_static_manifest(app)
+    init_compression(app)
     
     # Register blueprints
-    from rdmotorsAPI.routes import services, autousa, cars, clients, locations, session
+    from rdmotorsAPI.routes import services, autousa, cars, clients, locations, session, admin
     app.register_blueprint(services.services_bp)
     app.register_blueprint(services.services_bp, url_prefix="/api", name="api_services")
     app.register_blueprint(autousa.autousa_bp)
@@ -87,6 +116,22 @@ def create_app(config_object=Config):
     app.register_blueprint(locations.locations_bp)
     app.register_blueprint(locations.locations_bp, url_prefix="/api", name="api_locations")
     app.register_blueprint(session.session_bp)
+    app.register_blueprint(admin.admin_bp)
+
+    from rdmotorsAPI.photos.storage import init_photo_storage
+    init_photo_storage(app)
+
+    from rdmotorsAPI.photos.jobs import init_photo_jobs
+    init_photo_jobs(app)
+
+    from rdmotorsAPI.photos.reconcile import init_photo_reconciler
+    init_photo_reconciler(app)
+
+    from rdmotorsAPI.photos.cli import photos_cli
+    app.cli.add_command(photos_cli)
+
+    from rdmotorsAPI.datagen import datagen_cli
+    app.cli.add_command(datagen_cli)
     
     # Register API documentation (optional - can be disabled in production)
     if app.config.get('ENABLE_API_DOCS', True):
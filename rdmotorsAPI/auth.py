@@ -10,6 +10,9 @@ from typing import Any, Dict, Optional
 from flask import current_app, g, jsonify, request
 
 from rdmotorsAPI.config import API_KEY
+from rdmotorsAPI.metrics import FIREBASE_VERIFY
+from rdmotorsAPI.server_timing import phase
+from rdmotorsAPI.tracing import span
 
 
 def _get_api_key() -> Optional[str]:
@@ -98,28 +101,33 @@ def _get_firebase_auth():
 def verify_firebase_id_token(id_token: str) -> Dict[str, Any]:
     """Verify Firebase ID token."""
     firebase_auth = _get_firebase_auth()
-    return firebase_auth.verify_id_token(id_token)
+    with FIREBASE_VERIFY.labels(kind="id_token").time(), span("firebase.verify_id_token"):
+        return firebase_auth.verify_id_token(id_token)
 
 
 def create_firebase_session_cookie(id_token: str, expires_in_seconds: int) -> str:
     """Create Firebase session cookie from ID token."""
     firebase_auth = _get_firebase_auth()
-    return firebase_auth.create_session_cookie(
-        id_token,
-        expires_in=timedelta(seconds=expires_in_seconds),
-    )
+    with span("firebase.create_session_cookie"):
+        return firebase_auth.create_session_cookie(
+            id_token,
+            expires_in=timedelta(seconds=expires_in_seconds),
+        )
 
 
 def verify_firebase_session_cookie(session_cookie: str, check_revoked: bool = True) -> Dict[str, Any]:
     """Verify Firebase session cookie."""
     firebase_auth = _get_firebase_auth()
-    return firebase_auth.verify_session_cookie(session_cookie, check_revoked=check_revoked)
+    with FIREBASE_VERIFY.labels(kind="session_cookie").time(), \
+            span("firebase.verify_session_cookie", check_revoked=check_revoked):
+        return firebase_auth.verify_session_cookie(session_cookie, check_revoked=check_revoked)
 
 
 def revoke_firebase_sessions(uid: str) -> None:
     """Revoke all refresh tokens for Firebase user."""
     firebase_auth = _get_firebase_auth()
-    firebase_auth.revoke_refresh_tokens(uid)
+    with span("firebase.revoke_refresh_tokens"):
+        firebase_auth.revoke_refresh_tokens(uid)
 
 
 def require_firebase_auth(f):
@@ -130,33 +138,44 @@ def require_firebase_auth(f):
     """
     @wraps(f)
     def decorated(*args, **kwargs):
-        if _is_valid_api_key_request():
-            g.auth_mode = "api_key"
-            g.firebase_user = None
-            g.user_uid = None
-            return f(*args, **kwargs)
-
-        session_cookie_name = current_app.config.get("SESSION_COOKIE_NAME", "__session")
-        session_cookie = request.cookies.get(session_cookie_name)
-        if not session_cookie:
-            logging.warning(
-                "Missing Firebase session cookie and API key for %s from %s",
-                request.path,
-                request.remote_addr,
-            )
-            return jsonify({"error": "Unauthorized", "message": "Missing session cookie or valid API key"}), 401
-
-        try:
-            decoded_claims = verify_firebase_session_cookie(session_cookie, check_revoked=True)
-            g.auth_mode = "firebase"
-            g.firebase_user = decoded_claims
-            g.user_uid = decoded_claims.get("uid")
-            return f(*args, **kwargs)
-        except RuntimeError as exc:
-            logging.error("Firebase auth unavailable on %s: %s", request.path, str(exc))
-            return jsonify({"error": "AuthUnavailable", "message": str(exc)}), 503
-        except Exception as exc:
-            logging.warning("Invalid Firebase session on %s: %s", request.path, str(exc))
-            return jsonify({"error": "Unauthorized", "message": "Invalid or expired session"}), 401
+        with phase("auth"), span("auth") as auth_span:
+            error_response = _authenticate_firebase_request()
+            if auth_span is not None:
+                auth_span.set_attribute("auth.mode", g.get("auth_mode"))
+        if error_response is not None:
+            return error_response
+        return f(*args, **kwargs)
 
     return decorated
+
+
+def _authenticate_firebase_request():
+    """Authenticate the current request into g; returns an error response when it is rejected."""
+    if _is_valid_api_key_request():
+        g.auth_mode = "api_key"
+        g.firebase_user = None
+        g.user_uid = None
+        return None
+
+    session_cookie_name = current_app.config.get("SESSION_COOKIE_NAME", "__session")
+    session_cookie = request.cookies.get(session_cookie_name)
+    if not session_cookie:
+        logging.warning(
+            "Missing Firebase session cookie and API key for %s from %s",
+            request.path,
+            request.remote_addr,
+        )
+        return jsonify({"error": "Unauthorized", "message": "Missing session cookie or valid API key"}), 401
+
+    try:
+        decoded_claims = verify_firebase_session_cookie(session_cookie, check_revoked=True)
+    except RuntimeError as exc:
+        logging.error("Firebase auth unavailable on %s: %s", request.path, str(exc))
+        return jsonify({"error": "AuthUnavailable", "message": str(exc)}), 503
+    except Exception as exc:
+        logging.warning("Invalid Firebase session on %s: %s", request.path, str(exc))
+        return jsonify({"error": "Unauthorized", "message": "Invalid or expired session"}), 401
+    g.auth_mode = "firebase"
+    g.firebase_user = decoded_claims
+    g.user_uid = decoded_claims.get("uid")
+    return None
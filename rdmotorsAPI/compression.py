@@ -0,0 +1,158 @@
+"""Negotiated gzip/brotli compression of API responses.
+
+Registered as an ``after_request`` hook by the app factory. Small bodies are left
+alone, streamed responses are compressed chunk by chunk, and compressed bytes of
+recently sent bodies are kept in a small LRU so identical payloads (the same page
+requested again) are not compressed twice.
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Iterable, Iterator, Optional
+
+from flask import request
+
+from rdmotorsAPI.metrics import record_cache
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+DEFAULT_COMPRESSION_MIMETYPES = (
+    "application/json",
+    "text/html",
+    "text/css",
+    "text/plain",
+    "text/csv",
+    "application/javascript",
+    "image/svg+xml",
+)
+
+
+class CompressedBodyCache:
+    """Thread-safe LRU of compressed bodies keyed by body digest and encoding."""
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 16 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[tuple, bytes]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple) -> Optional[bytes]:
+        with self._lock:
+            data = self._entries.get(key)
+            if data is None:
+                self.misses += 1
+                record_cache("compression", False)
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            record_cache("compression", True)
+            return data
+
+    def put(self, key: tuple, data: bytes) -> None:
+        if self.max_entries <= 0 or len(data) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = data
+            self._size += len(data)
+            while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+
+def _compress(body: bytes, encoding: str, level: int) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=min(level, 11))
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+
+def _stream_compress(chunks: Iterable[bytes], encoding: str, level: int) -> Iterator[bytes]:
+    """Compress an iterable of chunks incrementally."""
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=min(level, 11))
+        for chunk in chunks:
+            data = compressor.process(chunk)
+            if data:
+                yield data
+        yield compressor.finish()
+        return
+
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def _choose_encoding() -> Optional[str]:
+    accepted = request.accept_encodings
+    if brotli is not None and accepted["br"]:
+        return "br"
+    if accepted["gzip"]:
+        return "gzip"
+    return None
+
+
+def init_compression(app) -> None:
+    """Register response compression on the app."""
+    cache = CompressedBodyCache(
+        max_entries=app.config.get("COMPRESSION_CACHE_ENTRIES", 256),
+        max_bytes=app.config.get("COMPRESSION_CACHE_MAX_BYTES", 16 * 1024 * 1024),
+    )
+    app.extensions["compression_cache"] = cache
+
+    @app.after_request
+    def compress_response(response):
+        config = app.config
+        if not config.get("COMPRESSION_ENABLED", True):
+            return response
+        if (
+            response.status_code < 200
+            or response.status_code in (204, 206, 304)
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in config.get("COMPRESSION_MIMETYPES", DEFAULT_COMPRESSION_MIMETYPES)
+        ):
+            return response
+
+        response.vary.add("Accept-Encoding")
+        encoding = _choose_encoding()
+        if encoding is None:
+            return response
+        level = config.get("COMPRESSION_LEVEL", 6)
+
+        if response.is_streamed or response.direct_passthrough:
+            if not config.get("COMPRESSION_STREAMING", True) or response.direct_passthrough:
+                return response
+            response.response = _stream_compress(response.iter_encoded(), encoding, level)
+            response.headers.pop("Content-Length", None)
+            response.headers["Content-Encoding"] = encoding
+            return response
+
+        body = response.get_data()
+        if len(body) < config.get("COMPRESSION_MIN_SIZE", 1024):
+            return response
+
+        key = (hashlib.blake2b(body, digest_size=16).digest(), encoding, level)
+        compressed = cache.get(key)
+        if compressed is None:
+            compressed = _compress(body, encoding, level)
+            cache.put(key, compressed)
+
+        response.set_data(compressed)
+        response.headers["Content-Encoding"] = encoding
+        etag, weak = response.get_etag()
+        if etag:
+            response.set_etag(f"{etag}-{encoding}", weak=weak)
+        return response
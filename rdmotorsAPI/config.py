@@ -1,5 +1,6 @@
 """Configuration module for the API"""
 import os
+import tempfile
 from typing import Dict, List, Optional
 from dotenv import load_dotenv
 from urllib.parse import quote_plus
@@ -86,6 +87,144 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 PHOTOS_DIR = os.path.join(BASE_DIR, "static", "photos", "services")
 PHOTOS_AUTO_DIR = os.getenv("PHOTOS_AUTO_DIR", "/var/www/rdmotorsAPI/static/photos/autousa")
 
+# File delivery: "direct" streams through Flask, "x-sendfile" / "x-accel-redirect" offload to the proxy
+FILE_SERVE_MODE = os.getenv("FILE_SERVE_MODE", "direct").strip().lower()
+X_ACCEL_REDIRECT_PREFIX = os.getenv("X_ACCEL_REDIRECT_PREFIX", "/_protected")
+
+# SPA static manifest: how often to check the folder for changes and the largest file kept in memory
+STATIC_MANIFEST_CHECK_INTERVAL = float(os.getenv("STATIC_MANIFEST_CHECK_INTERVAL", "2"))
+STATIC_MANIFEST_MAX_INLINE_BYTES = int(os.getenv("STATIC_MANIFEST_MAX_INLINE_BYTES", str(512 * 1024)))
+
+# AutoUSA photo uploads: staging directory (defaults to PHOTOS_AUTO_DIR/.staging) and zip-bomb limits
+PHOTOS_STAGING_DIR = os.getenv("PHOTOS_STAGING_DIR")
+PHOTO_UPLOAD_MAX_MEMBERS = int(os.getenv("PHOTO_UPLOAD_MAX_MEMBERS", "2000"))
+PHOTO_UPLOAD_MAX_UNCOMPRESSED_BYTES = int(os.getenv("PHOTO_UPLOAD_MAX_UNCOMPRESSED_BYTES", str(1024 * 1024 * 1024)))
+PHOTO_EXTRACT_WORKERS = int(os.getenv("PHOTO_EXTRACT_WORKERS", "4"))
+
+# Photo tree layout: galleries in <PHOTOS_AUTO_DIR>/<shard>/<vin>; 0 levels keeps the flat layout
+PHOTOS_SHARD_LEVELS = int(os.getenv("PHOTOS_SHARD_LEVELS", "0"))
+PHOTOS_SHARD_WIDTH = int(os.getenv("PHOTOS_SHARD_WIDTH", "2"))
+
+# Orphaned gallery reconciler: seconds between passes (0 disables), mode report/quarantine/purge
+PHOTO_RECONCILE_INTERVAL = float(os.getenv("PHOTO_RECONCILE_INTERVAL", "0"))
+PHOTO_RECONCILE_MODE = os.getenv("PHOTO_RECONCILE_MODE", "quarantine").strip().lower()
+PHOTO_RECONCILE_BATCH_SIZE = int(os.getenv("PHOTO_RECONCILE_BATCH_SIZE", "500"))
+PHOTO_RECONCILE_MIN_AGE = float(os.getenv("PHOTO_RECONCILE_MIN_AGE", str(24 * 3600)))
+PHOTOS_QUARANTINE_DIR = os.getenv("PHOTOS_QUARANTINE_DIR")
+PHOTO_QUARANTINE_TTL = float(os.getenv("PHOTO_QUARANTINE_TTL", str(7 * 24 * 3600)))
+
+# Photo storage backend: "local" (PHOTOS_AUTO_DIR) or "s3" (S3-compatible bucket, requires boto3)
+PHOTO_STORAGE_BACKEND = os.getenv("PHOTO_STORAGE_BACKEND", "local").strip().lower()
+PHOTO_S3_BUCKET = os.getenv("PHOTO_S3_BUCKET")
+PHOTO_S3_PREFIX = os.getenv("PHOTO_S3_PREFIX", "autousa")
+PHOTO_S3_ENDPOINT_URL = os.getenv("PHOTO_S3_ENDPOINT_URL")
+PHOTO_S3_REGION = os.getenv("PHOTO_S3_REGION")
+# Photo URLs handed to clients: CDN base URL, otherwise presigned URLs (s3) valid for PHOTO_URL_EXPIRES seconds
+PHOTO_CDN_BASE_URL = os.getenv("PHOTO_CDN_BASE_URL")
+PHOTO_URL_EXPIRES = int(os.getenv("PHOTO_URL_EXPIRES", "3600"))
+PHOTO_STORAGE_MANIFEST_TTL = float(os.getenv("PHOTO_STORAGE_MANIFEST_TTL", "30"))
+
+# Maximum number of VINs per batch photo listing request
+PHOTO_BATCH_MAX_VINS = int(os.getenv("PHOTO_BATCH_MAX_VINS", "200"))
+
+# Content-addressed photo store shared by all galleries (defaults to PHOTOS_AUTO_DIR/.blobs, same filesystem)
+PHOTOS_BLOB_DIR = os.getenv("PHOTOS_BLOB_DIR")
+PHOTO_DEDUP_ENABLED = _str_to_bool(os.getenv("PHOTO_DEDUP_ENABLED", "true"))
+PHOTO_BLOB_GC_GRACE_SECONDS = int(os.getenv("PHOTO_BLOB_GC_GRACE_SECONDS", "3600"))
+
+# Resumable chunked uploads (total archive size is not bound by MAX_CONTENT_LENGTH)
+PHOTO_UPLOAD_CHUNK_BYTES = int(os.getenv("PHOTO_UPLOAD_CHUNK_BYTES", str(8 * 1024 * 1024)))
+PHOTO_UPLOAD_MAX_CHUNK_BYTES = int(os.getenv("PHOTO_UPLOAD_MAX_CHUNK_BYTES", str(64 * 1024 * 1024)))
+PHOTO_UPLOAD_MAX_ARCHIVE_BYTES = int(os.getenv("PHOTO_UPLOAD_MAX_ARCHIVE_BYTES", str(1024 * 1024 * 1024)))
+PHOTO_UPLOAD_SESSION_TTL = int(os.getenv("PHOTO_UPLOAD_SESSION_TTL", str(24 * 3600)))
+
+# Asynchronous photo upload jobs: "thread" (background pool) or "inline" (runs in the request)
+PHOTO_JOB_RUNNER = os.getenv("PHOTO_JOB_RUNNER", "thread").strip().lower()
+PHOTO_JOB_WORKERS = int(os.getenv("PHOTO_JOB_WORKERS", "2"))
+PHOTO_JOB_STALE_SECONDS = int(os.getenv("PHOTO_JOB_STALE_SECONDS", "3600"))
+
+# AutoUSA photo derivatives (responsive sizes generated at upload)
+PHOTO_DERIVATIVE_WIDTHS = [
+    int(width) for width in os.getenv("PHOTO_DERIVATIVE_WIDTHS", "320,640,1280").split(",") if width.strip()
+]
+PHOTO_DERIVATIVE_FORMAT = os.getenv("PHOTO_DERIVATIVE_FORMAT", "webp").strip().lower()
+PHOTO_DERIVATIVE_QUALITY = int(os.getenv("PHOTO_DERIVATIVE_QUALITY", "80"))
+PHOTO_DERIVATIVE_WORKERS = int(os.getenv("PHOTO_DERIVATIVE_WORKERS", "2"))
+
+# Re-encoding of uploaded originals (same process pool as derivatives); originals optionally kept in cold storage
+PHOTO_RECOMPRESS_ENABLED = _str_to_bool(os.getenv("PHOTO_RECOMPRESS_ENABLED", "false"))
+PHOTO_RECOMPRESS_MAX_DIMENSION = int(os.getenv("PHOTO_RECOMPRESS_MAX_DIMENSION", "2560"))
+PHOTO_RECOMPRESS_QUALITY = int(os.getenv("PHOTO_RECOMPRESS_QUALITY", "85"))
+PHOTO_RECOMPRESS_MIN_SAVINGS = float(os.getenv("PHOTO_RECOMPRESS_MIN_SAVINGS", "0.1"))
+PHOTOS_ORIGINALS_DIR = os.getenv("PHOTOS_ORIGINALS_DIR")
+
+# Rate limiter counters: sqlite:///<path> is shared by all worker processes of the host and must be
+# set explicitly; the default memory:// is per process. RATELIMIT_STORAGE_URL is the old name of the setting.
+RATELIMIT_STORAGE_URI = os.getenv("RATELIMIT_STORAGE_URI") or os.getenv("RATELIMIT_STORAGE_URL") or "memory://"
+RATELIMIT_STRATEGY = os.getenv("RATELIMIT_STRATEGY", "fixed-window")
+# Serve the request unlimited (and log the error) when the counter storage fails
+RATELIMIT_SWALLOW_ERRORS = _str_to_bool(os.getenv("RATELIMIT_SWALLOW_ERRORS", "true"))
+
+# Per-request phase timings (auth, sql, to_dict, json, ratelimit, hooks) in a Server-Timing header and the log
+SERVER_TIMING_ENABLED = _str_to_bool(os.getenv("SERVER_TIMING_ENABLED", "false"))
+SERVER_TIMING_LOG_THRESHOLD_MS = float(os.getenv("SERVER_TIMING_LOG_THRESHOLD_MS", "0"))
+
+# SQL profiling: per-request statement recording with N+1 warnings, and a slow-query log (0 = off)
+SQL_PROFILER_ENABLED = _str_to_bool(os.getenv("SQL_PROFILER_ENABLED", "false"))
+SQL_N_PLUS_ONE_THRESHOLD = int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", "5"))
+SQL_SLOW_QUERY_MS = float(os.getenv("SQL_SLOW_QUERY_MS", "0"))
+
+# Prometheus metrics on /metrics (API key required; requires prometheus_client).
+# Set PROMETHEUS_MULTIPROC_DIR to aggregate all gunicorn workers.
+METRICS_ENABLED = _str_to_bool(os.getenv("METRICS_ENABLED", "false"))
+
+# Request tracing (W3C traceparent); spans as JSON lines in TRACING_FILE ({pid} = worker) or in memory
+TRACING_ENABLED = _str_to_bool(os.getenv("TRACING_ENABLED", "false"))
+TRACING_EXPORTER = os.getenv("TRACING_EXPORTER", "file").strip().lower()
+TRACING_FILE = os.getenv("TRACING_FILE") or os.path.join(tempfile.gettempdir(), "rdmotorsAPI-spans-{pid}.jsonl")
+TRACING_SAMPLE_RATE = float(os.getenv("TRACING_SAMPLE_RATE", "1.0"))
+TRACING_SERVICE_NAME = os.getenv("TRACING_SERVICE_NAME", "rdmotorsAPI")
+
+# On-demand profiler (POST /admin/profiler or PROFILER_SIGNAL, e.g. SIGPROF or SIGRTMIN+2; the signals
+# gunicorn uses, such as SIGUSR1/SIGUSR2, are rejected); sessions stop by themselves
+PROFILER_ENABLED = _str_to_bool(os.getenv("PROFILER_ENABLED", "false"))
+# Profiles are served by /admin/profiler: kept in a 0700 directory owned by the app user
+# (default: "profiles" under the Flask instance path)
+PROFILER_OUTPUT_DIR = os.getenv("PROFILER_OUTPUT_DIR")
+PROFILER_SIGNAL = os.getenv("PROFILER_SIGNAL", "")
+PROFILER_DEFAULT_SECONDS = float(os.getenv("PROFILER_DEFAULT_SECONDS", "30"))
+PROFILER_MAX_SECONDS = float(os.getenv("PROFILER_MAX_SECONDS", "300"))
+PROFILER_MAX_REQUESTS = int(os.getenv("PROFILER_MAX_REQUESTS", "100"))
+PROFILER_MAX_OVERHEAD = float(os.getenv("PROFILER_MAX_OVERHEAD", "0.02"))
+
+# Logging: records are queued and written by a background thread (rdmotorsAPI.logging_pipeline).
+# The file is shared by all workers and rotated externally (logrotate); LOG_MAX_BYTES > 0 makes every
+# process rotate its own file by size, which needs {pid} in LOG_FILE for one file per worker.
+LOG_DIR = os.getenv("LOG_DIR", BASE_DIR)
+LOG_FILE = os.getenv("LOG_FILE", "autousa_photos.log")
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").strip().lower()
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", "0"))
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "5"))
+LOG_INFO_SAMPLE_RATE = float(os.getenv("LOG_INFO_SAMPLE_RATE", "1.0"))
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+REQUEST_ID_HEADER = os.getenv("REQUEST_ID_HEADER", "X-Request-ID")
+
+# Memory diagnostics: tracemalloc snapshot/diff under /admin/memory, and an RSS watchdog that
+# recycles a worker (graceful SIGTERM under gunicorn) above MEMORY_RSS_LIMIT_MB (0 = off)
+MEMORY_PROFILER_ENABLED = _str_to_bool(os.getenv("MEMORY_PROFILER_ENABLED", "false"))
+MEMORY_TRACE_FRAMES = int(os.getenv("MEMORY_TRACE_FRAMES", "1"))
+MEMORY_TRACE_MAX_SECONDS = float(os.getenv("MEMORY_TRACE_MAX_SECONDS", "3600"))
+MEMORY_RSS_LIMIT_MB = float(os.getenv("MEMORY_RSS_LIMIT_MB", "0"))
+MEMORY_RSS_CHECK_INTERVAL = float(os.getenv("MEMORY_RSS_CHECK_INTERVAL", "30"))
+MEMORY_RSS_RECYCLE_SIGNAL = os.getenv("MEMORY_RSS_RECYCLE_SIGNAL", "SIGTERM")
+
+# Response compression
+COMPRESSION_ENABLED = _str_to_bool(os.getenv("COMPRESSION_ENABLED"), default=True)
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_LEVEL = int(os.getenv("COMPRESSION_LEVEL", "6"))
+COMPRESSION_CACHE_ENTRIES = int(os.getenv("COMPRESSION_CACHE_ENTRIES", "256"))
+
 # App configuration
 class Config:
     SQLALCHEMY_DATABASE_URI = SQLALCHEMY_DATABASE_URI
@@ -105,9 +244,101 @@ class Config:
     STATIC_FOLDER = STATIC_FOLDER
     PHOTOS_DIR = PHOTOS_DIR
     PHOTOS_AUTO_DIR = PHOTOS_AUTO_DIR
+    FILE_SERVE_MODE = FILE_SERVE_MODE
+    X_ACCEL_REDIRECT_PREFIX = X_ACCEL_REDIRECT_PREFIX
+    PHOTOS_STAGING_DIR = PHOTOS_STAGING_DIR
+    PHOTO_UPLOAD_MAX_MEMBERS = PHOTO_UPLOAD_MAX_MEMBERS
+    PHOTO_UPLOAD_MAX_UNCOMPRESSED_BYTES = PHOTO_UPLOAD_MAX_UNCOMPRESSED_BYTES
+    PHOTO_EXTRACT_WORKERS = PHOTO_EXTRACT_WORKERS
+    PHOTOS_SHARD_LEVELS = PHOTOS_SHARD_LEVELS
+    PHOTOS_SHARD_WIDTH = PHOTOS_SHARD_WIDTH
+    PHOTO_RECONCILE_INTERVAL = PHOTO_RECONCILE_INTERVAL
+    PHOTO_RECONCILE_MODE = PHOTO_RECONCILE_MODE
+    PHOTO_RECONCILE_BATCH_SIZE = PHOTO_RECONCILE_BATCH_SIZE
+    PHOTO_RECONCILE_MIN_AGE = PHOTO_RECONCILE_MIN_AGE
+    PHOTOS_QUARANTINE_DIR = PHOTOS_QUARANTINE_DIR
+    PHOTO_QUARANTINE_TTL = PHOTO_QUARANTINE_TTL
+    PHOTO_STORAGE_BACKEND = PHOTO_STORAGE_BACKEND
+    PHOTO_S3_BUCKET = PHOTO_S3_BUCKET
+    PHOTO_S3_PREFIX = PHOTO_S3_PREFIX
+    PHOTO_S3_ENDPOINT_URL = PHOTO_S3_ENDPOINT_URL
+    PHOTO_S3_REGION = PHOTO_S3_REGION
+    PHOTO_CDN_BASE_URL = PHOTO_CDN_BASE_URL
+    PHOTO_URL_EXPIRES = PHOTO_URL_EXPIRES
+    PHOTO_STORAGE_MANIFEST_TTL = PHOTO_STORAGE_MANIFEST_TTL
+    PHOTO_BATCH_MAX_VINS = PHOTO_BATCH_MAX_VINS
+    PHOTOS_BLOB_DIR = PHOTOS_BLOB_DIR
+    PHOTO_DEDUP_ENABLED = PHOTO_DEDUP_ENABLED
+    PHOTO_BLOB_GC_GRACE_SECONDS = PHOTO_BLOB_GC_GRACE_SECONDS
+    PHOTO_UPLOAD_CHUNK_BYTES = PHOTO_UPLOAD_CHUNK_BYTES
+    PHOTO_UPLOAD_MAX_CHUNK_BYTES = PHOTO_UPLOAD_MAX_CHUNK_BYTES
+    PHOTO_UPLOAD_MAX_ARCHIVE_BYTES = PHOTO_UPLOAD_MAX_ARCHIVE_BYTES
+    PHOTO_UPLOAD_SESSION_TTL = PHOTO_UPLOAD_SESSION_TTL
+    PHOTO_JOB_RUNNER = PHOTO_JOB_RUNNER
+    PHOTO_JOB_WORKERS = PHOTO_JOB_WORKERS
+    PHOTO_JOB_STALE_SECONDS = PHOTO_JOB_STALE_SECONDS
+    PHOTO_DERIVATIVE_WIDTHS = PHOTO_DERIVATIVE_WIDTHS
+    PHOTO_DERIVATIVE_FORMAT = PHOTO_DERIVATIVE_FORMAT
+    PHOTO_DERIVATIVE_QUALITY = PHOTO_DERIVATIVE_QUALITY
+    PHOTO_DERIVATIVE_WORKERS = PHOTO_DERIVATIVE_WORKERS
+    PHOTO_RECOMPRESS_ENABLED = PHOTO_RECOMPRESS_ENABLED
+    PHOTO_RECOMPRESS_MAX_DIMENSION = PHOTO_RECOMPRESS_MAX_DIMENSION
+    PHOTO_RECOMPRESS_QUALITY = PHOTO_RECOMPRESS_QUALITY
+    PHOTO_RECOMPRESS_MIN_SAVINGS = PHOTO_RECOMPRESS_MIN_SAVINGS
+    PHOTOS_ORIGINALS_DIR = PHOTOS_ORIGINALS_DIR
+    STATIC_MANIFEST_CHECK_INTERVAL = STATIC_MANIFEST_CHECK_INTERVAL
+    STATIC_MANIFEST_MAX_INLINE_BYTES = STATIC_MANIFEST_MAX_INLINE_BYTES
+
+    # Memory diagnostics
+    MEMORY_PROFILER_ENABLED = MEMORY_PROFILER_ENABLED
+    MEMORY_TRACE_FRAMES = MEMORY_TRACE_FRAMES
+    MEMORY_TRACE_MAX_SECONDS = MEMORY_TRACE_MAX_SECONDS
+    MEMORY_RSS_LIMIT_MB = MEMORY_RSS_LIMIT_MB
+    MEMORY_RSS_CHECK_INTERVAL = MEMORY_RSS_CHECK_INTERVAL
+    MEMORY_RSS_RECYCLE_SIGNAL = MEMORY_RSS_RECYCLE_SIGNAL
+
+    # Response compression
+    COMPRESSION_ENABLED = COMPRESSION_ENABLED
+    COMPRESSION_MIN_SIZE = COMPRESSION_MIN_SIZE
+    COMPRESSION_LEVEL = COMPRESSION_LEVEL
+    COMPRESSION_STREAMING = True
+    COMPRESSION_CACHE_ENTRIES = COMPRESSION_CACHE_ENTRIES
     
-    # Rate limiting configuration
-    RATELIMIT_STORAGE_URL = os.getenv("RATELIMIT_STORAGE_URL", "memory://")
+    # Request timing instrumentation
+    SERVER_TIMING_ENABLED = SERVER_TIMING_ENABLED
+    SERVER_TIMING_LOG_THRESHOLD_MS = SERVER_TIMING_LOG_THRESHOLD_MS
+
+    # Prometheus metrics
+    METRICS_ENABLED = METRICS_ENABLED
+
+    # Request IDs attached to log records and echoed in responses
+    REQUEST_ID_HEADER = REQUEST_ID_HEADER
+
+    # Request tracing
+    TRACING_ENABLED = TRACING_ENABLED
+    TRACING_EXPORTER = TRACING_EXPORTER
+    TRACING_FILE = TRACING_FILE
+    TRACING_SAMPLE_RATE = TRACING_SAMPLE_RATE
+    TRACING_SERVICE_NAME = TRACING_SERVICE_NAME
+
+    # On-demand profiler
+    PROFILER_ENABLED = PROFILER_ENABLED
+    PROFILER_OUTPUT_DIR = PROFILER_OUTPUT_DIR
+    PROFILER_SIGNAL = PROFILER_SIGNAL
+    PROFILER_DEFAULT_SECONDS = PROFILER_DEFAULT_SECONDS
+    PROFILER_MAX_SECONDS = PROFILER_MAX_SECONDS
+    PROFILER_MAX_REQUESTS = PROFILER_MAX_REQUESTS
+    PROFILER_MAX_OVERHEAD = PROFILER_MAX_OVERHEAD
+
+    # SQL profiling
+    SQL_PROFILER_ENABLED = SQL_PROFILER_ENABLED
+    SQL_N_PLUS_ONE_THRESHOLD = SQL_N_PLUS_ONE_THRESHOLD
+    SQL_SLOW_QUERY_MS = SQL_SLOW_QUERY_MS
+
+    # Rate limiting configuration: counters shared by all workers of the host (see rdmotorsAPI.ratelimit)
+    RATELIMIT_STORAGE_URI = RATELIMIT_STORAGE_URI
+    RATELIMIT_STRATEGY = RATELIMIT_STRATEGY
+    RATELIMIT_SWALLOW_ERRORS = RATELIMIT_SWALLOW_ERRORS
     RATELIMIT_ENABLED = os.getenv("RATELIMIT_ENABLED", "true").lower() == "true"
 
     # Firebase session auth
@@ -0,0 +1,488 @@
+"""Deterministic synthetic data for performance testing (``flask datagen ...``).
+
+Fills ``locations``, ``autousa`` (VINs with valid check digits, ISO 6346
+container numbers), ``autousa_history`` (multi-hop timelines from a US auction
+yard through ports to inland warehouses), ``cars``, ``services`` and ``clients``
+at configurable scales up to millions of rows, and optionally writes photo
+galleries for the generated VINs.
+
+Rows are built in batches and written with Core ``executemany`` inserts and
+explicit primary keys, so nothing is read back and memory stays bounded by the
+batch size. Every value is derived from the seed and the row index: the same
+seed on the same starting tables gives the same data, and a second run appends
+new rows (indexes continue after the existing maximum IDs) instead of
+colliding with the first.
+"""
+from __future__ import annotations
+
+import datetime
+import functools
+import hashlib
+import logging
+import math
+import os
+import random
+import shutil
+import struct
+import time
+import uuid
+import zlib
+from dataclasses import dataclass, field, replace
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from rdmotorsAPI import db
+from rdmotorsAPI.models import AutoUsa, AutoUsaHistory, Car, Client, Location, Service
+from rdmotorsAPI.photos.manifest import MANIFEST_VERSION, write_manifest
+from rdmotorsAPI.photos.service import (
+    get_blob_store,
+    get_photo_storage,
+    get_photos_staging_dir,
+    get_vin_folder,
+)
+
+VIN_ALPHABET = "ABCDEFGHJKLMNPRSTUVWXYZ0123456789"
+_VIN_VALUES = dict(zip("ABCDEFGHJKLMNPRSTUVWXYZ", [1, 2, 3, 4, 5, 6, 7, 8, 1, 2, 3, 4, 5, 7, 9, 2, 3, 4, 5, 6, 7, 8, 9]))
+_VIN_VALUES.update({digit: int(digit) for digit in "0123456789"})
+_VIN_WEIGHTS = (8, 7, 6, 5, 4, 3, 2, 10, 0, 9, 8, 7, 6, 5, 4, 3, 2)
+# Model year codes 2010-2025 and assembly plant codes
+_VIN_YEARS = "ABCDEFGHJKLMNPRS"
+_VIN_PLANTS = "ABCDEFGHJKLMNPRSTUVWXYZ"
+_VIN_SPACE = len(_VIN_YEARS) * len(_VIN_PLANTS) * 10**6
+
+# (mark, model, world manufacturer identifiers)
+VEHICLES = [
+    ("Honda", "Civic", ("1HG", "2HG", "19X")), ("Honda", "Accord", ("1HG",)), ("Toyota", "Camry", ("4T1",)),
+    ("Toyota", "RAV4", ("2T3", "JTM")), ("Ford", "F-150", ("1FT",)), ("Ford", "Escape", ("1FM",)),
+    ("Chevrolet", "Malibu", ("1G1",)), ("Chevrolet", "Equinox", ("2GN", "3GN")), ("Tesla", "Model 3", ("5YJ",)),
+    ("Tesla", "Model Y", ("7SA", "5YJ")), ("BMW", "X5", ("5UX",)), ("BMW", "330i", ("WBA",)),
+    ("Nissan", "Altima", ("1N4",)), ("Nissan", "Rogue", ("5N1", "JN8")), ("Hyundai", "Sonata", ("5NP",)),
+    ("Hyundai", "Tucson", ("KM8",)), ("Kia", "Optima", ("5XX", "KNA")), ("Jeep", "Grand Cherokee", ("1C4",)),
+    ("Subaru", "Outback", ("4S4",)), ("Volkswagen", "Jetta", ("3VW",)), ("Mazda", "CX-5", ("JM3",)),
+    ("Audi", "Q5", ("WA1",)), ("Mercedes-Benz", "GLE", ("4JG",)), ("Lexus", "RX 350", ("2T2", "JTJ")),
+]
+
+# Locations by stage of the route: auction yard, US port, destination port, inland warehouse
+LOCATION_STAGES = [
+    [("USA", "Copart Newark, NJ"), ("USA", "IAAI Chicago, IL"), ("USA", "Copart Houston, TX"),
+     ("USA", "Manheim Atlanta, GA"), ("USA", "Copart Los Angeles, CA"), ("USA", "IAAI Miami, FL")],
+    [("USA", "Port of New York and New Jersey"), ("USA", "Port of Savannah"), ("USA", "Port of Houston"),
+     ("USA", "Port of Los Angeles"), ("USA", "Port of Baltimore")],
+    [("Georgia", "Port of Poti"), ("Lithuania", "Port of Klaipeda"), ("Poland", "Port of Gdansk"),
+     ("Germany", "Port of Bremerhaven"), ("Ukraine", "Port of Odesa"), ("Romania", "Port of Constanta")],
+    [("Ukraine", "Warehouse Kyiv"), ("Ukraine", "Warehouse Lviv"), ("Ukraine", "Warehouse Dnipro"),
+     ("Ukraine", "Warehouse Kharkiv"), ("Ukraine", "Warehouse Odesa")],
+]
+# ISO 6346 letter values: 10 upwards, skipping multiples of 11
+_CONTAINER_VALUES = dict(zip("ABCDEFGHIJKLMNOPQRSTUVWXYZ", [value for value in range(10, 39) if value % 11]))
+CONTAINER_OWNERS = ["MSCU", "MAEU", "CMAU", "HLXU", "OOLU", "TGHU", "SEGU", "ZIMU"]
+CARS_PER_CONTAINER = 4
+
+SERVICES = ["Auction bidding", "Inland delivery", "Ocean shipping", "Customs clearance", "Certification",
+            "Repair estimate", "Body repair", "Registration", "Storage", "Inspection"]
+TRANSMISSIONS = ["Automatic", "Manual", "CVT", "Robot"]
+FUEL_TYPES = ["Petrol", "Diesel", "Hybrid", "Electric", "Gas/Petrol"]
+ENGINES = ["1.5", "1.6", "2.0", "2.4", "2.5", "3.0", "3.5", "5.0", "Electric"]
+CLIENT_STATUSES = ["active", "active", "active", "vip", "inactive"]
+
+
+@dataclass(frozen=True)
+class DataScale:
+    """Row counts of one generation run (history rows average about max_hops / 2 per auto)."""
+    locations: int
+    autos: int
+    max_hops: int
+    cars: int
+    services: int
+    clients: int
+
+
+SCALES: Dict[str, DataScale] = {
+    "tiny": DataScale(locations=20, autos=200, max_hops=3, cars=50, services=10, clients=50),
+    "small": DataScale(locations=50, autos=10_000, max_hops=4, cars=1_000, services=30, clients=2_000),
+    "medium": DataScale(locations=200, autos=250_000, max_hops=5, cars=20_000, services=100, clients=50_000),
+    "large": DataScale(locations=500, autos=2_000_000, max_hops=6, cars=200_000, services=200, clients=500_000),
+}
+
+
+@dataclass
+class GenerationReport:
+    """Rows written per table, the ID ranges they received and the elapsed time."""
+    seed: int
+    rows: Dict[str, int] = field(default_factory=dict)
+    id_ranges: Dict[str, Tuple[int, int]] = field(default_factory=dict)  # table -> (first, last)
+    galleries: int = 0
+    photos: int = 0
+    seconds: float = 0.0
+
+
+def _mix(value: int) -> int:
+    """splitmix64 finalizer: well-spread 64-bit output for consecutive inputs."""
+    value = (value + 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & 0xFFFFFFFFFFFFFFFF
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & 0xFFFFFFFFFFFFFFFF
+    return value ^ (value >> 31)
+
+
+def vin_check_digit(vin: str) -> str:
+    """Check digit (position 9) of a 17-character VIN, per ISO 3779 / 49 CFR 565."""
+    total = sum(_VIN_VALUES[char] * weight for char, weight in zip(vin, _VIN_WEIGHTS))
+    remainder = total % 11
+    return "X" if remainder == 10 else str(remainder)
+
+
+@functools.lru_cache(maxsize=None)
+def _vin_multiplier(seed: int) -> int:
+    multiplier = _mix(seed) % _VIN_SPACE
+    while math.gcd(multiplier, _VIN_SPACE) != 1:
+        multiplier += 1
+    return multiplier
+
+
+def make_vin(index: int, seed: int = 0, wmi: Optional[str] = None) -> str:
+    """
+    VIN number index of a seed: distinct for every index below 368 million.
+
+    Model year, plant and serial number come from a bijection of the index, so
+    uniqueness needs no lookup; WMI and descriptor section only add variety.
+    """
+    number = (index * _vin_multiplier(seed) + seed) % _VIN_SPACE
+    number, serial = divmod(number, 10**6)
+    year, plant = divmod(number, len(_VIN_PLANTS))
+    bits = _mix(seed * 0x100000001 + index)
+    if wmi is None:
+        wmis = VEHICLES[bits % len(VEHICLES)][2]
+        wmi = wmis[(bits >> 8) % len(wmis)]
+    descriptor = "".join(VIN_ALPHABET[(bits >> (16 + 5 * i)) % len(VIN_ALPHABET)] for i in range(5))
+    vin = f"{wmi}{descriptor}0{_VIN_YEARS[year]}{_VIN_PLANTS[plant]}{serial:06d}"
+    return vin[:8] + vin_check_digit(vin) + vin[9:]
+
+
+def container_check_digit(code: str) -> str:
+    """Check digit of the first 10 characters of an ISO 6346 container number."""
+    total = sum((_CONTAINER_VALUES[char] if char.isalpha() else int(char)) * 2**position
+                for position, char in enumerate(code))
+    return str(total % 11 % 10)
+
+
+def make_container_number(index: int, seed: int = 0) -> str:
+    """ISO 6346 container number (owner code, serial, check digit) number index of a seed."""
+    bits = _mix(seed * 0x100000001 + index + (1 << 40))
+    code = f"{CONTAINER_OWNERS[bits % len(CONTAINER_OWNERS)]}{(index * 7919 + seed) % 10**6:06d}"
+    return code + container_check_digit(code)
+
+
+def make_png(width: int = 64, height: int = 48, seed: int = 0) -> bytes:
+    """Small valid PNG whose pixels depend on seed."""
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    rng = random.Random(seed)
+    raw = b"".join(b"\x00" + bytes(rng.getrandbits(8) for _ in range(width * 3)) for _ in range(height))
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(raw))
+        + chunk(b"IEND", b"")
+    )
+
+
+def _next_id(column) -> int:
+    return (db.session.execute(db.select(db.func.max(column))).scalar() or 0) + 1
+
+
+def _insert(model, rows: List[dict]) -> None:
+    if rows:
+        db.session.execute(model.__table__.insert(), rows)
+
+
+def _sync_sequence(model, column: str) -> None:
+    """Move a PostgreSQL serial sequence past explicitly inserted IDs (other databases track it themselves)."""
+    if db.engine.dialect.name != "postgresql":
+        return
+    table = model.__tablename__
+    db.session.execute(db.text(
+        f"SELECT setval(pg_get_serial_sequence('{table}', '{column}'), (SELECT MAX({column}) FROM {table}))"
+    ))
+
+
+class DataGenerator:
+    """Writes one scale of synthetic rows in batches (needs an app context)."""
+
+    def __init__(self, scale: DataScale, seed: int = 42, batch_size: int = 10_000,
+                 start_date: datetime.date = datetime.date(2021, 1, 1),
+                 progress: Optional[Callable[[str, int, int], None]] = None):
+        self.scale = scale
+        self.seed = seed
+        self.batch_size = batch_size
+        self.start_date = start_date
+        self.progress = progress
+        self.report = GenerationReport(seed=seed)
+        self.stage_locations: List[List[int]] = [[] for _ in LOCATION_STAGES]
+
+    def _rng(self, table: str, batch: int) -> random.Random:
+        # One stream per table and batch: changing one table's scale leaves the others unchanged
+        return random.Random(f"{self.seed}:{table}:{batch}")
+
+    def _batches(self, table: str, model, id_column, count: int,
+                 build: Callable[[random.Random, int, int], Iterable[dict]]) -> None:
+        first_id = _next_id(id_column)
+        for batch, start in enumerate(range(0, count, self.batch_size)):
+            stop = min(start + self.batch_size, count)
+            rows = list(build(self._rng(table, batch), first_id + start, first_id + stop))
+            _insert(model, rows)
+            db.session.commit()
+            if self.progress is not None:
+                self.progress(table, stop, count)
+        _sync_sequence(model, id_column.key)
+        db.session.commit()
+        self.report.rows[table] = self.report.rows.get(table, 0) + count
+        if count:
+            self.report.id_ranges[table] = (first_id, first_id + count - 1)
+
+    def generate(self) -> GenerationReport:
+        started = time.perf_counter()
+        self._locations()
+        self._autos()
+        self._batches("cars", Car, Car.car_id, self.scale.cars, self._car_rows)
+        self._batches("services", Service, Service.service_id, self.scale.services, self._service_rows)
+        self._batches("clients", Client, Client.client_id, self.scale.clients, self._client_rows)
+        self.report.seconds = time.perf_counter() - started
+        return self.report
+
+    def _locations(self) -> None:
+        def rows(rng, first_id, stop_id):
+            for location_id in range(first_id, stop_id):
+                index = location_id - first_id
+                stage = LOCATION_STAGES[index % len(LOCATION_STAGES)]
+                country, description = stage[(index // len(LOCATION_STAGES)) % len(stage)]
+                repeat = index // sum(len(names) for names in LOCATION_STAGES)
+                if repeat:
+                    description = f"{description} #{repeat + 1}"
+                self.stage_locations[index % len(LOCATION_STAGES)].append(location_id)
+                yield {"location_id": location_id, "country": country, "description": description}
+
+        # Timelines need every stage, so there are at least as many locations as stages
+        count = max(self.scale.locations, len(LOCATION_STAGES))
+        self._batches("locations", Location, Location.location_id, count, rows)
+
+    def _autos(self) -> None:
+        first_id = _next_id(AutoUsa.id)
+        first_history_id = history_id = _next_id(AutoUsaHistory.id)
+        count = self.scale.autos
+        for batch, start in enumerate(range(0, count, self.batch_size)):
+            rng = self._rng("autousa", batch)
+            autos, history = [], []
+            for auto_id in range(first_id + start, first_id + min(start + self.batch_size, count)):
+                auto, hops = self._timeline(rng, auto_id)
+                autos.append(auto)
+                for hop in hops:
+                    hop.update(id=history_id, autousa_id=auto_id)
+                    history_id += 1
+                    history.append(hop)
+            _insert(AutoUsa, autos)
+            _insert(AutoUsaHistory, history)
+            db.session.commit()
+            if self.progress is not None:
+                self.progress("autousa", min(start + self.batch_size, count), count)
+        _sync_sequence(AutoUsa, "id")
+        _sync_sequence(AutoUsaHistory, "id")
+        db.session.commit()
+        self.report.rows["autousa"] = self.report.rows.get("autousa", 0) + count
+        self.report.rows["autousa_history"] = self.report.rows.get("autousa_history", 0) + history_id - first_history_id
+        if count:
+            self.report.id_ranges["autousa"] = (first_id, first_id + count - 1)
+        if history_id > first_history_id:
+            self.report.id_ranges["autousa_history"] = (first_history_id, history_id - 1)
+
+    def _timeline(self, rng: random.Random, auto_id: int) -> Tuple[dict, List[dict]]:
+        """An auto row and the history rows of the locations it already left."""
+        mark, model, wmis = VEHICLES[rng.randrange(len(VEHICLES))]
+        stops = rng.randint(1, self.scale.max_hops + 1)
+        stages = [min(stop, len(LOCATION_STAGES) - 1) for stop in range(stops)]
+        route = [rng.choice(self.stage_locations[stage]) for stage in stages]
+
+        arrival = self.start_date + datetime.timedelta(days=rng.randrange(3 * 365))
+        hops = []
+        for loc_id in route[:-1]:
+            departure = arrival + datetime.timedelta(days=rng.randint(2, 30))
+            hops.append({"loc_id": loc_id, "arrival_date": arrival, "departure_date": departure})
+            arrival = departure + datetime.timedelta(days=rng.randint(1, 35))
+
+        final_stage = len(LOCATION_STAGES) - 1
+        auto = {
+            "id": auto_id,
+            "vin": make_vin(auto_id, self.seed, rng.choice(wmis)),
+            # Cars leaving the auction yard share containers, several per box
+            "container_number": make_container_number(auto_id // CARS_PER_CONTAINER, self.seed) if stops > 1 else None,
+            "mark": mark,
+            "model": model,
+            "loc_now_id": route[-1],
+            "loc_next_id": rng.choice(self.stage_locations[stages[-1] + 1]) if stages[-1] < final_stage else None,
+            "arrival_date": arrival,
+            "departure_date": None,
+        }
+        return auto, hops
+
+    def _car_rows(self, rng, first_id, stop_id):
+        for car_id in range(first_id, stop_id):
+            mark, model, _ = VEHICLES[rng.randrange(len(VEHICLES))]
+            year = rng.randint(2010, 2025)
+            yield {
+                "car_id": car_id, "mark": mark, "model": model, "year": year,
+                "addi": rng.choice(["", "Full option", "One owner", "Panoramic roof", "After repair"]),
+                "transmission": rng.choice(TRANSMISSIONS),
+                "mileage": max(0, (2026 - year) * rng.randint(5_000, 25_000)),
+                "fuel_type": rng.choice(FUEL_TYPES), "price": rng.randint(4_000, 80_000) // 100 * 100,
+                "discount": rng.choice([0, 0, 0, 300, 500, 1000]), "quality": rng.randint(1, 5),
+                "engine": rng.choice(ENGINES), "photo_url": f"cars/{car_id}.jpg",
+            }
+
+    def _service_rows(self, rng, first_id, stop_id):
+        for service_id in range(first_id, stop_id):
+            name = SERVICES[(service_id - first_id) % len(SERVICES)]
+            yield {
+                "service_id": service_id, "name": f"{name} {service_id}",
+                "descr": f"{name} for cars bought at US auctions", "price": rng.randint(50, 3000),
+                "currency": rng.choice(["USD", "USD", "EUR", "UAH"]), "photo_filename": f"service-{service_id}.jpg",
+            }
+
+    def _client_rows(self, rng, first_id, stop_id):
+        for client_id in range(first_id, stop_id):
+            yield {
+                "client_id": client_id, "login": f"client{client_id}"[:20],
+                # Unique by ID; the seed keeps runs with different seeds apart
+                "email": f"client{client_id}.{self.seed}@example.com",
+                "number": f"+380{rng.choice([50, 63, 66, 67, 68, 73, 93, 95, 97, 98])}{rng.randrange(10**7):07d}",
+                "status": rng.choice(CLIENT_STATUSES),
+            }
+
+
+def generate_data(scale: DataScale, seed: int = 42, batch_size: int = 10_000,
+                  progress: Optional[Callable[[str, int, int], None]] = None) -> GenerationReport:
+    """Append one scale of synthetic rows to the current app's database."""
+    return DataGenerator(scale, seed=seed, batch_size=batch_size, progress=progress).generate()
+
+
+def _photo_pool(seed: int, size: int) -> List[Tuple[bytes, Dict]]:
+    """Distinct images shared by the generated galleries, with their manifest fields."""
+    pool = []
+    rng = random.Random(f"{seed}:photos")
+    for index in range(size):
+        width, height = rng.choice([(64, 48), (96, 64), (80, 60), (48, 64)])
+        data = make_png(width, height, seed=seed * 100_003 + index)
+        pool.append((data, {"size": len(data), "width": width, "height": height,
+                            "sha256": hashlib.sha256(data).hexdigest(), "crc32": zlib.crc32(data)}))
+    return pool
+
+
+def generate_photo_folders(vins: Iterable[str], photos_per_gallery: int = 12, seed: int = 42,
+                           pool_size: int = 64) -> Tuple[int, int]:
+    """
+    Write a gallery and its manifest for each VIN, as an upload would leave it.
+
+    Photos are picked from a pool of distinct images. With deduplication on,
+    galleries hard-link the pool's blobs, so large trees cost inodes rather
+    than bytes. Remote storage backends receive the galleries through publish().
+    No size derivatives are generated.
+
+    Returns:
+        (galleries, photos) written
+    """
+    pool = _photo_pool(seed, pool_size)
+    storage = get_photo_storage()
+    blob_store = get_blob_store() if storage.is_local else None
+    galleries = photos = 0
+    for vin in vins:
+        rng = random.Random(f"{seed}:gallery:{vin}")
+        if storage.is_local:
+            folder = get_vin_folder(vin)
+        else:
+            folder = os.path.join(get_photos_staging_dir(), f"{vin}.{uuid.uuid4().hex}.work")
+        os.makedirs(folder, exist_ok=True)
+        entries = []
+        for number in range(1, photos_per_gallery + 1):
+            data, fields = pool[rng.randrange(len(pool))]
+            name = f"{number:02d}.png"
+            path = os.path.join(folder, name)
+            if blob_store is not None:
+                blob_path = blob_store.path_for(fields["sha256"])
+                if not os.path.exists(blob_path):
+                    os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+                    with open(f"{blob_path}.tmp", "wb") as f:
+                        f.write(data)
+                    os.replace(f"{blob_path}.tmp", blob_path)
+                if os.path.lexists(path):
+                    os.remove(path)
+                os.link(blob_path, path)
+            else:
+                with open(path, "wb") as f:
+                    f.write(data)
+            entries.append(dict(fields, name=name, derivatives=[]))
+        write_manifest(folder, {"version": MANIFEST_VERSION, "photos": entries})
+        if not storage.is_local:
+            try:
+                storage.publish(vin, folder, [entry["name"] for entry in entries])
+            finally:
+                shutil.rmtree(folder, ignore_errors=True)
+        galleries += 1
+        photos += len(entries)
+    return galleries, photos
+
+
+def generated_vins(report: GenerationReport, limit: Optional[int] = None) -> List[str]:
+    """VINs of the autos a report covers, in ID order (the first limit of them)."""
+    if "autousa" not in report.id_ranges:
+        return []
+    first, last = report.id_ranges["autousa"]
+    if limit is not None:
+        last = min(last, first + limit - 1)
+    query = db.select(AutoUsa.vin).where(AutoUsa.id.between(first, last)).order_by(AutoUsa.id)
+    return list(db.session.execute(query).scalars())
+
+
+datagen_cli = AppGroup("datagen", help="Synthetic data for performance testing.")
+
+
+@datagen_cli.command("generate")
+@click.option("--scale", type=click.Choice(list(SCALES)), default="small", show_default=True)
+@click.option("--seed", type=int, default=42, show_default=True)
+@click.option("--batch-size", type=int, default=10_000, show_default=True, help="Rows per INSERT batch.")
+@click.option("--autos", type=int, default=None, help="Override the AutoUSA row count of the scale.")
+@click.option("--max-hops", type=int, default=None, help="Override the longest timeline of the scale.")
+@click.option("--galleries", type=int, default=0, show_default=True,
+              help="Write photo galleries for this many of the generated VINs.")
+@click.option("--photos-per-gallery", type=int, default=12, show_default=True)
+@click.option("--reset", is_flag=True, help="Drop and recreate all tables first.")
+@click.option("--yes", is_flag=True, help="Do not ask before --reset.")
+def generate_command(scale, seed, batch_size, autos, max_hops, galleries, photos_per_gallery, reset, yes):
+    """Append a deterministic synthetic dataset to the configured database."""
+    data_scale = SCALES[scale]
+    if autos is not None:
+        data_scale = replace(data_scale, autos=autos)
+    if max_hops is not None:
+        data_scale = replace(data_scale, max_hops=max_hops)
+    if reset:
+        if not yes:
+            click.confirm(f"Drop all tables of {db.engine.url.render_as_string(hide_password=True)}?", abort=True)
+        db.drop_all()
+        db.create_all()
+
+    def progress(table, done, total):
+        if done == total or done % (batch_size * 10) == 0:
+            click.echo(f"  {table}: {done}/{total}")
+
+    report = generate_data(data_scale, seed=seed, batch_size=batch_size, progress=progress)
+    for table, count in report.rows.items():
+        click.echo(f"{table}: {count} rows")
+    if galleries:
+        report.galleries, report.photos = generate_photo_folders(
+            generated_vins(report, galleries), photos_per_gallery, seed=seed,
+        )
+        click.echo(f"Wrote {report.galleries} galleries ({report.photos} photos) to "
+                   f"{current_app.config['PHOTOS_AUTO_DIR']}")
+    logging.info("Synthetic data generated in %.1f s (seed %d)", report.seconds, seed)
+    click.echo(f"Done in {report.seconds:.1f} s")
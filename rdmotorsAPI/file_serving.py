@@ -0,0 +1,63 @@
+"""File delivery helpers.
+
+Files are either streamed by Flask itself (``direct``) or handed over to the
+front proxy: ``x-sendfile`` (Apache/lighttpd) or ``x-accel-redirect`` (nginx).
+In offload modes Flask only resolves the path and decides on access; the proxy
+streams the bytes so worker threads are released immediately.
+"""
+from __future__ import annotations
+
+import mimetypes
+import os
+from typing import Optional
+from urllib.parse import quote
+
+from flask import abort, current_app, send_from_directory
+from werkzeug.security import safe_join
+
+FILE_SERVE_MODE_DIRECT = "direct"
+FILE_SERVE_MODE_X_SENDFILE = "x-sendfile"
+FILE_SERVE_MODE_X_ACCEL = "x-accel-redirect"
+FILE_SERVE_MODES = {FILE_SERVE_MODE_DIRECT, FILE_SERVE_MODE_X_SENDFILE, FILE_SERVE_MODE_X_ACCEL}
+
+
+def get_file_serve_mode() -> str:
+    """Get configured file delivery mode."""
+    return (current_app.config.get("FILE_SERVE_MODE") or FILE_SERVE_MODE_DIRECT).strip().lower()
+
+
+def _build_accel_uri(location: str, filename: str) -> str:
+    """Build internal nginx URI for a file inside a named location."""
+    prefix = current_app.config.get("X_ACCEL_REDIRECT_PREFIX", "/_protected").rstrip("/")
+    return f"{prefix}/{location.strip('/')}/{quote(filename.replace(os.sep, '/'))}"
+
+
+def send_file_response(directory: str, filename: str, location: str, max_age: Optional[int] = None):
+    """
+    Send file from directory using the configured delivery mode.
+
+    Args:
+        directory: Filesystem directory that contains the file
+        filename: Path of the file relative to directory
+        location: Name of the internal proxy location mapped to directory
+        max_age: Optional Cache-Control max-age in seconds
+
+    Returns:
+        Flask response (file body in direct mode, empty body with offload header otherwise)
+    """
+    mode = get_file_serve_mode()
+    if mode != FILE_SERVE_MODE_X_ACCEL:
+        # x-sendfile is handled natively by Flask through USE_X_SENDFILE.
+        return send_from_directory(directory, filename, max_age=max_age)
+
+    path = safe_join(directory, filename)
+    if path is None or not os.path.isfile(path):
+        abort(404)
+
+    response = current_app.response_class(status=200)
+    response.mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    response.headers["X-Accel-Redirect"] = _build_accel_uri(location, filename)
+    if max_age is not None:
+        response.cache_control.public = True
+        response.cache_control.max_age = max_age
+    return response
@@ -0,0 +1,265 @@
+"""Non-blocking log pipeline with JSON records and request IDs.
+
+``configure_logging`` replaces the root handlers with a ``QueueHandler``: the
+thread that logs only builds the record and puts it on an in-memory queue. A
+``QueueListener`` thread formats the records and writes them to the log file
+and to stderr, so requests never wait on disk writes. By default the file is
+rotated externally (logrotate): it is opened with a ``WatchedFileHandler``,
+which appends and reopens it once it has been moved, so every worker can share
+one file. With ``LOG_MAX_BYTES`` each process rotates its file by size, which
+is only safe with one file per worker (``{pid}`` in ``LOG_FILE``). ``{pid}``
+is filled in again in every forked worker, so a file configured in the gunicorn
+master (``--preload``) is not shared. When
+the queue is full (the disk cannot keep up), records are dropped and counted
+instead of blocking; the count is logged once the queue drains.
+
+Records are written as one JSON object per line (``LOG_FORMAT=json``) with the
+``request_id`` of the request that logged them, its ``trace_id`` when tracing
+is on, and any ``extra=`` attributes (e.g. ``server_timing``). ``init_request_ids`` assigns the ID: the incoming
+``X-Request-ID`` header when it is sane, else a random one; it is echoed in
+the response.
+
+INFO and lower records can be sampled with ``LOG_INFO_SAMPLE_RATE``. The
+decision is made per request ID, so a sampled request keeps all of its lines;
+warnings and errors are always kept.
+"""
+from __future__ import annotations
+
+import atexit
+import copy
+import datetime
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import re
+import threading
+import uuid
+import zlib
+from typing import Optional
+
+from flask import g, has_request_context, request
+
+from rdmotorsAPI.tracing import current_trace_id
+
+REQUEST_ID_HEADER = "X-Request-ID"
+TEXT_FORMAT = "%(asctime)s [%(levelname)s] [%(request_id)s] %(message)s"
+
+_VALID_REQUEST_ID = re.compile(r"[A-Za-z0-9._:-]{1,128}")
+# Attributes every LogRecord has; anything else was passed with extra=
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "request_id"}
+_listener: Optional["logging.handlers.QueueListener"] = None
+# (log_file, max_bytes, backup_count) of the file handler, to reopen a {pid} file in forked workers
+_file_settings: Optional[tuple] = None
+_lock = threading.Lock()
+
+
+def current_request_id() -> Optional[str]:
+    """ID of the request being handled, or None outside a request."""
+    if not has_request_context():
+        return None
+    return g.get("request_id")
+
+
+class RequestIdFilter(logging.Filter):
+    """Attach the current request and trace IDs (runs in the thread that logs, where the request context is)."""
+
+    def filter(self, record):
+        if not hasattr(record, "request_id"):
+            record.request_id = current_request_id() or "-"
+        if not hasattr(record, "trace_id"):
+            trace_id = current_trace_id()
+            if trace_id:
+                record.trace_id = trace_id
+        return True
+
+
+class InfoSamplingFilter(logging.Filter):
+    """Keep a fraction of INFO and lower records, decided per request."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        if self.rate >= 1 or record.levelno > logging.INFO:
+            return True
+        request_id = getattr(record, "request_id", "-")
+        if request_id == "-":
+            return random.random() < self.rate
+        return zlib.crc32(request_id.encode()) / 0xFFFFFFFF < self.rate
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per record."""
+
+    def format(self, record):
+        entry = {
+            "time": datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc).isoformat(
+                timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", "-"),
+            "process": record.process,
+            "thread": record.threadName,
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = record.stack_info
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records instead of blocking when the queue is full."""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Format the message and traceback here, where args and exc_info are still valid
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.msg = record.message
+        record.args = None
+        record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            return
+        if self.dropped and self.queue.qsize() < self.queue.maxsize // 2:
+            dropped, self.dropped = self.dropped, 0
+            self.queue.put_nowait(logging.makeLogRecord({
+                "name": "rdmotorsAPI.logging", "levelno": logging.WARNING, "levelname": "WARNING",
+                "msg": "Log queue was full; dropped %d records" % dropped, "request_id": "-",
+            }))
+
+
+def _log_path(log_file: str) -> str:
+    path = log_file.replace("{pid}", str(os.getpid()))
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    return path
+
+
+def _file_handler(log_file: str, max_bytes: int, backup_count: int) -> logging.FileHandler:
+    if max_bytes > 0:
+        return logging.handlers.RotatingFileHandler(
+            _log_path(log_file), maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8",
+        )
+    return logging.handlers.WatchedFileHandler(_log_path(log_file), encoding="utf-8")
+
+
+def configure_logging(log_file: Optional[str], level: str = "INFO", log_format: str = "json",
+                      max_bytes: int = 0, backup_count: int = 5,
+                      info_sample_rate: float = 1.0, queue_size: int = 10000) -> logging.handlers.QueueListener:
+    """
+    Route the root logger through a background writer thread.
+
+    Args:
+        log_file: Log file path (``{pid}`` is replaced by the process ID), or None for stderr only
+        level: Root log level
+        log_format: "json" or "text"
+        max_bytes: Size at which this process rotates the file (0 = rotated externally, e.g. by logrotate)
+        backup_count: Rotated files to keep
+        info_sample_rate: Fraction of requests whose INFO records are kept
+        queue_size: Records buffered before new ones are dropped
+
+    Returns:
+        The started listener (stopped at exit)
+    """
+    global _listener, _file_settings
+    formatter = JSONFormatter() if log_format == "json" else logging.Formatter(TEXT_FORMAT)
+    handlers = [logging.StreamHandler()]
+    if log_file:
+        handlers.append(_file_handler(log_file, max_bytes, backup_count))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    queue_handler = DroppingQueueHandler(queue.Queue(queue_size))
+    queue_handler.addFilter(RequestIdFilter())
+    if info_sample_rate < 1:
+        queue_handler.addFilter(InfoSamplingFilter(info_sample_rate))
+    listener = logging.handlers.QueueListener(queue_handler.queue, *handlers, respect_handler_level=True)
+
+    with _lock:
+        _stop_listener()
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+            handler.close()
+        root.addHandler(queue_handler)
+        root.setLevel(level.upper())
+        listener.start()
+        _listener = listener
+        _file_settings = (log_file, max_bytes, backup_count) if log_file else None
+    return listener
+
+
+def _restart_after_fork() -> None:
+    # The writer thread does not survive fork (gunicorn --preload); the queue's locks may be held
+    listener = _listener
+    if listener is None:
+        return
+    fresh_queue = queue.Queue(listener.queue.maxsize)
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, DroppingQueueHandler):
+            handler.queue = fresh_queue
+    listener.queue = fresh_queue
+    if _file_settings is not None and "{pid}" in _file_settings[0]:
+        # The handlers were opened by the parent (the gunicorn master): give this worker its own file
+        handlers = []
+        for handler in listener.handlers:
+            if isinstance(handler, logging.FileHandler):
+                handler.close()
+                reopened = _file_handler(*_file_settings)
+                reopened.setFormatter(handler.formatter)
+                handler = reopened
+            handlers.append(handler)
+        listener.handlers = tuple(handlers)
+    listener._thread = None
+    listener.start()
+
+
+def _stop_listener() -> None:
+    # Flushes queued records; the listener may already have been stopped by its owner
+    if _listener is not None and _listener._thread is not None:
+        _listener.stop()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_after_fork)
+atexit.register(_stop_listener)
+
+
+def init_request_ids(app) -> None:
+    """Assign every request an ID (from X-Request-ID when valid) and echo it in the response."""
+    header = app.config.get("REQUEST_ID_HEADER", REQUEST_ID_HEADER)
+
+    @app.before_request
+    def assign_request_id():
+        incoming = request.headers.get(header, "")
+        g.request_id = incoming if _VALID_REQUEST_ID.fullmatch(incoming) else uuid.uuid4().hex
+
+    @app.after_request
+    def add_request_id_header(response):
+        request_id = g.get("request_id")
+        if request_id:
+            response.headers[header] = request_id
+        return response
@@ -0,0 +1,270 @@
+"""Memory diagnostics for long-lived workers.
+
+``MemoryProfiler`` wraps ``tracemalloc`` for the admin endpoints: start
+tracing and take a baseline snapshot, let the worker serve traffic, then
+compare a new snapshot with the baseline to see which lines (or modules)
+allocated the memory that was not released. Tracing slows allocations and
+costs memory itself, so it stops by itself after ``MEMORY_TRACE_MAX_SECONDS``.
+
+``RSSWatchdog`` checks the resident set size of the worker every
+``MEMORY_RSS_CHECK_INTERVAL`` seconds. Above ``MEMORY_RSS_LIMIT_MB`` it logs the
+reason (RSS, uptime, requests served and the top allocators when tracing) and
+sends itself ``MEMORY_RSS_RECYCLE_SIGNAL`` (SIGTERM by default). Gunicorn
+treats that as a graceful worker shutdown: in-flight requests finish and the
+arbiter starts a fresh worker. The watchdog thread is started on the first
+request of each process, so a ``--preload`` master never watches itself.
+"""
+from __future__ import annotations
+
+import gc
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional
+
+from rdmotorsAPI.profiler import short_path
+
+try:
+    import resource
+except ImportError:  # Windows development machines: RSS from /proc only (0 when unavailable)
+    resource = None
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+_IGNORED_FILES = (tracemalloc.__file__, "<frozen importlib._bootstrap>", "<frozen importlib._bootstrap_external>",
+                  "<unknown>")
+
+
+def current_rss() -> int:
+    """Resident set size of this process in bytes (peak RSS where /proc is unavailable, else 0)."""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        if resource is None:
+            return 0
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def module_name(filename: str) -> str:
+    """Dotted module name of a source file (its path when outside sys.path)."""
+    path = short_path(filename)
+    if path == filename:
+        return filename
+    name = os.path.splitext(path)[0].replace(os.sep, ".")
+    return name[:-len(".__init__")] if name.endswith(".__init__") else name
+
+
+class MemoryProfiler:
+    """tracemalloc baseline/diff controller of one worker (``app.extensions["memory_profiler"]``)."""
+
+    def __init__(self, max_seconds: float = 3600, default_frames: int = 1):
+        self.max_seconds = max_seconds
+        self.default_frames = default_frames
+        self.baseline: Optional[tracemalloc.Snapshot] = None
+        self.baseline_taken: Optional[float] = None
+        self.started_here = False
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def _snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, filename) for filename in _IGNORED_FILES]
+        )
+
+    def start(self, frames: Optional[int] = None, seconds: Optional[float] = None) -> None:
+        """Start tracing (if needed) and take the baseline snapshot."""
+        frames = int(frames or self.default_frames)
+        seconds = float(seconds if seconds is not None else self.max_seconds)
+        if frames < 1 or seconds <= 0:
+            raise ValueError("frames and seconds must be positive")
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(frames)
+                self.started_here = True
+            self.baseline = self._snapshot()
+            self.baseline_taken = time.time()
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(min(seconds, self.max_seconds), self._expire)
+            self._timer.daemon = True
+            self._timer.start()
+        logging.info("tracemalloc baseline taken (%d frames, stops in %.0f s)",
+                     tracemalloc.get_traceback_limit(), min(seconds, self.max_seconds))
+
+    def _expire(self) -> None:
+        logging.info("tracemalloc stopped after MEMORY_TRACE_MAX_SECONDS")
+        self.stop()
+
+    def stop(self) -> None:
+        """Stop tracing started here and drop the baseline."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self.started_here and tracemalloc.is_tracing():
+                tracemalloc.stop()
+            self.started_here = False
+            self.baseline = None
+            self.baseline_taken = None
+
+    def top(self, group_by: str = "lineno", limit: int = 25) -> List[Dict[str, Any]]:
+        """
+        Largest allocators, as growth since the baseline when there is one.
+
+        Args:
+            group_by: "lineno" (file and line), "module" or "traceback"
+            limit: Number of entries
+
+        Raises:
+            RuntimeError: tracemalloc is not tracing
+        """
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("tracemalloc is not tracing; start it first")
+        key = {"lineno": "lineno", "module": "filename", "traceback": "traceback"}.get(group_by)
+        if key is None:
+            raise ValueError("group_by must be one of: lineno, module, traceback")
+        snapshot = self._snapshot()
+        baseline = self.baseline
+        if baseline is not None:
+            stats = snapshot.compare_to(baseline, key)
+        else:
+            stats = snapshot.statistics(key)
+        if group_by == "module":
+            return _merge_by_module(stats)[:limit]
+        return [_stat_entry(stat, group_by) for stat in stats[:limit]]
+
+    def status(self) -> Dict[str, Any]:
+        traced, peak = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (0, 0)
+        return {
+            "rss_bytes": current_rss(),
+            "tracing": tracemalloc.is_tracing(),
+            "traced_bytes": traced,
+            "traced_peak_bytes": peak,
+            "tracemalloc_overhead_bytes": tracemalloc.get_tracemalloc_memory(),
+            "baseline_taken": self.baseline_taken,
+            "gc_counts": gc.get_count(),
+            "gc_objects": len(gc.get_objects()),
+        }
+
+
+def _stat_entry(stat, group_by: str) -> Dict[str, Any]:
+    frame = stat.traceback[0]
+    entry = {
+        "file": short_path(frame.filename),
+        "line": frame.lineno,
+        "size_bytes": stat.size,
+        "count": stat.count,
+        "size_diff_bytes": getattr(stat, "size_diff", stat.size),
+        "count_diff": getattr(stat, "count_diff", stat.count),
+    }
+    if group_by == "traceback":
+        entry["traceback"] = [f"{short_path(f.filename)}:{f.lineno}" for f in stat.traceback]
+    return entry
+
+
+def _merge_by_module(stats) -> List[Dict[str, Any]]:
+    modules: Dict[str, Dict[str, Any]] = {}
+    for stat in stats:
+        name = module_name(stat.traceback[0].filename)
+        entry = modules.setdefault(name, {"module": name, "size_bytes": 0, "count": 0,
+                                          "size_diff_bytes": 0, "count_diff": 0})
+        entry["size_bytes"] += stat.size
+        entry["count"] += stat.count
+        entry["size_diff_bytes"] += getattr(stat, "size_diff", stat.size)
+        entry["count_diff"] += getattr(stat, "count_diff", stat.count)
+    return sorted(modules.values(), key=lambda entry: abs(entry["size_diff_bytes"]), reverse=True)
+
+
+class RSSWatchdog:
+    """Recycles the worker process once its RSS exceeds a limit."""
+
+    def __init__(self, limit_bytes: int, interval: float = 30, recycle_signal: int = signal.SIGTERM,
+                 profiler: Optional[MemoryProfiler] = None):
+        self.limit_bytes = limit_bytes
+        self.interval = interval
+        self.recycle_signal = recycle_signal
+        self.profiler = profiler
+        self.requests = 0
+        self.started = time.monotonic()
+        self.triggered = False
+        self._pid: Optional[int] = None
+        self._stopped = threading.Event()
+
+    def ensure_started(self) -> None:
+        """Start the check thread once per process (called on every request)."""
+        self.requests += 1
+        if self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self.requests = 1
+        self.started = time.monotonic()
+        self.triggered = False
+        threading.Thread(target=self._run, name="rdmotors-rss-watchdog", daemon=True).start()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            if self.check():
+                return
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def check(self) -> bool:
+        """Recycle the process when it is over the limit; returns True once triggered."""
+        rss = current_rss()
+        if self.triggered or rss <= self.limit_bytes:
+            return self.triggered
+        self.triggered = True
+        top = ""
+        if self.profiler is not None and self.profiler.tracing:
+            top = "; top allocators: " + ", ".join(
+                f"{entry['file']}:{entry['line']} +{entry['size_diff_bytes']}" for entry in self.profiler.top(limit=5)
+            )
+        logging.warning(
+            "RSS watchdog: worker %d uses %.1f MB (limit %.1f MB) after %.0f s and %d requests; "
+            "recycling with %s%s",
+            os.getpid(), rss / 2**20, self.limit_bytes / 2**20, time.monotonic() - self.started,
+            self.requests, signal.Signals(self.recycle_signal).name, top,
+        )
+        os.kill(os.getpid(), self.recycle_signal)
+        return True
+
+
+def get_memory_profiler(app) -> Optional[MemoryProfiler]:
+    return app.extensions.get("memory_profiler")
+
+
+def init_memory_diagnostics(app) -> None:
+    """Set up the tracemalloc endpoints (MEMORY_PROFILER_ENABLED) and the RSS watchdog (MEMORY_RSS_LIMIT_MB)."""
+    profiler = None
+    if app.config.get("MEMORY_PROFILER_ENABLED", False):
+        profiler = MemoryProfiler(
+            max_seconds=app.config.get("MEMORY_TRACE_MAX_SECONDS", 3600),
+            default_frames=app.config.get("MEMORY_TRACE_FRAMES", 1),
+        )
+        app.extensions["memory_profiler"] = profiler
+
+    limit_mb = app.config.get("MEMORY_RSS_LIMIT_MB", 0)
+    if not limit_mb:
+        return
+    signal_name = app.config.get("MEMORY_RSS_RECYCLE_SIGNAL", "SIGTERM")
+    recycle_signal = getattr(signal, signal_name.upper(), None)
+    if recycle_signal is None:
+        raise RuntimeError(f"Unknown MEMORY_RSS_RECYCLE_SIGNAL '{signal_name}'")
+    watchdog = RSSWatchdog(
+        int(limit_mb * 2**20),
+        interval=app.config.get("MEMORY_RSS_CHECK_INTERVAL", 30),
+        recycle_signal=recycle_signal,
+        profiler=profiler,
+    )
+    app.extensions["rss_watchdog"] = watchdog
+    app.before_request(watchdog.ensure_started)
@@ -0,0 +1,185 @@
+"""Prometheus metrics of the API, served on ``/metrics``.
+
+Metrics are defined once here and updated where the work happens: request
+latency (``init_metrics`` hooks), the SQLAlchemy connection pool, rate-limit
+rejections, Firebase verification, photo uploads and in-process caches.
+
+Under gunicorn every worker has its own counters. With
+``PROMETHEUS_MULTIPROC_DIR`` set (an empty directory, cleared before the
+server starts) ``prometheus_client`` keeps values in per-process files there,
+and ``/metrics`` aggregates all workers, so one scrape shows the whole node.
+Call ``mark_process_dead`` from gunicorn's ``child_exit`` hook so gauges of
+exited workers are dropped.
+
+``prometheus_client`` is optional: without it every metric is a no-op and the
+endpoint cannot be enabled.
+"""
+from __future__ import annotations
+
+import contextlib
+import os
+import time
+
+from flask import Response, g, request
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+
+try:
+    import prometheus_client
+    from prometheus_client import multiprocess
+except ImportError:  # metrics are optional; all metric calls become no-ops
+    prometheus_client = None
+    multiprocess = None
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class _NoopMetric:
+    """Stand-in accepting the metric calls used in this package."""
+
+    def labels(self, *args, **kwargs):
+        return self
+
+    def inc(self, amount=1):
+        pass
+
+    def observe(self, value):
+        pass
+
+    def set(self, value):
+        pass
+
+    def time(self):
+        return contextlib.nullcontext()
+
+
+def _metric(kind: str, name: str, documentation: str, labelnames=(), **kwargs):
+    if prometheus_client is None:
+        return _NoopMetric()
+    return getattr(prometheus_client, kind)(name, documentation, labelnames, **kwargs)
+
+
+REQUEST_LATENCY = _metric(
+    "Histogram", "rdmotors_http_request_duration_seconds", "Request latency",
+    ("endpoint", "method", "status"), buckets=LATENCY_BUCKETS,
+)
+RATE_LIMITED = _metric(
+    "Counter", "rdmotors_rate_limit_rejections_total", "Requests rejected by the rate limiter", ("endpoint",),
+)
+DB_POOL_CHECKED_OUT = _metric(
+    "Gauge", "rdmotors_db_pool_checked_out", "Database connections in use", multiprocess_mode="livesum",
+)
+DB_POOL_OVERFLOW = _metric(
+    "Gauge", "rdmotors_db_pool_overflow", "Database connections above pool_size", multiprocess_mode="livesum",
+)
+DB_POOL_WAIT = _metric(
+    "Histogram", "rdmotors_db_pool_wait_seconds", "Time waiting for a pooled database connection",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+FIREBASE_VERIFY = _metric(
+    "Histogram", "rdmotors_firebase_verify_seconds", "Firebase token and session cookie verification latency",
+    ("kind",), buckets=LATENCY_BUCKETS,
+)
+PHOTO_UPLOAD_BYTES = _metric(
+    "Counter", "rdmotors_photo_upload_bytes_total",
+    "Photo upload volume (archive: received, written: extracted, deduplicated: linked from the blob store)",
+    ("kind",),
+)
+PHOTO_INGEST_DURATION = _metric(
+    "Histogram", "rdmotors_photo_ingest_duration_seconds", "Photo archive ingest duration",
+    buckets=(0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0),
+)
+CACHE_REQUESTS = _metric(
+    "Counter", "rdmotors_cache_requests_total", "Cache lookups by cache and result (hit or miss)",
+    ("cache", "result"),
+)
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    """Count one cache lookup; hit ratio = hits / all lookups."""
+    CACHE_REQUESTS.labels(cache=cache, result="hit" if hit else "miss").inc()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that measures how long checkouts wait for a free connection."""
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            DB_POOL_WAIT.observe(time.perf_counter() - started)
+
+
+def _update_pool_gauges(pool) -> None:
+    checked_out = getattr(pool, "checkedout", None)
+    overflow = getattr(pool, "overflow", None)
+    if checked_out is not None:
+        DB_POOL_CHECKED_OUT.set(checked_out())
+    if overflow is not None:
+        DB_POOL_OVERFLOW.set(max(0, overflow()))
+
+
+def instrument_engine_options(config) -> None:
+    """Use the instrumented pool for server databases (call before the engine is created)."""
+    if not config.get("METRICS_ENABLED", False) or config["SQLALCHEMY_DATABASE_URI"].startswith("sqlite"):
+        return
+    config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+        **config.get("SQLALCHEMY_ENGINE_OPTIONS", {}), "poolclass": InstrumentedQueuePool,
+    }
+
+
+def render_metrics() -> bytes:
+    """Exposition text of this process, or of all workers in multiprocess mode."""
+    registry = prometheus_client.REGISTRY
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = prometheus_client.CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return prometheus_client.generate_latest(registry)
+
+
+def mark_process_dead(pid: int) -> None:
+    """Drop live gauges of an exited worker (gunicorn ``child_exit`` hook)."""
+    if multiprocess is not None and os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(pid)
+
+
+def init_metrics(app) -> None:
+    """Register request metrics and the /metrics endpoint when METRICS_ENABLED is set."""
+    if not app.config.get("METRICS_ENABLED", False):
+        return
+    if prometheus_client is None:
+        raise RuntimeError("METRICS_ENABLED requires prometheus_client (pip install prometheus-client)")
+
+    from rdmotorsAPI import db, limiter
+    from rdmotorsAPI.auth import require_api_key
+
+    with app.app_context():
+        pool = db.engine.pool
+    event.listen(pool, "checkout", lambda *args: _update_pool_gauges(pool))
+    event.listen(pool, "checkin", lambda *args: _update_pool_gauges(pool))
+
+    # Registered before the limiter: rejected requests are timed and counted too
+    @app.before_request
+    def start_request_timer():
+        g.metrics_started = time.perf_counter()
+
+    @app.after_request
+    def observe_request(response):
+        started = g.pop("metrics_started", None)
+        if started is None:
+            return response
+        endpoint = request.endpoint or "<unmatched>"
+        REQUEST_LATENCY.labels(
+            endpoint=endpoint, method=request.method, status=str(response.status_code),
+        ).observe(time.perf_counter() - started)
+        if response.status_code == 429:
+            RATE_LIMITED.labels(endpoint=endpoint).inc()
+        return response
+
+    @limiter.exempt
+    @require_api_key
+    def metrics():
+        return Response(render_metrics(), content_type=prometheus_client.CONTENT_TYPE_LATEST)
+
+    app.add_url_rule("/metrics", "metrics", metrics, methods=["GET"])
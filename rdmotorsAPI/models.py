@@ -1,6 +1,9 @@
 """Database models for the API"""
 # db is imported from __init__.py after it's created
 # This avoids circular imports - models are imported after db initialization
+import json
+
+from rdmotorsAPI.server_timing import timed
 from rdmotorsAPI.utils import get_photo_url
 
 # Import will work because __init__.py imports models after creating db
@@ -16,6 +19,7 @@ class Service(db.Model):
     currency = db.Column(db.String(3), nullable=False)
     photo_filename = db.Column(db.String(255), nullable=False)
 
+    @timed("to_dict")
     def to_dict(self):
         return {
             "service_id": self.service_id,
@@ -33,6 +37,7 @@ class Location(db.Model):
     country = db.Column(db.String(50))
     description = db.Column(db.String(255))
 
+    @timed("to_dict")
     def to_dict(self):
         return {
             "location_id": self.location_id,
@@ -64,6 +69,7 @@ class AutoUsa(db.Model):
         back_populates="autousa"
     )
 
+    @timed("to_dict")
     def to_dict(self):
         return {
             "id": self.id,
@@ -91,6 +97,45 @@ class AutoUsaHistory(db.Model):
     location = db.relationship("Location", foreign_keys=[loc_id])
 
 
+class PhotoJob(db.Model):
+    __tablename__ = "photo_jobs"
+
+    id = db.Column(db.String(32), primary_key=True)
+    vin = db.Column(db.String(17), nullable=False, index=True)
+    status = db.Column(db.String(20), nullable=False, default="queued", index=True)
+    archive_path = db.Column(db.String(512), nullable=False)
+    files_total = db.Column(db.Integer, nullable=True)
+    files_done = db.Column(db.Integer, nullable=False, default=0)
+    bytes_written = db.Column(db.BigInteger, nullable=False, default=0)
+    results = db.Column(db.Text, nullable=True)
+    error = db.Column(db.String(500), nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    @timed("to_dict")
+    def to_dict(self):
+        progress = None
+        if self.files_total:
+            progress = round(100 * (self.files_done or 0) / self.files_total)
+        elif self.status == "succeeded":
+            progress = 100
+        return {
+            "job_id": self.id,
+            "vin": self.vin,
+            "status": self.status,
+            "progress": progress,
+            "files_total": self.files_total,
+            "files_done": self.files_done,
+            "bytes_written": self.bytes_written,
+            "files": json.loads(self.results) if self.results else [],
+            "error": self.error,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None
+        }
+
+
 class Client(db.Model):
     __tablename__ = "clients"
     client_id = db.Column(db.Integer, primary_key=True)
@@ -99,6 +144,7 @@ class Client(db.Model):
     number = db.Column(db.String(20), nullable=False)
     status = db.Column(db.String(20), nullable=False)
 
+    @timed("to_dict")
     def to_dict(self):
         return {
             "client_id": self.client_id,
@@ -125,6 +171,7 @@ class Car(db.Model):
     engine = db.Column(db.String, nullable=False)
     photo_url = db.Column(db.String(255), nullable=False)
 
+    @timed("to_dict")
     def to_dict(self):
         return {
             "car_id": self.car_id,
@@ -0,0 +1 @@
+"""AutoUSA photo storage helpers"""
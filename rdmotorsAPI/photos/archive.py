@@ -0,0 +1,71 @@
+"""Streamed ZIP archives of photo galleries.
+
+The archive is produced while it is sent: ``zipfile`` writes into a
+non-seekable sink (so it emits data descriptors instead of seeking back), and
+the sink is drained after every chunk read from the storage backend. Photos are already compressed, so
+entries are stored as-is; memory use is one read buffer whatever the gallery
+size and nothing touches the disk.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from typing import Callable, Iterable, Iterator, List, Tuple
+from zipfile import ZIP_STORED, ZipFile, ZipInfo
+
+class _StreamSink:
+    """Write-only, non-seekable file object collecting zipfile output between drains."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._offset = 0
+
+    def write(self, data) -> int:
+        if data:
+            self._chunks.append(bytes(data))
+            self._offset += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        # zipfile records member offsets via tell(); seek() is absent, so it streams
+        return self._offset
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> List[bytes]:
+        """Take buffered output as at most one chunk (empty chunks would end a chunked response)."""
+        if not self._chunks:
+            return []
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return [data]
+
+
+def iter_zip(files: Iterable[Tuple[str, int, Callable[[], Iterable[bytes]]]]) -> Iterator[bytes]:
+    """
+    Yield a ZIP archive chunk by chunk.
+
+    Args:
+        files: (name in archive, size in bytes, opener returning the content as
+            an iterable of chunks); entries whose opener raises LookupError (the
+            photo disappeared since the listing) are skipped
+    """
+    sink = _StreamSink()
+    with ZipFile(sink, "w", compression=ZIP_STORED, allowZip64=True) as zip_file:
+        for arcname, size, opener in files:
+            try:
+                chunks = opener()
+            except LookupError:
+                logging.warning("Skipping %s in photo archive: file disappeared", arcname)
+                continue
+            zip_info = ZipInfo(arcname, date_time=time.localtime()[:6])
+            zip_info.compress_type = ZIP_STORED
+            zip_info.file_size = size  # decides whether the entry needs ZIP64 headers
+            with zip_file.open(zip_info, "w") as target:
+                for block in chunks:
+                    target.write(block)
+                    yield from sink.drain()
+            yield from sink.drain()
+    # Central directory is written on close
+    yield from sink.drain()
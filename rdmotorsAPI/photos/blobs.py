@@ -0,0 +1,132 @@
+"""Content-addressed photo blob store.
+
+Photos are stored once under ``<root>/<aa>/<bb>/<sha256>`` and every VIN gallery
+holds a hard link to the blob. The filesystem link count is the reference count:
+a blob with a single link is referenced by no gallery and can be collected.
+Galleries keep working as plain directories for the proxy and for backups.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import time
+from typing import Iterable, Tuple
+
+
+class BlobStore:
+    """Hard-link based content-addressed store (must share a filesystem with the galleries)."""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def path_for(self, sha256: str) -> str:
+        return os.path.join(self.root, sha256[:2], sha256[2:4], sha256)
+
+    def has(self, sha256: str) -> bool:
+        return os.path.exists(self.path_for(sha256))
+
+    def refcount(self, sha256: str) -> int:
+        """Number of gallery links to a blob (0 for orphans or unknown blobs)."""
+        try:
+            return os.stat(self.path_for(sha256)).st_nlink - 1
+        except FileNotFoundError:
+            return 0
+
+    def _link(self, blob_path: str, dest_path: str) -> None:
+        # Link under a temporary name, then rename over dest: dest never disappears
+        temp_path = f"{dest_path}.link"
+        if os.path.lexists(temp_path):
+            os.remove(temp_path)
+        os.link(blob_path, temp_path)
+        os.replace(temp_path, dest_path)
+
+    def store_and_link(self, temp_path: str, sha256: str, dest_path: str) -> bool:
+        """
+        Place content of temp_path at dest_path through the store.
+
+        Returns:
+            True when the content was already stored (the temporary file is
+            discarded and no new bytes are kept), False for new content.
+        """
+        blob_path = self.path_for(sha256)
+        try:
+            self._link(blob_path, dest_path)
+            os.remove(temp_path)
+            return True
+        except FileNotFoundError:
+            pass
+
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+        try:
+            # link() fails if a concurrent upload stored the same blob first; both copies are identical
+            os.link(temp_path, blob_path)
+        except FileExistsError:
+            pass
+        self._link(blob_path, dest_path)
+        os.remove(temp_path)
+        return False
+
+    def adopt(self, path: str, sha256: str) -> bool:
+        """Replace a regular gallery file with a link to its blob; returns True if space was saved."""
+        blob_path = self.path_for(sha256)
+        if os.path.exists(blob_path):
+            if os.path.samefile(blob_path, path):
+                return False
+            self._link(blob_path, path)
+            return True
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+        os.link(path, blob_path)
+        return False
+
+    def release(self, digests: Iterable[str]) -> int:
+        """
+        Drop blobs of removed or replaced gallery files once nothing links to them.
+
+        Returns:
+            Bytes reclaimed
+        """
+        reclaimed = 0
+        for sha256 in set(digests):
+            path = self.path_for(sha256)
+            try:
+                stat = os.stat(path)
+                if stat.st_nlink == 1:
+                    # A concurrent upload losing this race stores the blob again
+                    os.remove(path)
+                    reclaimed += stat.st_size
+            except FileNotFoundError:
+                continue
+        return reclaimed
+
+    def collect_garbage(self, grace_seconds: int = 3600, dry_run: bool = False) -> Tuple[int, int]:
+        """
+        Delete blobs no gallery links to.
+
+        Blobs whose link count changed within grace_seconds (ctime) are kept so a
+        blob being linked by an in-flight upload is never collected.
+
+        Returns:
+            (number of blobs removed, bytes reclaimed)
+        """
+        removed = 0
+        reclaimed = 0
+        cutoff = time.time() - grace_seconds
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                try:
+                    stat = os.stat(path)
+                    if stat.st_nlink > 1 or stat.st_ctime > cutoff:
+                        continue
+                    if not dry_run:
+                        os.remove(path)
+                    removed += 1
+                    reclaimed += stat.st_size
+                except FileNotFoundError:
+                    continue
+        if removed:
+            logging.info(
+                "Blob GC %s %d orphaned photos (%d bytes)",
+                "would remove" if dry_run else "removed", removed, reclaimed,
+            )
+        return removed, reclaimed
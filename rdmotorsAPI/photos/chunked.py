@@ -0,0 +1,192 @@
+"""Resumable chunked uploads of photo archives.
+
+Protocol (all state lives on disk, so any worker can serve any chunk):
+    1. init: declare total size (and optionally the sha256 of the whole archive)
+    2. chunk: send bytes at an explicit offset with a per-chunk sha256; bytes are
+       appended straight to ``<id>.part`` while being hashed
+    3. finalize: size and checksum are verified and the archive is handed to the
+       regular ingest path
+
+A dropped connection only loses the current chunk: the client asks for the
+current offset and resumes from there.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import time
+import uuid
+from typing import Any, BinaryIO, Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows development machines: no cross-process chunk locking
+    fcntl = None
+
+UPLOAD_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+COPY_BUFFER_SIZE = 1024 * 1024
+
+
+class UploadNotFound(LookupError):
+    """Upload session does not exist (never created, finalized or expired)."""
+
+
+class UploadOffsetMismatch(ValueError):
+    """Chunk offset does not match the bytes already received."""
+
+    def __init__(self, expected: int):
+        super().__init__(f"Expected offset {expected}")
+        self.expected = expected
+
+
+class UploadChecksumMismatch(ValueError):
+    """Chunk or archive checksum does not match the received bytes."""
+
+
+class UploadTooLarge(ValueError):
+    """Chunk or archive exceeds configured size limits."""
+
+
+def _paths(root: str, upload_id: str):
+    if not UPLOAD_ID_RE.match(upload_id or ""):
+        raise UploadNotFound(upload_id)
+    base = os.path.join(root, upload_id)
+    return f"{base}.json", f"{base}.part"
+
+
+def create_upload(root: str, vin: str, total_size: int, checksum: Optional[str] = None,
+                  max_archive_bytes: Optional[int] = None) -> Dict[str, Any]:
+    """Start an upload session and return its state."""
+    if total_size <= 0:
+        raise ValueError("size must be a positive integer")
+    if max_archive_bytes is not None and total_size > max_archive_bytes:
+        raise UploadTooLarge(f"Archive size {total_size} exceeds the limit of {max_archive_bytes} bytes")
+
+    os.makedirs(root, exist_ok=True)
+    upload_id = uuid.uuid4().hex
+    meta_path, part_path = _paths(root, upload_id)
+    meta = {
+        "upload_id": upload_id,
+        "vin": vin,
+        "size": total_size,
+        "checksum": checksum.lower() if checksum else None,
+        "created_at": time.time(),
+    }
+    open(part_path, "wb").close()
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    return dict(meta, offset=0)
+
+
+def get_upload(root: str, upload_id: str) -> Dict[str, Any]:
+    """Load session state; ``offset`` is the number of bytes received so far."""
+    meta_path, part_path = _paths(root, upload_id)
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        offset = os.path.getsize(part_path)
+    except FileNotFoundError:
+        raise UploadNotFound(upload_id)
+    return dict(meta, offset=offset)
+
+
+def append_chunk(root: str, upload_id: str, offset: int, stream: BinaryIO,
+                 checksum: Optional[str] = None, max_chunk_bytes: Optional[int] = None) -> int:
+    """
+    Append a chunk read from stream at offset.
+
+    Returns:
+        New offset. On checksum mismatch the chunk is discarded and the offset
+        stays where it was.
+    """
+    state = get_upload(root, upload_id)
+    _, part_path = _paths(root, upload_id)
+
+    with open(part_path, "r+b") as target:
+        if fcntl is not None:
+            fcntl.flock(target, fcntl.LOCK_EX)
+        try:
+            current = os.fstat(target.fileno()).st_size
+            if offset != current:
+                raise UploadOffsetMismatch(current)
+
+            target.seek(offset)
+            digest = hashlib.sha256()
+            received = 0
+            limit = state["size"] - offset
+            if max_chunk_bytes is not None:
+                limit = min(limit, max_chunk_bytes)
+            while True:
+                block = stream.read(COPY_BUFFER_SIZE)
+                if not block:
+                    break
+                received += len(block)
+                if received > limit:
+                    target.truncate(offset)
+                    raise UploadTooLarge(f"Chunk exceeds {limit} bytes")
+                digest.update(block)
+                target.write(block)
+
+            if checksum and digest.hexdigest() != checksum.lower():
+                target.truncate(offset)
+                raise UploadChecksumMismatch("Chunk checksum mismatch")
+            target.flush()
+            return offset + received
+        finally:
+            if fcntl is not None:
+                fcntl.flock(target, fcntl.LOCK_UN)
+
+
+def finalize_upload(root: str, upload_id: str, archive_path: str) -> Dict[str, Any]:
+    """
+    Verify a complete upload and move it to archive_path.
+
+    Raises:
+        UploadOffsetMismatch: Not all bytes were received yet
+        UploadChecksumMismatch: Whole-archive checksum does not match
+    """
+    state = get_upload(root, upload_id)
+    meta_path, part_path = _paths(root, upload_id)
+    if state["offset"] != state["size"]:
+        raise UploadOffsetMismatch(state["offset"])
+
+    if state.get("checksum"):
+        digest = hashlib.sha256()
+        with open(part_path, "rb") as f:
+            for block in iter(lambda: f.read(COPY_BUFFER_SIZE), b""):
+                digest.update(block)
+        if digest.hexdigest() != state["checksum"]:
+            raise UploadChecksumMismatch("Archive checksum mismatch")
+
+    os.replace(part_path, archive_path)
+    os.remove(meta_path)
+    return state
+
+
+def purge_expired_uploads(root: str, ttl_seconds: int) -> int:
+    """Delete sessions older than ttl_seconds; returns number of sessions removed."""
+    removed = 0
+    cutoff = time.time() - ttl_seconds
+    try:
+        entries = list(os.scandir(root))
+    except FileNotFoundError:
+        return 0
+    for entry in entries:
+        if not entry.name.endswith(".json"):
+            continue
+        try:
+            upload_id = entry.name[:-len(".json")]
+            meta_path, part_path = _paths(root, upload_id)
+            # Last activity is the last appended chunk
+            activity_path = part_path if os.path.exists(part_path) else meta_path
+            if os.path.getmtime(activity_path) >= cutoff:
+                continue
+            for path in (part_path, meta_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            removed += 1
+        except (OSError, UploadNotFound):
+            continue
+    return removed
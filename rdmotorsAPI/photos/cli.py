@@ -0,0 +1,86 @@
+"""Maintenance commands for the AutoUSA photo store (``flask photos ...``)."""
+from __future__ import annotations
+
+import os
+import time
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from rdmotorsAPI.photos.blobs import BlobStore
+from rdmotorsAPI.photos.layout import migrate_vin_folder
+from rdmotorsAPI.photos.manifest import load_manifest
+from rdmotorsAPI.photos.reconcile import RECONCILE_MODES, reconcile_photos
+from rdmotorsAPI.photos.service import get_photo_layout, get_photos_blob_dir, get_photos_staging_dir
+
+photos_cli = AppGroup("photos", help="AutoUSA photo store maintenance.")
+
+
+@photos_cli.command("gc")
+@click.option("--dry-run", is_flag=True, help="Only report orphaned blobs.")
+@click.option("--grace", type=int, default=None, help="Keep blobs linked or unlinked within this many seconds.")
+def gc_command(dry_run, grace):
+    """Delete blobs no gallery links to."""
+    if grace is None:
+        grace = current_app.config.get("PHOTO_BLOB_GC_GRACE_SECONDS", 3600)
+    removed, reclaimed = BlobStore(get_photos_blob_dir()).collect_garbage(grace_seconds=grace, dry_run=dry_run)
+    verb = "Would remove" if dry_run else "Removed"
+    click.echo(f"{verb} {removed} orphaned blobs ({reclaimed} bytes)")
+
+
+@photos_cli.command("adopt")
+def adopt_command():
+    """Move photos of existing galleries into the blob store, linking duplicates."""
+    blob_store = BlobStore(get_photos_blob_dir())
+    galleries = saved = 0
+    for _, vin_folder in get_photo_layout().iter_vin_folders():
+        manifest = load_manifest(vin_folder)
+        for photo in (manifest or {}).get("photos", []):
+            if blob_store.adopt(os.path.join(vin_folder, photo["name"]), photo["sha256"]):
+                saved += photo["size"]
+        galleries += 1
+    click.echo(f"Adopted {galleries} galleries, {saved} bytes of duplicates now shared")
+
+
+@photos_cli.command("migrate-layout")
+@click.option("--dry-run", is_flag=True, help="Only count galleries still in the flat layout.")
+@click.option("--limit", type=int, default=None, help="Migrate at most this many galleries.")
+@click.option("--pause", type=float, default=0.0, help="Seconds to sleep between galleries (throttles I/O).")
+def migrate_layout_command(dry_run, limit, pause):
+    """Move flat VIN galleries into shard directories while the API keeps serving."""
+    layout = get_photo_layout()
+    if layout.levels == 0:
+        click.echo("PHOTOS_SHARD_LEVELS is 0 (flat layout); nothing to migrate")
+        return
+    staging_root = get_photos_staging_dir()
+    moved = pending = 0
+    for vin in layout.iter_legacy_vins():
+        if limit is not None and moved >= limit:
+            break
+        if dry_run:
+            pending += 1
+            continue
+        if migrate_vin_folder(layout, vin, staging_root):
+            moved += 1
+            if pause:
+                time.sleep(pause)
+    if dry_run:
+        click.echo(f"{pending} galleries use the flat layout")
+    else:
+        click.echo(f"Migrated {moved} galleries")
+
+
+@photos_cli.command("reconcile")
+@click.option("--mode", type=click.Choice(sorted(RECONCILE_MODES)), default=None,
+              help="Defaults to PHOTO_RECONCILE_MODE.")
+@click.option("--min-age", type=float, default=None, help="Skip galleries modified within this many seconds.")
+def reconcile_command(mode, min_age):
+    """Find galleries of VINs missing from the database and quarantine or purge them."""
+    report = reconcile_photos(mode=mode, min_age=min_age)
+    click.echo(
+        f"Scanned {report.scanned} galleries, {report.orphans} orphaned ({report.orphan_bytes} bytes), "
+        f"reclaimed {report.reclaimed_bytes} bytes"
+    )
+    for vin in report.orphan_vins:
+        click.echo(f"  {vin}")
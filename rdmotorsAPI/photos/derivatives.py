@@ -0,0 +1,180 @@
+"""Responsive-size derivatives of AutoUSA photos.
+
+Each uploaded original gets downscaled copies (``sizes/<width>/<name>.<format>``
+inside the VIN folder) so galleries and thumbnails never download multi-megabyte
+originals. Encoding is CPU heavy, so it runs in a process pool instead of the
+request worker's threads. EXIF orientation is applied and metadata is dropped.
+"""
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from rdmotorsAPI.photos.imageinfo import read_image_size
+
+DERIVATIVES_DIR = "sizes"
+DERIVATIVE_FORMATS = {"webp": "WEBP", "jpeg": "JPEG"}
+DERIVATIVE_EXTENSIONS = {".webp", ".jpeg"}
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def derivatives_available() -> bool:
+    """Check whether Pillow is installed."""
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def derivative_name(name: str, fmt: str) -> str:
+    """Derivative file name for an original (keeps the original extension to avoid collisions)."""
+    return f"{name}.{fmt}"
+
+
+def derivative_path(width: int, name: str, fmt: str) -> str:
+    """Path of a derivative relative to the VIN folder."""
+    return f"{DERIVATIVES_DIR}/{width}/{derivative_name(name, fmt)}"
+
+
+def render_derivatives(source_path: str, vin_folder: str, widths: Sequence[int],
+                       fmt: str = "webp", quality: int = 80) -> List[Dict[str, Any]]:
+    """
+    Render downscaled copies of one image (runs inside a pool worker).
+
+    Args:
+        source_path: Original image path
+        vin_folder: VIN folder that receives the sizes/<width>/ files
+        widths: Target widths; widths not smaller than the original are skipped
+        fmt: Output format ("webp" or "jpeg")
+        quality: Encoder quality (1-100)
+
+    Returns:
+        List of derivative entries (width, height, name, size)
+    """
+    from PIL import Image, ImageOps
+
+    name = os.path.basename(source_path)
+    results = []
+    with Image.open(source_path) as original:
+        image = ImageOps.exif_transpose(original)
+        target_mode = "RGBA" if fmt == "webp" and "A" in image.getbands() else "RGB"
+        if image.mode != target_mode:
+            image = image.convert(target_mode)
+
+        for width in sorted(set(widths)):
+            if width >= image.width:
+                continue
+            height = max(1, round(image.height * width / image.width))
+            resized = image.resize((width, height), Image.Resampling.LANCZOS)
+
+            rel_path = derivative_path(width, name, fmt)
+            dest_path = os.path.join(vin_folder, rel_path)
+            os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+            temp_path = f"{dest_path}.tmp"
+            # No exif= argument: metadata (GPS, camera serials) is not copied to derivatives
+            resized.save(temp_path, DERIVATIVE_FORMATS[fmt], quality=quality, optimize=True)
+            os.replace(temp_path, dest_path)
+            results.append({
+                "width": width,
+                "height": height,
+                "name": rel_path,
+                "size": os.path.getsize(dest_path),
+            })
+    return results
+
+
+def get_pool(workers: int) -> ProcessPoolExecutor:
+    """Get the shared image process pool (derivatives and recompression)."""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            # spawn: forking a multi-threaded web worker is unsafe
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _pool_workers = workers
+        return _pool
+
+
+def shutdown_pool() -> None:
+    """Stop the image process pool (used on worker exit and in tests)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True)
+            _pool = None
+
+
+def generate_derivatives(vin_folder: str, names: Iterable[str], widths: Sequence[int],
+                         fmt: str = "webp", quality: int = 80, workers: int = 2) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Generate derivatives for photos of a VIN folder.
+
+    Args:
+        workers: Process pool size; 0 renders inline in the calling thread
+
+    Returns:
+        Mapping of original name -> derivative entries. Images that fail to
+        render are logged and left without derivatives.
+    """
+    if fmt not in DERIVATIVE_FORMATS:
+        raise ValueError(f"Unsupported derivative format: {fmt}")
+    names = list(names)
+    if not names or not widths:
+        return {}
+    if not derivatives_available():
+        logging.warning("Pillow is not installed; skipping photo derivatives for %s", vin_folder)
+        return {}
+
+    results: Dict[str, List[Dict[str, Any]]] = {}
+    if workers <= 0:
+        for name in names:
+            try:
+                results[name] = render_derivatives(os.path.join(vin_folder, name), vin_folder, widths, fmt, quality)
+            except Exception as e:
+                logging.error("Failed to render derivatives for %s/%s: %s", vin_folder, name, e)
+        return results
+
+    pool = get_pool(workers)
+    futures = {
+        name: pool.submit(render_derivatives, os.path.join(vin_folder, name), vin_folder, list(widths), fmt, quality)
+        for name in names
+    }
+    for name, future in futures.items():
+        try:
+            results[name] = future.result()
+        except Exception as e:
+            logging.error("Failed to render derivatives for %s/%s: %s", vin_folder, name, e)
+    return results
+
+
+def scan_derivatives(vin_folder: str) -> Dict[str, List[Dict[str, Any]]]:
+    """Discover existing derivatives on disk (used when a manifest is rebuilt)."""
+    base = os.path.join(vin_folder, DERIVATIVES_DIR)
+    results: Dict[str, List[Dict[str, Any]]] = {}
+    try:
+        width_dirs = [entry for entry in os.scandir(base) if entry.is_dir() and entry.name.isdigit()]
+    except FileNotFoundError:
+        return results
+
+    for width_dir in sorted(width_dirs, key=lambda entry: int(entry.name)):
+        for entry in os.scandir(width_dir.path):
+            stem, ext = os.path.splitext(entry.name)
+            if ext not in DERIVATIVE_EXTENSIONS or not entry.is_file():
+                continue
+            width, height = read_image_size(entry.path)
+            results.setdefault(stem, []).append({
+                "width": int(width_dir.name),
+                "height": height,
+                "name": f"{DERIVATIVES_DIR}/{width_dir.name}/{entry.name}",
+                "size": entry.stat().st_size,
+            })
+    return results
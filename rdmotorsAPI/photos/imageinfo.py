@@ -0,0 +1,88 @@
+"""Lightweight image inspection helpers (no image decoding)."""
+from __future__ import annotations
+
+import hashlib
+import os
+import struct
+import zlib
+from typing import Optional, Tuple
+
+
+def _read_png_size(f) -> Optional[Tuple[int, int]]:
+    header = f.read(24)
+    if len(header) < 24 or header[:8] != b"\x89PNG\r\n\x1a\n" or header[12:16] != b"IHDR":
+        return None
+    width, height = struct.unpack(">II", header[16:24])
+    return width, height
+
+
+def _read_jpeg_size(f) -> Optional[Tuple[int, int]]:
+    if f.read(2) != b"\xff\xd8":
+        return None
+    while True:
+        byte = f.read(1)
+        while byte and byte != b"\xff":
+            byte = f.read(1)
+        while byte == b"\xff":
+            byte = f.read(1)
+        if not byte:
+            return None
+        marker = byte[0]
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+            continue
+        length_bytes = f.read(2)
+        if len(length_bytes) < 2:
+            return None
+        length = struct.unpack(">H", length_bytes)[0]
+        # SOF0..SOF15 except DHT (C4), JPG (C8) and DAC (CC) carry the frame size
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            data = f.read(5)
+            if len(data) < 5:
+                return None
+            height, width = struct.unpack(">HH", data[1:5])
+            return width, height
+        f.seek(length - 2, os.SEEK_CUR)
+
+
+def _read_webp_size(f) -> Optional[Tuple[int, int]]:
+    header = f.read(30)
+    if len(header) < 30 or header[:4] != b"RIFF" or header[8:12] != b"WEBP":
+        return None
+    chunk = header[12:16]
+    if chunk == b"VP8X":
+        width = int.from_bytes(header[24:27], "little") + 1
+        height = int.from_bytes(header[27:30], "little") + 1
+        return width, height
+    if chunk == b"VP8 ":
+        width, height = struct.unpack("<HH", header[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b"VP8L":
+        bits = int.from_bytes(header[21:25], "little")
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    return None
+
+
+def read_image_size(path: str) -> Tuple[Optional[int], Optional[int]]:
+    """Read pixel dimensions from a JPEG/PNG/WebP header without decoding the image."""
+    try:
+        with open(path, "rb") as f:
+            size = None
+            for reader in (_read_png_size, _read_webp_size, _read_jpeg_size):
+                f.seek(0)
+                size = reader(f)
+                if size is not None:
+                    break
+    except (OSError, struct.error):
+        size = None
+    return size if size else (None, None)
+
+
+def checksum_file(path: str, chunk_size: int = 1024 * 1024) -> Tuple[str, int]:
+    """Compute sha256 hex digest and CRC-32 (as stored in ZIP headers) of a file in one pass."""
+    digest = hashlib.sha256()
+    crc = 0
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+            crc = zlib.crc32(chunk, crc)
+    return digest.hexdigest(), crc
@@ -0,0 +1,358 @@
+"""ZIP ingestion of AutoUSA photo galleries.
+
+Uploads are extracted into a staging directory next to the live galleries, with
+bounded parallel writes and zip-bomb limits. The staging directory starts as a
+hard-linked copy of the current gallery (uploads add to a gallery, they do not
+replace it), receives the new files, derivatives and manifest, and is then
+swapped with the live directory in a single rename so readers never see a
+half-written gallery.
+
+Members whose size and CRC-32 match the current manifest entry are verified by
+hashing the decompressed stream and left untouched when unchanged, so
+re-uploading a gallery writes nothing. With a ``BlobStore`` every new file is
+hard-linked from the content-addressed store, so identical photos uploaded for
+several VINs are kept on disk once.
+
+An optional ``recompress`` step re-encodes new photos before derivatives are
+rendered; their manifest entries keep the uploaded ``original`` hashes, so the
+unchanged-member check still matches when the same archive is uploaded again.
+"""
+from __future__ import annotations
+
+import contextlib
+import ctypes
+import ctypes.util
+import hashlib
+import logging
+import os
+import pathlib
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from zipfile import ZipFile, ZipInfo
+
+from werkzeug.utils import secure_filename
+
+from rdmotorsAPI.photos.blobs import BlobStore
+from rdmotorsAPI.photos.manifest import (
+    MANIFEST_NAME,
+    build_manifest,
+    is_photo_name,
+    load_manifest,
+    manifest_cache,
+    write_manifest,
+)
+
+try:
+    import fcntl
+except ImportError:  # Windows development machines: in-process locking only
+    fcntl = None
+
+COPY_BUFFER_SIZE = 1024 * 1024
+_RENAME_EXCHANGE = 2
+_AT_FDCWD = -100
+MEMBER_EXTRACTED = "extracted"
+MEMBER_DEDUPLICATED = "deduplicated"
+MEMBER_UNCHANGED = "unchanged"
+_vin_locks: Dict[str, threading.Lock] = {}
+_vin_locks_guard = threading.Lock()
+
+
+class ZipLimitError(ValueError):
+    """Archive exceeds configured member count or uncompressed size."""
+
+
+@dataclass
+class IngestResult:
+    """Outcome and metrics of one gallery upload."""
+    vin: str
+    names: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+    archive_bytes: int = 0
+    written_bytes: int = 0
+    deduplicated_bytes: int = 0
+    recompressed: int = 0
+    recompressed_saved_bytes: int = 0
+    timings: Dict[str, float] = field(default_factory=dict)
+
+    def log(self) -> None:
+        logging.info(
+            "Photo ingest VIN %s: files=%d unchanged=%d archive_bytes=%d written_bytes=%d "
+            "deduplicated_bytes=%d recompressed=%d recompressed_saved_bytes=%d %s",
+            self.vin,
+            len(self.names),
+            len(self.unchanged),
+            self.archive_bytes,
+            self.written_bytes,
+            self.deduplicated_bytes,
+            self.recompressed,
+            self.recompressed_saved_bytes,
+            " ".join(f"{phase}={seconds:.3f}s" for phase, seconds in self.timings.items()),
+        )
+
+
+@contextlib.contextmanager
+def _timed(result: IngestResult, phase: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        result.timings[phase] = time.perf_counter() - started
+
+
+@contextlib.contextmanager
+def vin_lock(staging_root: str, vin: str):
+    """Serialize publishes of the same VIN across threads and worker processes."""
+    with _vin_locks_guard:
+        thread_lock = _vin_locks.setdefault(vin, threading.Lock())
+    with thread_lock:
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(staging_root, f"{vin}.lock"), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _exchange_dirs(staging: str, live: str) -> bool:
+    """Atomically exchange two directories with renameat2(RENAME_EXCHANGE) when available."""
+    libc_name = ctypes.util.find_library("c")
+    if not libc_name:
+        return False
+    libc = ctypes.CDLL(libc_name, use_errno=True)
+    renameat2 = getattr(libc, "renameat2", None)
+    if renameat2 is None:
+        return False
+    result = renameat2(_AT_FDCWD, os.fsencode(staging), _AT_FDCWD, os.fsencode(live), _RENAME_EXCHANGE)
+    return result == 0
+
+
+def publish_directory(staging: str, live: str) -> None:
+    """Make staging the live directory; the previous live contents are removed."""
+    if not os.path.isdir(live):
+        os.makedirs(os.path.dirname(live), exist_ok=True)
+        os.rename(staging, live)
+    elif _exchange_dirs(staging, live):
+        shutil.rmtree(staging, ignore_errors=True)
+    else:
+        # Fallback: two renames; readers may miss the gallery for the instant between them
+        retired = f"{staging}.old"
+        os.rename(live, retired)
+        os.rename(staging, live)
+        shutil.rmtree(retired, ignore_errors=True)
+    manifest_cache.invalidate(live)
+
+
+def _link_tree(source: str, target: str) -> None:
+    """Recreate source tree in target with hard links (copies when linking is not possible)."""
+    for entry in os.scandir(source):
+        if entry.name == MANIFEST_NAME:
+            continue
+        dest = os.path.join(target, entry.name)
+        if entry.is_dir(follow_symlinks=False):
+            os.makedirs(dest, exist_ok=True)
+            _link_tree(entry.path, dest)
+        elif entry.is_file(follow_symlinks=False):
+            try:
+                os.link(entry.path, dest)
+            except OSError:
+                shutil.copy2(entry.path, dest)
+
+
+def select_members(zip_ref: ZipFile, max_members: int, max_uncompressed_bytes: int) -> Dict[str, ZipInfo]:
+    """
+    Pick photo members of an archive and enforce zip-bomb limits.
+
+    Returns:
+        Mapping of safe file name -> ZipInfo (later members win on duplicate names)
+    """
+    infos = zip_ref.infolist()
+    if len(infos) > max_members:
+        raise ZipLimitError(f"Archive has {len(infos)} entries; the limit is {max_members}")
+
+    members: Dict[str, ZipInfo] = {}
+    for zip_info in infos:
+        # Ігноруємо AppleDouble, __MACOSX і службові файли від macOS
+        if zip_info.is_dir() or "__MACOSX" in zip_info.filename or zip_info.filename.startswith("._"):
+            continue
+        safe_name = secure_filename(pathlib.Path(zip_info.filename).name)
+        if is_photo_name(safe_name):
+            members[safe_name] = zip_info
+
+    total = sum(info.file_size for info in members.values())
+    if total > max_uncompressed_bytes:
+        raise ZipLimitError(
+            f"Archive expands to {total} bytes; the limit is {max_uncompressed_bytes}"
+        )
+    return members
+
+
+def _hash_member(zip_ref: ZipFile, zip_info: ZipInfo) -> str:
+    digest = hashlib.sha256()
+    with zip_ref.open(zip_info) as source:
+        for block in iter(lambda: source.read(COPY_BUFFER_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _extract_member(zip_ref: ZipFile, zip_info: ZipInfo, dest_path: str,
+                    blob_store: Optional[BlobStore] = None,
+                    current_sha256: Optional[str] = None) -> Tuple[str, int, str]:
+    """
+    Extract one member into the staged gallery.
+
+    Returns:
+        (status, bytes written, sha256) where status is one of MEMBER_EXTRACTED,
+        MEMBER_DEDUPLICATED or MEMBER_UNCHANGED
+    """
+    if current_sha256 is not None and _hash_member(zip_ref, zip_info) == current_sha256:
+        return MEMBER_UNCHANGED, 0, current_sha256
+
+    # Write to a new inode: dest may be a hard link shared with the live gallery
+    part_path = f"{dest_path}.part"
+    digest = hashlib.sha256()
+    with zip_ref.open(zip_info) as source, open(part_path, "wb") as target:
+        for block in iter(lambda: source.read(COPY_BUFFER_SIZE), b""):
+            digest.update(block)
+            target.write(block)
+        written = target.tell()
+    sha256 = digest.hexdigest()
+
+    if blob_store is None:
+        os.replace(part_path, dest_path)
+        return MEMBER_EXTRACTED, written, sha256
+    if blob_store.store_and_link(part_path, sha256, dest_path):
+        return MEMBER_DEDUPLICATED, written, sha256
+    return MEMBER_EXTRACTED, written, sha256
+
+
+def _current_photos(vin_folder: str) -> Dict[str, Dict[str, Any]]:
+    manifest = load_manifest(vin_folder) if os.path.isdir(vin_folder) else None
+    return {photo["name"]: photo for photo in (manifest or {}).get("photos", [])}
+
+
+def ingest_zip(
+    zip_path: str,
+    vin: str,
+    vin_folder: str,
+    staging_root: str,
+    max_members: int = 2000,
+    max_uncompressed_bytes: int = 1024 * 1024 * 1024,
+    workers: int = 4,
+    post_process: Optional[Callable[[str, Iterable[str]], object]] = None,
+    on_file: Optional[Callable[[str, int, int, int], None]] = None,
+    blob_store: Optional[BlobStore] = None,
+    recompress: Optional[Callable[[str, Dict[str, str]], Dict[str, Dict[str, Any]]]] = None,
+) -> IngestResult:
+    """
+    Extract photos from a ZIP archive and publish them into a VIN gallery.
+
+    Args:
+        zip_path: Uploaded archive path
+        vin: Vehicle VIN (used for locking and logging)
+        vin_folder: Live gallery directory
+        staging_root: Directory on the same filesystem used for staging
+        max_members: Maximum number of archive entries
+        max_uncompressed_bytes: Maximum total uncompressed size of extracted photos
+        workers: Number of parallel extraction threads
+        post_process: Callback run on the staged gallery with the new or changed
+            names (e.g. derivative generation) before the manifest is written
+        on_file: Progress callback called as on_file(name, written_bytes, done, total)
+            from the calling thread after each processed file
+        blob_store: Content-addressed store new files are linked from; blobs
+            only referenced by replaced files are released after publishing
+        recompress: Callback run on the staged gallery with name -> sha256 of
+            the new or changed photos; re-encodes them in place and returns
+            name -> (sha256, crc32, size) entries of the files it replaced
+
+    Raises:
+        ZipLimitError: Archive exceeds limits
+        BadZipFile: Archive is corrupt
+    """
+    result = IngestResult(vin=vin, archive_bytes=os.path.getsize(zip_path))
+    os.makedirs(staging_root, exist_ok=True)
+
+    with ZipFile(zip_path, "r") as zip_ref:
+        members = select_members(zip_ref, max_members, max_uncompressed_bytes)
+
+        with vin_lock(staging_root, vin):
+            staging = tempfile.mkdtemp(prefix=f"{vin}.", dir=staging_root)
+            try:
+                os.chmod(staging, 0o755)  # mkdtemp creates 0700; the proxy must be able to read galleries
+                with _timed(result, "stage"):
+                    current = _current_photos(vin_folder)
+                    if os.path.isdir(vin_folder):
+                        _link_tree(vin_folder, staging)
+
+                known_hashes = {name: (photo.get("sha256"), photo.get("crc32")) for name, photo in current.items()}
+                originals = {name: photo["original"] for name, photo in current.items() if "original" in photo}
+                with _timed(result, "extract"):
+                    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+                        futures = {}
+                        for name, info in members.items():
+                            # Re-encoded photos are compared with what was uploaded, not what is stored
+                            photo = current.get(name, {})
+                            photo = photo.get("original", photo)
+                            same_header = (
+                                photo.get("crc32") == info.CRC
+                                and photo.get("size") == info.file_size
+                            )
+                            futures[name] = executor.submit(
+                                _extract_member, zip_ref, info, os.path.join(staging, name),
+                                blob_store, photo["sha256"] if same_header else None,
+                            )
+                        for done, (name, future) in enumerate(futures.items(), start=1):
+                            status, written, sha256 = future.result()
+                            result.written_bytes += written
+                            if status == MEMBER_UNCHANGED:
+                                result.unchanged.append(name)
+                            else:
+                                known_hashes[name] = (sha256, members[name].CRC)
+                                originals.pop(name, None)
+                                result.names.append(name)
+                            if status == MEMBER_DEDUPLICATED:
+                                result.deduplicated_bytes += written
+                            if on_file is not None:
+                                on_file(name, written, done, len(futures))
+
+                if recompress is not None and result.names:
+                    with _timed(result, "recompress"):
+                        hashes = {name: known_hashes[name][0] for name in result.names}
+                        for name, entry in recompress(staging, hashes).items():
+                            info = members[name]
+                            originals[name] = {"sha256": hashes[name], "crc32": info.CRC, "size": info.file_size}
+                            known_hashes[name] = (entry["sha256"], entry["crc32"])
+                            result.recompressed += 1
+                            result.recompressed_saved_bytes += info.file_size - entry["size"]
+                            if blob_store is not None:
+                                blob_store.adopt(os.path.join(staging, name), entry["sha256"])
+
+                if post_process is not None and result.names:
+                    with _timed(result, "post_process"):
+                        post_process(staging, result.names)
+
+                with _timed(result, "manifest"):
+                    write_manifest(staging, build_manifest(staging, known_hashes, originals))
+
+                with _timed(result, "publish"):
+                    publish_directory(staging, vin_folder)
+            except BaseException:
+                shutil.rmtree(staging, ignore_errors=True)
+                raise
+
+            if blob_store is not None:
+                replaced = [current[name]["sha256"] for name in result.names if name in current]
+                # Blobs of re-encoded uploads are only linked from the discarded staging copy
+                replaced.extend(originals[name]["sha256"] for name in result.names if name in originals)
+                blob_store.release(replaced)
+
+    result.log()
+    return result
+
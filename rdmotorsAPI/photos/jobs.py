@@ -0,0 +1,181 @@
+"""Asynchronous photo ingestion jobs.
+
+An async upload persists the archive next to the staging directory, records a
+``PhotoJob`` row and returns immediately. A runner processes the job in the
+background; state lives in the database, so queued jobs (and jobs orphaned by a
+crashed worker) are picked up again after a restart.
+
+Runners:
+    ``thread``: local thread pool inside each app process (production)
+    ``inline``: runs the job in the submitting thread (tests, debugging)
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from zipfile import BadZipFile
+
+from flask import current_app
+from sqlalchemy.exc import SQLAlchemyError
+
+from rdmotorsAPI.models import PhotoJob, db
+from rdmotorsAPI.photos.ingest import ZipLimitError
+from rdmotorsAPI.photos.service import ingest_archive
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+PROGRESS_FLUSH_SECONDS = 1.0
+
+
+def _claim_job(job_id: str) -> bool:
+    """Atomically move a job from queued to running; False when another worker owns it."""
+    claimed = (
+        db.session.query(PhotoJob)
+        .filter_by(id=job_id, status=JOB_QUEUED)
+        .update({"status": JOB_RUNNING, "started_at": datetime.utcnow()}, synchronize_session=False)
+    )
+    db.session.commit()
+    return claimed == 1
+
+
+def process_photo_job(app, job_id: str) -> None:
+    """Run one queued job to completion inside its own app context."""
+    with app.app_context():
+        try:
+            if not _claim_job(job_id):
+                return
+            job = db.session.get(PhotoJob, job_id)
+            files = []
+            last_flush = time.monotonic()
+
+            def on_file(name, written, done, total):
+                nonlocal last_flush
+                files.append({"name": name, "bytes": written, "status": "extracted"})
+                job.files_total = total
+                job.files_done = done
+                job.bytes_written = (job.bytes_written or 0) + written
+                if time.monotonic() - last_flush >= PROGRESS_FLUSH_SECONDS:
+                    job.results = json.dumps(files)
+                    db.session.commit()
+                    last_flush = time.monotonic()
+
+            try:
+                ingest_archive(job.archive_path, job.vin, on_file=on_file)
+                for entry in files:
+                    entry["status"] = "published"
+                job.status = JOB_SUCCEEDED
+            except (ZipLimitError, BadZipFile) as e:
+                job.status = JOB_FAILED
+                job.error = str(e)[:500]
+            except Exception as e:
+                logging.error("Photo job %s for VIN %s failed: %s", job_id, job.vin, e)
+                job.status = JOB_FAILED
+                job.error = str(e)[:500]
+            finally:
+                if os.path.exists(job.archive_path):
+                    os.remove(job.archive_path)
+
+            job.results = json.dumps(files)
+            job.finished_at = datetime.utcnow()
+            db.session.commit()
+            logging.info("Photo job %s for VIN %s finished: %s", job_id, job.vin, job.status)
+        except Exception:
+            db.session.rollback()
+            logging.exception("Photo job %s crashed", job_id)
+        finally:
+            db.session.remove()
+
+
+class InlineJobRunner:
+    """Runs jobs synchronously in the submitting thread."""
+
+    def __init__(self, app):
+        self.app = app
+
+    def submit(self, job_id: str) -> None:
+        process_photo_job(self.app, job_id)
+
+    def shutdown(self) -> None:
+        pass
+
+
+class ThreadJobRunner:
+    """Runs jobs on a local background thread pool."""
+
+    def __init__(self, app, workers: int = 2):
+        self.app = app
+        self.executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="photo-job")
+
+    def submit(self, job_id: str) -> None:
+        self.executor.submit(process_photo_job, self.app, job_id)
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=True)
+
+
+def get_job_runner():
+    """Get the job runner of the current app."""
+    return current_app.extensions["photo_job_runner"]
+
+
+def enqueue_photo_job(vin: str, archive_path: str) -> PhotoJob:
+    """Persist a job for an uploaded archive and hand it to the runner."""
+    job = PhotoJob(
+        id=uuid.uuid4().hex,
+        vin=vin,
+        status=JOB_QUEUED,
+        archive_path=archive_path,
+        files_done=0,
+        bytes_written=0,
+        created_at=datetime.utcnow(),
+    )
+    db.session.add(job)
+    db.session.commit()
+    get_job_runner().submit(job.id)
+    db.session.refresh(job)
+    return job
+
+
+def recover_photo_jobs(app) -> int:
+    """Requeue stale running jobs and resubmit queued ones; returns number of jobs submitted."""
+    stale_seconds = app.config.get("PHOTO_JOB_STALE_SECONDS", 3600)
+    with app.app_context():
+        try:
+            cutoff = datetime.utcnow() - timedelta(seconds=stale_seconds)
+            db.session.query(PhotoJob).filter(
+                PhotoJob.status == JOB_RUNNING, PhotoJob.started_at < cutoff
+            ).update({"status": JOB_QUEUED}, synchronize_session=False)
+            db.session.commit()
+            job_ids = [row.id for row in db.session.query(PhotoJob.id).filter_by(status=JOB_QUEUED)]
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            logging.warning("Photo job recovery skipped: %s", e)
+            return 0
+        finally:
+            db.session.remove()
+
+    runner = app.extensions["photo_job_runner"]
+    for job_id in job_ids:
+        runner.submit(job_id)
+    if job_ids:
+        logging.info("Resubmitted %d photo jobs after restart", len(job_ids))
+    return len(job_ids)
+
+
+def init_photo_jobs(app) -> None:
+    """Create the configured job runner and pick up unfinished jobs."""
+    runner_name = app.config.get("PHOTO_JOB_RUNNER", "thread")
+    if runner_name == "inline":
+        app.extensions["photo_job_runner"] = InlineJobRunner(app)
+        return
+    if runner_name != "thread":
+        raise RuntimeError(f"Unsupported PHOTO_JOB_RUNNER '{runner_name}'. Use 'thread' or 'inline'")
+    app.extensions["photo_job_runner"] = ThreadJobRunner(app, app.config.get("PHOTO_JOB_WORKERS", 2))
+    recover_photo_jobs(app)
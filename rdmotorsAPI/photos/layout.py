@@ -0,0 +1,122 @@
+"""On-disk layout of the AutoUSA photo tree.
+
+Galleries live in shard directories named after the leading hex digits of the
+VIN's sha1 (``<root>/<ab>/<vin>/`` with one level of two digits), keeping every
+directory small. VIN prefixes themselves are not used as shard keys: the first
+characters are the manufacturer code, so a handful of shards would hold most
+vehicles. ``levels=0`` is the legacy flat layout (``<root>/<vin>/``).
+
+Folders still in the flat layout are found as a fallback, so the tree can be
+migrated online, one VIN at a time, while the API keeps serving.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import string
+from typing import Iterator, List, Tuple
+
+from rdmotorsAPI.photos.ingest import vin_lock
+from rdmotorsAPI.photos.manifest import manifest_cache
+
+
+class PhotoLayout:
+    """Maps VINs to gallery directories under the photo root."""
+
+    def __init__(self, root: str, levels: int = 1, width: int = 2):
+        self.root = root
+        self.levels = max(0, levels)
+        self.width = max(1, width)
+
+    def shard_parts(self, vin: str) -> List[str]:
+        digest = hashlib.sha1(vin.encode("utf-8")).hexdigest()
+        return [digest[i * self.width:(i + 1) * self.width] for i in range(self.levels)]
+
+    def vin_folder(self, vin: str) -> str:
+        """Gallery directory of a VIN in the configured layout (where uploads are published)."""
+        return os.path.join(self.root, *self.shard_parts(vin), vin)
+
+    def legacy_folder(self, vin: str) -> str:
+        return os.path.join(self.root, vin)
+
+    def resolve(self, vin: str) -> str:
+        """
+        Existing gallery directory of a VIN.
+
+        Returns:
+            The configured location, or the flat location for galleries not
+            migrated yet; the configured location when neither exists.
+        """
+        target = self.vin_folder(vin)
+        if self.levels == 0 or os.path.isdir(target):
+            return target
+        legacy = self.legacy_folder(vin)
+        if os.path.isdir(legacy):
+            return legacy
+        # Neither exists, or the folder was migrated between the two checks
+        return target
+
+    def relative_path(self, folder: str) -> str:
+        """URL-style path of a gallery directory relative to the root (for X-Accel-Redirect)."""
+        return os.path.relpath(folder, self.root).replace(os.sep, "/")
+
+    def is_shard_name(self, name: str) -> bool:
+        return len(name) == self.width and all(char in string.hexdigits for char in name)
+
+    def iter_vin_folders(self) -> Iterator[Tuple[str, str]]:
+        """Yield (vin, folder) for all galleries in both layouts; dot directories are skipped."""
+        yield from self._iter_level(self.root, self.levels)
+
+    def _iter_level(self, directory: str, levels: int) -> Iterator[Tuple[str, str]]:
+        try:
+            entries = os.scandir(directory)
+        except FileNotFoundError:
+            return
+        # Entries are consumed lazily, so huge directories are never listed into memory
+        with entries:
+            for entry in entries:
+                if entry.name.startswith(".") or not entry.is_dir(follow_symlinks=False):
+                    continue
+                if levels > 0 and self.is_shard_name(entry.name):
+                    yield from self._iter_level(entry.path, levels - 1)
+                elif directory == self.root or levels == 0:
+                    yield entry.name, entry.path
+
+    def iter_legacy_vins(self) -> Iterator[str]:
+        """VINs whose gallery still uses the flat layout."""
+        if self.levels == 0:
+            return
+        for entry in os.scandir(self.root):
+            if entry.name.startswith(".") or self.is_shard_name(entry.name):
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                yield entry.name
+
+
+def migrate_vin_folder(layout: PhotoLayout, vin: str, staging_root: str) -> bool:
+    """
+    Move one flat gallery to its shard with a single rename.
+
+    Takes the VIN's upload lock, so it is safe to run while the API serves uploads.
+
+    Returns:
+        True when the gallery was moved
+    """
+    legacy = layout.legacy_folder(vin)
+    target = layout.vin_folder(vin)
+    if legacy == target or not os.path.isdir(legacy):
+        return False
+
+    os.makedirs(staging_root, exist_ok=True)
+    with vin_lock(staging_root, vin):
+        if not os.path.isdir(legacy):
+            return False
+        if os.path.exists(target):
+            logging.warning("Not migrating photos of VIN %s: %s already exists", vin, target)
+            return False
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.rename(legacy, target)
+    manifest_cache.invalidate(legacy)
+    manifest_cache.invalidate(target)
+    return True
@@ -0,0 +1,167 @@
+"""Per-VIN photo manifests.
+
+Every VIN gallery folder holds a ``.manifest.json`` file listing its photos with
+size, pixel dimensions and content hashes (sha256 for the blob store, CRC-32 to
+recognise unchanged archive members without extracting them). Photos re-encoded
+at ingest also record the uploaded ``original`` (sha256, crc32, size). Listing a gallery then costs a single
+``stat`` of the manifest (validated against an in-process cache) instead of a
+directory scan of the photo volume.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import pathlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from rdmotorsAPI.metrics import record_cache
+from rdmotorsAPI.photos.derivatives import scan_derivatives
+from rdmotorsAPI.photos.imageinfo import checksum_file, read_image_size
+
+MANIFEST_NAME = ".manifest.json"
+MANIFEST_VERSION = 1
+ALLOWED_EXTENSIONS = {'.jpg', '.jpeg', '.png'}
+SKIP_NAMES = {"DS_Store"}
+
+
+def is_photo_name(name: str) -> bool:
+    """Check whether a gallery file name is a servable photo."""
+    if not name or name.startswith('.') or name in SKIP_NAMES:
+        return False
+    return pathlib.Path(name).suffix.lower() in ALLOWED_EXTENSIONS
+
+
+def describe_photo(path: str, sha256: Optional[str] = None,
+                   derivatives: Optional[List[Dict[str, Any]]] = None,
+                   crc32: Optional[int] = None, original: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Build a manifest entry for a single photo file (hashes are computed unless given)."""
+    width, height = read_image_size(path)
+    if sha256 is None or crc32 is None:
+        sha256, crc32 = checksum_file(path)
+    entry = {
+        "name": os.path.basename(path),
+        "size": os.path.getsize(path),
+        "width": width,
+        "height": height,
+        "sha256": sha256,
+        "crc32": crc32,
+        "derivatives": derivatives or [],
+    }
+    if original is not None:
+        entry["original"] = original
+    return entry
+
+
+def build_manifest(vin_folder: str,
+                   known_hashes: Optional[Dict[str, Tuple[str, Optional[int]]]] = None,
+                   originals: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """
+    Scan a VIN folder (originals and their size derivatives) and build its manifest.
+
+    Args:
+        vin_folder: Gallery directory
+        known_hashes: Optional name -> (sha256, crc32) of files whose content is
+            already known (e.g. just extracted), so they are not read again
+        originals: Optional name -> uploaded original of re-encoded photos
+    """
+    known_hashes = known_hashes or {}
+    originals = originals or {}
+    names = sorted(name for name in os.listdir(vin_folder) if is_photo_name(name))
+    derivatives = scan_derivatives(vin_folder)
+    photos = []
+    for name in names:
+        sha256, crc32 = known_hashes.get(name, (None, None))
+        photos.append(describe_photo(
+            os.path.join(vin_folder, name), sha256=sha256, derivatives=derivatives.get(name), crc32=crc32,
+            original=originals.get(name),
+        ))
+    return {"version": MANIFEST_VERSION, "photos": photos}
+
+
+def write_manifest(vin_folder: str, manifest: Dict[str, Any]) -> None:
+    """Write manifest atomically so readers never see a partial file."""
+    path = os.path.join(vin_folder, MANIFEST_NAME)
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, separators=(",", ":"))
+    os.replace(temp_path, path)
+    manifest_cache.invalidate(vin_folder)
+
+
+class ManifestCache:
+    """In-process LRU of parsed manifests validated by manifest mtime and inode."""
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[tuple, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, vin_folder: str, stamp: tuple) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(vin_folder)
+            if entry is None or entry[0] != stamp:
+                record_cache("photo_manifest", False)
+                return None
+            self._entries.move_to_end(vin_folder)
+            record_cache("photo_manifest", True)
+            return entry[1]
+
+    def put(self, vin_folder: str, stamp: tuple, manifest: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[vin_folder] = (stamp, manifest)
+            self._entries.move_to_end(vin_folder)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, vin_folder: str) -> None:
+        with self._lock:
+            self._entries.pop(vin_folder, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+manifest_cache = ManifestCache()
+
+
+def load_manifest(vin_folder: str) -> Optional[Dict[str, Any]]:
+    """
+    Load manifest of a VIN folder.
+
+    Returns:
+        Manifest dict, or None when the folder does not exist. Galleries uploaded
+        before manifests existed get their manifest built and written on first read.
+    """
+    path = os.path.join(vin_folder, MANIFEST_NAME)
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        if not os.path.isdir(vin_folder):
+            return None
+        manifest = build_manifest(vin_folder)
+        try:
+            write_manifest(vin_folder, manifest)
+        except OSError as e:
+            logging.warning("Could not write photo manifest for %s: %s", vin_folder, e)
+        return manifest
+
+    stamp = (stat.st_mtime_ns, stat.st_ino, stat.st_size)
+    manifest = manifest_cache.get(vin_folder, stamp)
+    if manifest is not None:
+        return manifest
+
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        logging.warning("Rebuilding unreadable photo manifest %s: %s", path, e)
+        manifest = build_manifest(vin_folder)
+        write_manifest(vin_folder, manifest)
+        return manifest
+
+    manifest_cache.put(vin_folder, stamp, manifest)
+    return manifest
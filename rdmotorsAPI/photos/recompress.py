@@ -0,0 +1,138 @@
+"""Re-encoding of uploaded AutoUSA photos to a resolution and quality budget.
+
+Phone originals are often 5-10 MB JPEGs at a resolution no gallery displays.
+At ingest each new photo is downscaled to fit ``max_dimension``, EXIF
+orientation is applied and the image is re-encoded in its own format (names and
+URLs do not change). The re-encoded file replaces the original only when it
+saves at least ``min_savings`` of its size, so already optimised images are not
+put through another lossy generation. Encoding runs in the process pool shared
+with derivative rendering.
+
+Replaced originals can be kept in a cold storage directory, stored by sha256
+(``<root>/aa/bb/<sha256>``) and recorded in the manifest entry under
+``original``.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import shutil
+from typing import Any, Dict, Optional
+
+from rdmotorsAPI.photos.derivatives import derivatives_available, get_pool
+from rdmotorsAPI.photos.imageinfo import checksum_file
+
+RECOMPRESS_FORMATS = {".jpg": "JPEG", ".jpeg": "JPEG", ".png": "PNG"}
+
+
+def original_path(originals_root: str, sha256: str) -> str:
+    """Cold storage path of a replaced original."""
+    return os.path.join(originals_root, sha256[:2], sha256[2:4], sha256)
+
+
+def keep_original(path: str, sha256: str, originals_root: str) -> None:
+    """Copy an original into cold storage (usually another filesystem, so no hard links)."""
+    dest_path = original_path(originals_root, sha256)
+    if os.path.exists(dest_path):
+        return
+    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+    temp_path = f"{dest_path}.{os.getpid()}.tmp"
+    shutil.copyfile(path, temp_path)
+    os.replace(temp_path, dest_path)
+
+
+def recompress_image(path: str, sha256: str, max_dimension: int, quality: int,
+                     min_savings: float = 0.1, originals_root: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Re-encode one photo in place (runs inside a pool worker).
+
+    Args:
+        path: Photo in the staged gallery; replaced through a new inode, since it
+            may be a hard link shared with the live gallery or the blob store
+        sha256: Digest of the original (cold storage key)
+        max_dimension: Longest side in pixels after downscaling
+        quality: JPEG encoder quality (1-100)
+        min_savings: Fraction of the original size the result must save
+        originals_root: Cold storage directory for originals, or None to drop them
+
+    Returns:
+        Entry of the new file (sha256, crc32, size), or None when the photo was kept
+    """
+    from PIL import Image, ImageOps
+
+    fmt = RECOMPRESS_FORMATS.get(os.path.splitext(path)[1].lower())
+    if fmt is None:
+        return None
+    original_size = os.path.getsize(path)
+    temp_path = f"{path}.recompress"
+    with Image.open(path) as source:
+        icc_profile = source.info.get("icc_profile")
+        image = ImageOps.exif_transpose(source)
+        if max(image.size) > max_dimension:
+            image.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+        options: Dict[str, Any] = {"optimize": True}
+        if icc_profile:
+            options["icc_profile"] = icc_profile
+        if fmt == "JPEG":
+            if image.mode not in ("RGB", "L", "CMYK"):
+                image = image.convert("RGB")
+            options.update(quality=quality, progressive=True)
+        try:
+            # No exif= argument: orientation is applied and metadata (GPS, camera serials) dropped
+            image.save(temp_path, fmt, **options)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    size = os.path.getsize(temp_path)
+    if size > original_size * (1 - min_savings):
+        os.remove(temp_path)
+        return None
+    if originals_root:
+        keep_original(path, sha256, originals_root)
+    os.replace(temp_path, path)
+    new_sha256, crc32 = checksum_file(path)
+    return {"sha256": new_sha256, "crc32": crc32, "size": size}
+
+
+def recompress_photos(vin_folder: str, hashes: Dict[str, str], max_dimension: int = 2560,
+                      quality: int = 85, min_savings: float = 0.1, originals_root: Optional[str] = None,
+                      workers: int = 2) -> Dict[str, Dict[str, Any]]:
+    """
+    Re-encode freshly extracted photos of a gallery.
+
+    Args:
+        vin_folder: Staged gallery directory
+        hashes: Mapping of photo name -> sha256 of the extracted original
+        workers: Process pool size; 0 encodes inline in the calling thread
+
+    Returns:
+        Mapping of name -> new file entry for the photos that were replaced.
+        Photos that fail to re-encode are logged and kept as uploaded.
+    """
+    if not hashes:
+        return {}
+    if not derivatives_available():
+        logging.warning("Pillow is not installed; skipping photo recompression for %s", vin_folder)
+        return {}
+
+    def arguments(name: str, sha256: str) -> tuple:
+        return os.path.join(vin_folder, name), sha256, max_dimension, quality, min_savings, originals_root
+
+    outcomes: Dict[str, Optional[Dict[str, Any]]] = {}
+    if workers <= 0:
+        for name, sha256 in hashes.items():
+            try:
+                outcomes[name] = recompress_image(*arguments(name, sha256))
+            except Exception as e:
+                logging.error("Failed to recompress %s/%s: %s", vin_folder, name, e)
+    else:
+        pool = get_pool(workers)
+        futures = {name: pool.submit(recompress_image, *arguments(name, sha256)) for name, sha256 in hashes.items()}
+        for name, future in futures.items():
+            try:
+                outcomes[name] = future.result()
+            except Exception as e:
+                logging.error("Failed to recompress %s/%s: %s", vin_folder, name, e)
+    return {name: entry for name, entry in outcomes.items() if entry is not None}
@@ -0,0 +1,286 @@
+"""Reconciliation of the AutoUSA photo tree with the ``autousa`` table.
+
+Galleries whose VIN no longer exists (a failed delete, a renamed VIN) are found
+by walking the tree lazily with ``os.scandir`` and checking VINs against the
+database one batch at a time, so memory stays bounded by the batch size however
+large the tree or the table is.
+
+Modes:
+    ``report``: only count orphans and their size
+    ``quarantine``: move orphans to the quarantine directory (a rename on the
+        same filesystem); quarantined galleries are purged after a TTL
+    ``purge``: delete orphans immediately
+
+Every non-report pass also sweeps orphaned blobs of the content-addressed store.
+"""
+from __future__ import annotations
+
+import itertools
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from flask import current_app
+
+from rdmotorsAPI.models import AutoUsa, db
+from rdmotorsAPI.photos.blobs import BlobStore
+from rdmotorsAPI.photos.ingest import vin_lock
+from rdmotorsAPI.photos.manifest import MANIFEST_NAME, manifest_cache
+from rdmotorsAPI.photos.service import (
+    get_blob_store,
+    get_photo_layout,
+    get_photo_storage,
+    get_photos_auto_dir,
+    get_photos_staging_dir,
+)
+
+try:
+    import fcntl
+except ImportError:  # Windows development machines: no cross-process pass locking
+    fcntl = None
+
+RECONCILE_REPORT = "report"
+RECONCILE_QUARANTINE = "quarantine"
+RECONCILE_PURGE = "purge"
+RECONCILE_MODES = {RECONCILE_REPORT, RECONCILE_QUARANTINE, RECONCILE_PURGE}
+MAX_REPORTED_VINS = 100
+
+
+@dataclass
+class ReconcileReport:
+    """Outcome of one reconciliation pass."""
+    mode: str
+    scanned: int = 0
+    orphans: int = 0
+    orphan_vins: List[str] = field(default_factory=list)  # first MAX_REPORTED_VINS only
+    orphan_bytes: int = 0
+    reclaimed_bytes: int = 0
+    expired_quarantines: int = 0
+    duration: float = 0.0
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    def log(self) -> None:
+        logging.info(
+            "Photo reconcile (%s): scanned=%d orphans=%d orphan_bytes=%d reclaimed_bytes=%d "
+            "expired_quarantines=%d duration=%.3fs",
+            self.mode, self.scanned, self.orphans, self.orphan_bytes, self.reclaimed_bytes,
+            self.expired_quarantines, self.duration,
+        )
+
+
+def _batched(items: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(items)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def gallery_usage(folder: str) -> Tuple[int, int]:
+    """
+    Disk usage of a gallery.
+
+    Returns:
+        (apparent bytes, bytes only this gallery links to); photos shared through
+        the blob store are counted in the first number only
+    """
+    apparent = exclusive = 0
+    for dirpath, _, filenames in os.walk(folder):
+        for name in filenames:
+            try:
+                stat = os.stat(os.path.join(dirpath, name))
+            except FileNotFoundError:
+                continue
+            apparent += stat.st_size
+            if stat.st_nlink == 1:
+                exclusive += stat.st_size
+    return apparent, exclusive
+
+
+def _manifest_digests(folder: str) -> List[str]:
+    try:
+        with open(os.path.join(folder, MANIFEST_NAME), "r", encoding="utf-8") as f:
+            return [photo["sha256"] for photo in json.load(f).get("photos", []) if photo.get("sha256")]
+    except (OSError, ValueError):
+        return []
+
+
+def remove_gallery(folder: str, blob_store: Optional[BlobStore] = None) -> int:
+    """Delete a gallery directory and release its blobs; returns bytes reclaimed."""
+    digests = _manifest_digests(folder)
+    _, reclaimed = gallery_usage(folder)
+    shutil.rmtree(folder)
+    manifest_cache.invalidate(folder)
+    if blob_store is not None:
+        reclaimed += blob_store.release(digests)
+    return reclaimed
+
+
+def filter_orphans(batch: List[Tuple[str, str]], min_age: float = 0) -> List[Tuple[str, str]]:
+    """
+    Pick (vin, folder) pairs of a batch whose VIN is not in the autousa table (one query per batch).
+
+    Galleries modified within min_age seconds are skipped (uploads in flight).
+    """
+    vins = [vin for vin, _ in batch]
+    known = {row.vin for row in db.session.query(AutoUsa.vin).filter(AutoUsa.vin.in_(vins))}
+    cutoff = time.time() - min_age
+    orphans = []
+    for vin, folder in batch:
+        if vin in known:
+            continue
+        try:
+            if os.stat(folder).st_mtime > cutoff:
+                continue
+        except FileNotFoundError:
+            continue
+        orphans.append((vin, folder))
+    return orphans
+
+
+def expire_quarantine(quarantine_root: str, ttl: float, blob_store: Optional[BlobStore] = None) -> Tuple[int, int]:
+    """Purge quarantined galleries older than ttl seconds; returns (count, bytes reclaimed)."""
+    removed = reclaimed = 0
+    cutoff = time.time() - ttl
+    try:
+        entries = list(os.scandir(quarantine_root))
+    except FileNotFoundError:
+        return 0, 0
+    for entry in entries:
+        # Entries are named <vin>.<unix time of quarantine>
+        quarantined_at = entry.name.rsplit(".", 1)[-1]
+        if not entry.is_dir(follow_symlinks=False) or not quarantined_at.isdigit():
+            continue
+        if int(quarantined_at) > cutoff:
+            continue
+        reclaimed += remove_gallery(entry.path, blob_store)
+        removed += 1
+    return removed, reclaimed
+
+
+def get_quarantine_dir() -> str:
+    """Get quarantine directory for orphaned galleries (same filesystem as PHOTOS_AUTO_DIR)."""
+    return current_app.config.get("PHOTOS_QUARANTINE_DIR") or os.path.join(get_photos_auto_dir(), ".quarantine")
+
+
+def reconcile_photos(mode: Optional[str] = None, min_age: Optional[float] = None) -> ReconcileReport:
+    """Run one reconciliation pass with app settings (requires an app context)."""
+    config = current_app.config
+    mode = mode or config.get("PHOTO_RECONCILE_MODE", RECONCILE_QUARANTINE)
+    if mode not in RECONCILE_MODES:
+        raise ValueError(f"Unsupported reconcile mode '{mode}'. Use one of: {', '.join(sorted(RECONCILE_MODES))}")
+    if min_age is None:
+        min_age = config.get("PHOTO_RECONCILE_MIN_AGE", 86400)
+
+    report = ReconcileReport(mode=mode)
+    if not get_photo_storage().is_local:
+        logging.info("Photo reconcile skipped: storage backend is not local")
+        return report
+
+    started = time.perf_counter()
+    staging_root = get_photos_staging_dir()
+    quarantine_root = get_quarantine_dir()
+    blob_store = get_blob_store()
+    batch_size = config.get("PHOTO_RECONCILE_BATCH_SIZE", 500)
+    os.makedirs(staging_root, exist_ok=True)
+
+    try:
+        for batch in _batched(get_photo_layout().iter_vin_folders(), batch_size):
+            report.scanned += len(batch)
+            for vin, folder in filter_orphans(batch, min_age):
+                apparent, _ = gallery_usage(folder)
+                report.orphans += 1
+                if len(report.orphan_vins) < MAX_REPORTED_VINS:
+                    report.orphan_vins.append(vin)
+                report.orphan_bytes += apparent
+                if mode == RECONCILE_REPORT:
+                    continue
+                with vin_lock(staging_root, vin):
+                    if not os.path.isdir(folder):
+                        continue
+                    if mode == RECONCILE_PURGE:
+                        report.reclaimed_bytes += remove_gallery(folder, blob_store)
+                    else:
+                        os.makedirs(quarantine_root, exist_ok=True)
+                        os.rename(folder, os.path.join(quarantine_root, f"{vin}.{int(time.time())}"))
+                        manifest_cache.invalidate(folder)
+    finally:
+        db.session.remove()
+
+    if mode != RECONCILE_REPORT:
+        expired, reclaimed = expire_quarantine(
+            quarantine_root, config.get("PHOTO_QUARANTINE_TTL", 7 * 86400), blob_store
+        )
+        report.expired_quarantines = expired
+        report.reclaimed_bytes += reclaimed
+        if blob_store is not None:
+            _, reclaimed = blob_store.collect_garbage(config.get("PHOTO_BLOB_GC_GRACE_SECONDS", 3600))
+            report.reclaimed_bytes += reclaimed
+
+    report.duration = time.perf_counter() - started
+    report.log()
+    return report
+
+
+def run_reconcile_pass(app) -> Optional[ReconcileReport]:
+    """Run a pass unless another process is already reconciling; returns None when skipped."""
+    with app.app_context():
+        staging_root = get_photos_staging_dir()
+        os.makedirs(staging_root, exist_ok=True)
+        with open(os.path.join(staging_root, "reconcile.lock"), "a") as lock_file:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    return None
+            try:
+                return reconcile_photos()
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class PhotoReconciler:
+    """Daemon thread running reconciliation passes every interval seconds."""
+
+    def __init__(self, app, interval: float):
+        self.app = app
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="photo-reconciler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                run_reconcile_pass(self.app)
+            except Exception:
+                logging.exception("Photo reconcile pass failed")
+
+
+def init_photo_reconciler(app) -> None:
+    """Start the background reconciler when PHOTO_RECONCILE_INTERVAL is set."""
+    mode = app.config.get("PHOTO_RECONCILE_MODE", RECONCILE_QUARANTINE)
+    if mode not in RECONCILE_MODES:
+        raise RuntimeError(
+            f"Unsupported PHOTO_RECONCILE_MODE '{mode}'. Use one of: {', '.join(sorted(RECONCILE_MODES))}"
+        )
+    interval = app.config.get("PHOTO_RECONCILE_INTERVAL", 0)
+    if interval <= 0:
+        return
+    reconciler = PhotoReconciler(app, interval)
+    app.extensions["photo_reconciler"] = reconciler
+    reconciler.start()
@@ -0,0 +1,175 @@
+"""App-config aware entry points of the AutoUSA photo pipeline.
+
+Routes and background jobs go through these helpers so path resolution and
+ingest settings live in one place.
+"""
+from __future__ import annotations
+
+import os
+import shutil
+import time
+import uuid
+from typing import Callable, Optional
+
+from flask import current_app
+
+from rdmotorsAPI.metrics import PHOTO_INGEST_DURATION, PHOTO_UPLOAD_BYTES
+from rdmotorsAPI.photos.blobs import BlobStore
+from rdmotorsAPI.photos.derivatives import generate_derivatives
+from rdmotorsAPI.photos.ingest import IngestResult, ingest_zip
+from rdmotorsAPI.photos.layout import PhotoLayout, migrate_vin_folder
+from rdmotorsAPI.photos.manifest import load_manifest, manifest_cache
+from rdmotorsAPI.photos.recompress import recompress_photos
+from rdmotorsAPI.tracing import span
+
+
+def get_photos_auto_dir() -> str:
+    """Get AutoUSA photos directory from app config."""
+    return current_app.config["PHOTOS_AUTO_DIR"]
+
+
+def get_photo_storage():
+    """Get the photo storage backend of the current app (see rdmotorsAPI.photos.storage)."""
+    return current_app.extensions["photo_storage"]
+
+
+def get_photo_layout() -> PhotoLayout:
+    """Get the on-disk layout of the AutoUSA photo tree."""
+    config = current_app.config
+    return PhotoLayout(
+        get_photos_auto_dir(),
+        levels=config.get("PHOTOS_SHARD_LEVELS", 0),
+        width=config.get("PHOTOS_SHARD_WIDTH", 2),
+    )
+
+
+def get_vin_folder(vin: str) -> str:
+    """Get gallery directory of a VIN in the configured layout (upload target)."""
+    return get_photo_layout().vin_folder(vin)
+
+
+def resolve_vin_folder(vin: str) -> str:
+    """Get existing gallery directory of a VIN, including galleries not migrated to shards yet."""
+    return get_photo_layout().resolve(vin)
+
+
+def get_vin_location(vin_folder: str) -> str:
+    """Get X-Accel-Redirect location of a gallery directory."""
+    return f"photos/autousa/{get_photo_layout().relative_path(vin_folder)}"
+
+
+def get_photos_staging_dir() -> str:
+    """Get staging directory for uploads (must share a filesystem with PHOTOS_AUTO_DIR)."""
+    return current_app.config.get("PHOTOS_STAGING_DIR") or os.path.join(get_photos_auto_dir(), ".staging")
+
+
+def get_photos_blob_dir() -> str:
+    """Get content-addressed blob directory (must share a filesystem with PHOTOS_AUTO_DIR)."""
+    return current_app.config.get("PHOTOS_BLOB_DIR") or os.path.join(get_photos_auto_dir(), ".blobs")
+
+
+def get_blob_store() -> Optional[BlobStore]:
+    """Get the blob store, or None when photo deduplication is disabled."""
+    if not current_app.config.get("PHOTO_DEDUP_ENABLED", True):
+        return None
+    return BlobStore(get_photos_blob_dir())
+
+
+def delete_vin_gallery(vin: str) -> bool:
+    """
+    Delete the photo gallery of a VIN and release blobs only it referenced.
+
+    Returns:
+        False when the VIN has no gallery
+    """
+    vin_folder = resolve_vin_folder(vin)
+    if not os.path.exists(vin_folder):
+        return False
+    manifest = load_manifest(vin_folder) or {}
+    shutil.rmtree(vin_folder)
+    manifest_cache.invalidate(vin_folder)
+
+    blob_store = get_blob_store()
+    if blob_store is not None:
+        blob_store.release(photo["sha256"] for photo in manifest.get("photos", []))
+    return True
+
+
+def generate_photo_derivatives(vin_folder: str, names) -> dict:
+    """Render configured responsive sizes for freshly uploaded photos."""
+    config = current_app.config
+    return generate_derivatives(
+        vin_folder,
+        names,
+        widths=config.get("PHOTO_DERIVATIVE_WIDTHS", []),
+        fmt=config.get("PHOTO_DERIVATIVE_FORMAT", "webp"),
+        quality=config.get("PHOTO_DERIVATIVE_QUALITY", 80),
+        workers=config.get("PHOTO_DERIVATIVE_WORKERS", 2),
+    )
+
+
+def recompress_uploaded_photos(vin_folder: str, hashes: dict) -> dict:
+    """Re-encode freshly uploaded photos to the configured resolution and quality budget."""
+    config = current_app.config
+    return recompress_photos(
+        vin_folder,
+        hashes,
+        max_dimension=config.get("PHOTO_RECOMPRESS_MAX_DIMENSION", 2560),
+        quality=config.get("PHOTO_RECOMPRESS_QUALITY", 85),
+        min_savings=config.get("PHOTO_RECOMPRESS_MIN_SAVINGS", 0.1),
+        originals_root=config.get("PHOTOS_ORIGINALS_DIR"),
+        workers=config.get("PHOTO_DERIVATIVE_WORKERS", 2),
+    )
+
+
+def ingest_archive(archive_path: str, vin: str,
+                   on_file: Optional[Callable[[str, int, int, int], None]] = None) -> IngestResult:
+    """
+    Extract an uploaded ZIP archive into the VIN gallery using app settings.
+
+    With a remote storage backend the archive is ingested into a scratch gallery
+    on local disk, published to the backend and the scratch copy is removed.
+    """
+    config = current_app.config
+    storage = get_photo_storage()
+    staging_root = get_photos_staging_dir()
+    if storage.is_local:
+        layout = get_photo_layout()
+        if layout.levels:
+            # A gallery still in the flat layout is moved to its shard first, then updated in place
+            migrate_vin_folder(layout, vin, staging_root)
+        vin_folder = get_vin_folder(vin)
+        blob_store = get_blob_store()
+    else:
+        vin_folder = os.path.join(staging_root, f"{vin}.{uuid.uuid4().hex}.work")
+        blob_store = None
+
+    started = time.perf_counter()
+    try:
+        with span("photos.extract", vin=vin) as extract_span:
+            result = ingest_zip(
+                archive_path,
+                vin,
+                vin_folder,
+                staging_root,
+                max_members=config.get("PHOTO_UPLOAD_MAX_MEMBERS", 2000),
+                max_uncompressed_bytes=config.get("PHOTO_UPLOAD_MAX_UNCOMPRESSED_BYTES", 1024 * 1024 * 1024),
+                workers=config.get("PHOTO_EXTRACT_WORKERS", 4),
+                post_process=generate_photo_derivatives,
+                on_file=on_file,
+                blob_store=blob_store,
+                recompress=recompress_uploaded_photos if config.get("PHOTO_RECOMPRESS_ENABLED", False) else None,
+            )
+            if extract_span is not None:
+                extract_span.set_attribute("photos.count", len(result.names))
+                extract_span.set_attribute("photos.written_bytes", result.written_bytes)
+        with span("photos.publish", vin=vin, backend=type(storage).__name__):
+            storage.publish(vin, vin_folder, result.names)
+    finally:
+        if not storage.is_local:
+            shutil.rmtree(vin_folder, ignore_errors=True)
+    PHOTO_INGEST_DURATION.observe(time.perf_counter() - started)
+    PHOTO_UPLOAD_BYTES.labels(kind="archive").inc(result.archive_bytes)
+    PHOTO_UPLOAD_BYTES.labels(kind="written").inc(result.written_bytes)
+    PHOTO_UPLOAD_BYTES.labels(kind="deduplicated").inc(result.deduplicated_bytes)
+    return result
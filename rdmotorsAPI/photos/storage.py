@@ -0,0 +1,310 @@
+"""Pluggable storage backends for AutoUSA photo galleries.
+
+Uploads are always extracted, resized and indexed on local disk by the ingest
+pipeline; a backend decides where the published gallery lives and how clients
+reach it:
+
+    ``local``: the gallery directory under ``PHOTOS_AUTO_DIR`` *is* the storage
+        (sharded layout, hard-linked blob store); files are served by Flask or
+        offloaded to the proxy, optionally behind a CDN
+    ``s3``: galleries are uploaded to an S3-compatible bucket (AWS, MinIO, R2...)
+        so any number of app nodes can serve them without a shared mount; clients
+        get CDN or presigned URLs and fetch photos from the object store directly
+
+All transfers are streamed (multipart upload from open files, chunked reads), so
+photo bytes are never held in memory as a whole.
+"""
+from __future__ import annotations
+
+import abc
+import json
+import mimetypes
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+from urllib.parse import quote
+
+from flask import jsonify, redirect
+
+from rdmotorsAPI.file_serving import send_file_response
+from rdmotorsAPI.metrics import record_cache
+from rdmotorsAPI.photos.manifest import MANIFEST_NAME, load_manifest
+from rdmotorsAPI.photos.service import delete_vin_gallery, get_vin_location, resolve_vin_folder
+
+try:
+    import boto3
+except ImportError:  # only needed for the s3 backend
+    boto3 = None
+
+STORAGE_LOCAL = "local"
+STORAGE_S3 = "s3"
+STORAGE_BACKENDS = {STORAGE_LOCAL, STORAGE_S3}
+STREAM_CHUNK_SIZE = 256 * 1024
+MANIFEST_PUBLISH_RETRIES = 5
+
+
+class StorageObjectNotFound(LookupError):
+    """Requested photo does not exist in the storage backend."""
+
+
+class PhotoStorage(abc.ABC):
+    """Interface of photo storage backends (paths are relative to the VIN gallery)."""
+
+    name = ""
+    is_local = False
+
+    @abc.abstractmethod
+    def load_manifest(self, vin: str) -> Optional[Dict[str, Any]]:
+        """Manifest of a published gallery, or None when the VIN has no gallery."""
+
+    @abc.abstractmethod
+    def publish(self, vin: str, folder: str, names: Iterable[str]) -> None:
+        """Make new or changed photos of a locally ingested gallery (and their sizes) public."""
+
+    @abc.abstractmethod
+    def delete_gallery(self, vin: str) -> bool:
+        """Delete a gallery; returns False when there was none."""
+
+    @abc.abstractmethod
+    def open(self, vin: str, path: str, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+        """Stream a photo chunk by chunk; raises StorageObjectNotFound."""
+
+    @abc.abstractmethod
+    def url_for(self, vin: str, path: str) -> Optional[str]:
+        """Direct client URL (CDN or presigned) of a photo, or None when Flask serves it."""
+
+    @abc.abstractmethod
+    def send(self, vin: str, path: str, max_age: Optional[int] = None):
+        """Flask response delivering a photo."""
+
+
+class LocalPhotoStorage(PhotoStorage):
+    """Galleries on the local (or shared) filesystem, resolved through the photo layout."""
+
+    name = STORAGE_LOCAL
+    is_local = True
+
+    def __init__(self, cdn_base_url: Optional[str] = None):
+        self.cdn_base_url = cdn_base_url.rstrip("/") if cdn_base_url else None
+
+    def load_manifest(self, vin: str) -> Optional[Dict[str, Any]]:
+        return load_manifest(resolve_vin_folder(vin))
+
+    def publish(self, vin: str, folder: str, names: Iterable[str]) -> None:
+        # ingest_zip already swapped the staged gallery into place
+        pass
+
+    def delete_gallery(self, vin: str) -> bool:
+        return delete_vin_gallery(vin)
+
+    def open(self, vin: str, path: str, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+        try:
+            source = open(os.path.join(resolve_vin_folder(vin), path), "rb")
+        except FileNotFoundError:
+            raise StorageObjectNotFound(f"{vin}/{path}")
+
+        def chunks():
+            with source:
+                for block in iter(lambda: source.read(chunk_size), b""):
+                    yield block
+
+        return chunks()
+
+    def url_for(self, vin: str, path: str) -> Optional[str]:
+        if not self.cdn_base_url:
+            return None
+        return f"{self.cdn_base_url}/photos/autousa/{vin}/{quote(path)}"
+
+    def send(self, vin: str, path: str, max_age: Optional[int] = None):
+        vin_folder = resolve_vin_folder(vin)
+        directory, filename = os.path.split(os.path.join(vin_folder, path))
+        location = get_vin_location(vin_folder)
+        subdir = os.path.dirname(path)
+        if subdir:
+            location = f"{location}/{subdir}"
+        return send_file_response(directory, filename, location, max_age=max_age)
+
+
+def _error_code(error: Exception) -> str:
+    """Error code of a botocore ClientError (or of the in-memory stand-in)."""
+    response = getattr(error, "response", None) or {}
+    return str(response.get("Error", {}).get("Code", ""))
+
+
+class S3PhotoStorage(PhotoStorage):
+    """Galleries in an S3-compatible bucket under ``<prefix>/<vin>/``."""
+
+    name = STORAGE_S3
+
+    def __init__(self, client, bucket: str, prefix: str = "autousa", cdn_base_url: Optional[str] = None,
+                 url_expires: int = 3600, manifest_ttl: float = 30.0, max_cached_manifests: int = 4096):
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.cdn_base_url = cdn_base_url.rstrip("/") if cdn_base_url else None
+        self.url_expires = url_expires
+        self.manifest_ttl = manifest_ttl
+        self.max_cached_manifests = max_cached_manifests
+        self._manifests: "OrderedDict[str, Tuple[float, Optional[Dict[str, Any]]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def key(self, vin: str, path: str) -> str:
+        return f"{self.prefix}/{vin}/{path}" if self.prefix else f"{vin}/{path}"
+
+    def _read_manifest(self, vin: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        try:
+            obj = self.client.get_object(Bucket=self.bucket, Key=self.key(vin, MANIFEST_NAME))
+        except Exception as e:
+            if _error_code(e) in {"NoSuchKey", "404"}:
+                return None, None
+            raise
+        return json.loads(obj["Body"].read()), obj.get("ETag")
+
+    def _cache_manifest(self, vin: str, manifest: Optional[Dict[str, Any]]) -> None:
+        with self._lock:
+            self._manifests[vin] = (time.monotonic() + self.manifest_ttl, manifest)
+            self._manifests.move_to_end(vin)
+            while len(self._manifests) > self.max_cached_manifests:
+                self._manifests.popitem(last=False)
+
+    def load_manifest(self, vin: str) -> Optional[Dict[str, Any]]:
+        # Other nodes publish too, so cached manifests (and misses) live for manifest_ttl seconds
+        with self._lock:
+            entry = self._manifests.get(vin)
+            if entry is not None and entry[0] > time.monotonic():
+                record_cache("s3_manifest", True)
+                return entry[1]
+        record_cache("s3_manifest", False)
+        manifest, _ = self._read_manifest(vin)
+        self._cache_manifest(vin, manifest)
+        return manifest
+
+    def _upload_file(self, local_path: str, key: str) -> None:
+        content_type = mimetypes.guess_type(local_path)[0] or "application/octet-stream"
+        with open(local_path, "rb") as f:
+            # upload_fileobj reads the file in parts (multipart upload for large files)
+            self.client.upload_fileobj(
+                f, self.bucket, key,
+                ExtraArgs={"ContentType": content_type, "CacheControl": "public, max-age=3600"},
+            )
+
+    def publish(self, vin: str, folder: str, names: Iterable[str]) -> None:
+        names = set(names)
+        staged = {photo["name"]: photo for photo in load_manifest(folder)["photos"] if photo["name"] in names}
+        for name, photo in staged.items():
+            for path in [name] + [d["name"] for d in photo.get("derivatives", [])]:
+                self._upload_file(os.path.join(folder, path), self.key(vin, path))
+
+        # The manifest goes last, so readers never see entries whose files are missing.
+        # Conditional writes make concurrent uploads to one VIN from several nodes merge instead of overwrite.
+        for _ in range(MANIFEST_PUBLISH_RETRIES):
+            current, etag = self._read_manifest(vin)
+            photos = {photo["name"]: photo for photo in (current or {}).get("photos", [])}
+            photos.update(staged)
+            manifest = dict(current or load_manifest(folder), photos=[photos[name] for name in sorted(photos)])
+            condition = {"IfMatch": etag} if etag else {"IfNoneMatch": "*"}
+            try:
+                self.client.put_object(
+                    Bucket=self.bucket,
+                    Key=self.key(vin, MANIFEST_NAME),
+                    Body=json.dumps(manifest, separators=(",", ":")).encode("utf-8"),
+                    ContentType="application/json",
+                    **condition,
+                )
+            except Exception as e:
+                if _error_code(e) in {"PreconditionFailed", "ConditionalRequestConflict", "412", "409"}:
+                    continue
+                raise
+            self._cache_manifest(vin, manifest)
+            return
+        raise RuntimeError(f"Could not publish photo manifest for VIN {vin}: too many concurrent updates")
+
+    def _list_keys(self, prefix: str) -> Iterator[str]:
+        kwargs = {"Bucket": self.bucket, "Prefix": prefix}
+        while True:
+            page = self.client.list_objects_v2(**kwargs)
+            for obj in page.get("Contents", []):
+                yield obj["Key"]
+            if not page.get("IsTruncated"):
+                return
+            kwargs["ContinuationToken"] = page["NextContinuationToken"]
+
+    def delete_gallery(self, vin: str) -> bool:
+        manifest_key = self.key(vin, MANIFEST_NAME)
+        keys = list(self._list_keys(self.key(vin, "")))
+        if not keys:
+            return False
+        # Manifest first: the gallery disappears from listings before its files do
+        ordered = [manifest_key] + [key for key in keys if key != manifest_key]
+        for start in range(0, len(ordered), 1000):
+            batch = ordered[start:start + 1000]
+            self.client.delete_objects(Bucket=self.bucket, Delete={"Objects": [{"Key": key} for key in batch]})
+        self._cache_manifest(vin, None)
+        return True
+
+    def open(self, vin: str, path: str, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+        try:
+            obj = self.client.get_object(Bucket=self.bucket, Key=self.key(vin, path))
+        except Exception as e:
+            if _error_code(e) in {"NoSuchKey", "404"}:
+                raise StorageObjectNotFound(f"{vin}/{path}")
+            raise
+        return obj["Body"].iter_chunks(chunk_size)
+
+    def url_for(self, vin: str, path: str) -> Optional[str]:
+        key = self.key(vin, path)
+        if self.cdn_base_url:
+            return f"{self.cdn_base_url}/{quote(key)}"
+        return self.client.generate_presigned_url(
+            "get_object", Params={"Bucket": self.bucket, "Key": key}, ExpiresIn=self.url_expires
+        )
+
+    def send(self, vin: str, path: str, max_age: Optional[int] = None):
+        manifest = self.load_manifest(vin)
+        names = set()
+        for photo in (manifest or {}).get("photos", []):
+            names.add(photo["name"])
+            names.update(d["name"] for d in photo.get("derivatives", []))
+        if path not in names:
+            return jsonify({"error": "Photo not found"}), 404
+        response = redirect(self.url_for(vin, path), code=302)
+        # Presigned URLs expire, so the redirect itself must not outlive them
+        response.cache_control.private = True
+        response.cache_control.max_age = min(max_age or 0, self.url_expires // 2)
+        return response
+
+
+def create_photo_storage(config) -> PhotoStorage:
+    """Create the backend selected by PHOTO_STORAGE_BACKEND."""
+    backend = (config.get("PHOTO_STORAGE_BACKEND") or STORAGE_LOCAL).strip().lower()
+    cdn_base_url = config.get("PHOTO_CDN_BASE_URL")
+    if backend == STORAGE_LOCAL:
+        return LocalPhotoStorage(cdn_base_url=cdn_base_url)
+    if backend != STORAGE_S3:
+        raise RuntimeError(
+            f"Unsupported PHOTO_STORAGE_BACKEND '{backend}'. Use one of: {', '.join(sorted(STORAGE_BACKENDS))}"
+        )
+    if not config.get("PHOTO_S3_BUCKET"):
+        raise RuntimeError("PHOTO_S3_BUCKET is required for the s3 photo storage backend")
+    if boto3 is None:
+        raise RuntimeError("The s3 photo storage backend requires boto3 (pip install boto3)")
+    client = boto3.client(
+        "s3",
+        endpoint_url=config.get("PHOTO_S3_ENDPOINT_URL") or None,
+        region_name=config.get("PHOTO_S3_REGION") or None,
+    )
+    return S3PhotoStorage(
+        client,
+        config["PHOTO_S3_BUCKET"],
+        prefix=config.get("PHOTO_S3_PREFIX", "autousa"),
+        cdn_base_url=cdn_base_url,
+        url_expires=config.get("PHOTO_URL_EXPIRES", 3600),
+        manifest_ttl=config.get("PHOTO_STORAGE_MANIFEST_TTL", 30),
+    )
+
+
+def init_photo_storage(app) -> None:
+    """Create the configured photo storage backend for the app."""
+    app.extensions["photo_storage"] = create_photo_storage(app.config)
@@ -0,0 +1,392 @@
+"""On-demand profiling of a live worker process.
+
+A profiling session is started from ``POST /admin/profiler`` or, when
+``PROFILER_SIGNAL`` is set, by sending that signal to one worker
+(``kill -PROF <pid>``). The signals gunicorn uses itself (USR1, USR2, HUP,
+...) are rejected. The session ends on its own after ``seconds``
+(at most ``PROFILER_MAX_SECONDS``), or when stopped early, and writes one
+file to ``PROFILER_OUTPUT_DIR``:
+
+- ``sample`` mode: a background thread reads the stacks of the threads
+  serving the selected requests every ``interval_ms`` and counts them. The
+  output ``.collapsed`` file has one ``endpoint;frame;frame... count`` line per
+  stack, the input format of ``flamegraph.pl`` and speedscope. If sampling
+  takes more than ``PROFILER_MAX_OVERHEAD`` of the elapsed time, the interval
+  is doubled.
+- ``cprofile`` mode: the selected requests run under ``cProfile``, one at a
+  time (requests that arrive while another is being profiled run normally). At
+  most ``PROFILER_MAX_REQUESTS`` are profiled. Their merged ``.pstats`` file
+  can be opened with snakeviz or turned into a flame graph with flameprof.
+
+Both modes can be limited to one ``endpoint`` and a ``fraction`` of its
+requests. With no session running, the request hooks only check an attribute.
+"""
+from __future__ import annotations
+
+import cProfile
+import logging
+import os
+import pstats
+import random
+import re
+import signal
+import stat
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from flask import g, request
+
+PROFILE_MODES = ("sample", "cprofile")
+MAX_SAMPLE_INTERVAL = 1.0
+_EXTENSIONS = {"sample": ".collapsed", "cprofile": ".pstats"}
+# Signals the gunicorn arbiter and its workers handle (or reset to the default action) themselves
+GUNICORN_SIGNALS = {"SIGHUP", "SIGINT", "SIGQUIT", "SIGTERM", "SIGTTIN", "SIGTTOU", "SIGUSR1", "SIGUSR2",
+                    "SIGWINCH", "SIGABRT", "SIGCHLD"}
+_RTMIN_OFFSET = re.compile(r"SIGRTMIN\+(\d+)")
+
+
+class ProfileSession:
+    """One profiling run and its results."""
+
+    def __init__(self, mode: str, seconds: float, path: str, interval: float = 0.01,
+                 endpoint: Optional[str] = None, fraction: float = 1.0, max_requests: int = 100,
+                 max_overhead: float = 0.02):
+        self.mode = mode
+        self.path = path
+        self.interval = interval
+        self.endpoint = endpoint
+        self.fraction = fraction
+        self.max_requests = max_requests
+        self.max_overhead = max_overhead
+        self.started = time.time()
+        self.deadline = time.monotonic() + seconds
+        self.requests = 0
+        self.samples = 0
+        self.sampling_seconds = 0.0
+        self.stacks: Counter = Counter()
+        self.stats: Optional[pstats.Stats] = None
+        self.threads: Dict[int, str] = {}
+        self._labels: Dict[Any, str] = {}
+        self._busy = threading.Lock()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+
+    def selects(self, endpoint: Optional[str]) -> bool:
+        """Whether a request to endpoint should be profiled."""
+        if self.endpoint and endpoint != self.endpoint:
+            return False
+        if self.mode == "cprofile" and self.requests >= self.max_requests:
+            return False
+        return self.fraction >= 1 or random.random() < self.fraction
+
+    @property
+    def overhead(self) -> float:
+        """Fraction of elapsed time spent taking samples."""
+        elapsed = time.time() - self.started
+        return self.sampling_seconds / elapsed if elapsed > 0 else 0.0
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = f"{getattr(code, 'co_qualname', code.co_name)} ({short_path(code.co_filename)}:{code.co_firstlineno})"
+            self._labels[code] = label
+        return label
+
+    def sample(self) -> None:
+        """Count the current stack of every selected in-flight request."""
+        started = time.perf_counter()
+        frames = sys._current_frames()
+        for ident, endpoint in list(self.threads.items()):
+            frame = frames.get(ident)
+            stack = []
+            while frame is not None:
+                stack.append(self._label(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                stack.append(endpoint)
+                self.stacks[";".join(reversed(stack))] += 1
+        self.samples += 1
+        self.sampling_seconds += time.perf_counter() - started
+        if self.overhead > self.max_overhead and self.interval < MAX_SAMPLE_INTERVAL:
+            self.interval = min(self.interval * 2, MAX_SAMPLE_INTERVAL)
+            logging.info("Profiler overhead %.1f%%; sampling every %.0f ms",
+                         self.overhead * 100, self.interval * 1000)
+
+    def add_profile(self, profile: cProfile.Profile) -> None:
+        with self._lock:
+            if self.stats is None:
+                self.stats = pstats.Stats(profile)
+            else:
+                self.stats.add(profile)
+
+    def run(self, on_finish) -> None:
+        """Session thread: take samples (or just wait) until the deadline or stop()."""
+        while not self._stopped.is_set():
+            remaining = self.deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            if self.mode == "cprofile":
+                if self.requests >= self.max_requests and not self._busy.locked():
+                    break
+                self._stopped.wait(min(remaining, 1.0))
+            elif not self._stopped.wait(min(remaining, self.interval)):
+                self.sample()
+        on_finish(self)
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def write(self) -> None:
+        os.makedirs(os.path.dirname(self.path), mode=0o700, exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        if self.mode == "sample":
+            with open(temp_path, "w", encoding="utf-8") as f:
+                for stack, count in self.stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+        else:
+            with self._lock:
+                stats = self.stats
+            if stats is None:
+                return
+            stats.dump_stats(temp_path)
+        os.replace(temp_path, self.path)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "endpoint": self.endpoint,
+            "fraction": self.fraction,
+            "started": self.started,
+            "remaining_seconds": round(max(0.0, self.deadline - time.monotonic()), 1),
+            "profile": os.path.basename(self.path),
+            "requests": self.requests,
+            "samples": self.samples,
+            "interval_ms": round(self.interval * 1000, 1),
+            "overhead": round(self.overhead, 4),
+        }
+
+
+def short_path(filename: str) -> str:
+    """Path relative to the longest sys.path entry containing it."""
+    for entry in sorted(filter(None, sys.path), key=len, reverse=True):
+        prefix = entry.rstrip(os.sep) + os.sep
+        if filename.startswith(prefix):
+            return filename[len(prefix):]
+    return filename
+
+
+class Profiler:
+    """Profiling controller of one worker process (``app.extensions["profiler"]``)."""
+
+    def __init__(self, output_dir: str, max_seconds: float = 300, default_seconds: float = 30,
+                 max_requests: int = 100, max_overhead: float = 0.02):
+        self.output_dir = output_dir
+        self.max_seconds = max_seconds
+        self.default_seconds = default_seconds
+        self.max_requests = max_requests
+        self.max_overhead = max_overhead
+        self.session: Optional[ProfileSession] = None
+        self.last_profile: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def start(self, mode: str = "sample", seconds: Optional[float] = None, interval_ms: float = 10,
+              endpoint: Optional[str] = None, fraction: float = 1.0) -> ProfileSession:
+        """
+        Start a profiling session.
+
+        Args:
+            mode: "sample" (collapsed stacks) or "cprofile" (pstats)
+            seconds: Duration; capped at max_seconds
+            interval_ms: Sampling interval (sample mode, at least 1 ms)
+            endpoint: Only profile requests to this Flask endpoint
+            fraction: Share of the selected requests to profile (0-1]
+
+        Raises:
+            ValueError: Invalid arguments
+            RuntimeError: A session is already running
+        """
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"mode must be one of: {', '.join(PROFILE_MODES)}")
+        seconds = float(seconds if seconds is not None else self.default_seconds)
+        interval = float(interval_ms) / 1000
+        fraction = float(fraction)
+        if seconds <= 0 or interval <= 0 or not 0 < fraction <= 1:
+            raise ValueError("seconds and interval_ms must be positive and fraction in (0, 1]")
+        with self._lock:
+            if self.session is not None:
+                raise RuntimeError("A profiling session is already running")
+            name = f"profile-{os.getpid()}-{time.strftime('%Y%m%d-%H%M%S')}-{mode}{_EXTENSIONS[mode]}"
+            session = ProfileSession(
+                mode, min(seconds, self.max_seconds), os.path.join(self.output_dir, name),
+                interval=max(interval, 0.001), endpoint=endpoint or None, fraction=fraction,
+                max_requests=self.max_requests, max_overhead=self.max_overhead,
+            )
+            self.session = session
+        threading.Thread(target=session.run, args=(self._finish,), name="rdmotors-profiler", daemon=True).start()
+        logging.info("Profiler started: %s for %.0f s (endpoint=%s, fraction=%s)",
+                     mode, min(seconds, self.max_seconds), endpoint or "*", fraction)
+        return session
+
+    def stop(self) -> Optional[ProfileSession]:
+        """Stop the running session early; its profile is written by the session thread."""
+        session = self.session
+        if session is not None:
+            session.stop()
+        return session
+
+    def toggle(self) -> None:
+        """Start a default sampling session, or stop the running one (PROFILER_SIGNAL)."""
+        if self.stop() is None:
+            self.start()
+
+    def _finish(self, session: ProfileSession) -> None:
+        try:
+            session.write()
+        except OSError as e:
+            logging.error("Failed to write profile %s: %s", session.path, e)
+        else:
+            if os.path.exists(session.path):
+                self.last_profile = os.path.basename(session.path)
+        with self._lock:
+            if self.session is session:
+                self.session = None
+        logging.info("Profiler stopped: %s (%d samples, %d requests, %.2f%% overhead)",
+                     session.path, session.samples, session.requests, session.overhead * 100)
+
+    def profiles(self) -> List[str]:
+        """Profile files in the output directory, newest first."""
+        try:
+            names = [name for name in os.listdir(self.output_dir) if name.endswith(tuple(_EXTENSIONS.values()))]
+        except FileNotFoundError:
+            return []
+        return sorted(names, key=lambda name: os.path.getmtime(os.path.join(self.output_dir, name)), reverse=True)
+
+    def begin_request(self) -> None:
+        session = self.session
+        if session is None or not session.selects(request.endpoint):
+            return
+        if session.mode == "sample":
+            session.threads[threading.get_ident()] = request.endpoint or "<unmatched>"
+            g.profiler_session = session
+        elif session._busy.acquire(blocking=False):
+            session.requests += 1
+            profile = cProfile.Profile()
+            g.profiler_session = session
+            g.profiler_profile = profile
+            profile.enable()
+
+    def end_request(self, exc=None) -> None:
+        session = g.pop("profiler_session", None)
+        if session is None:
+            return
+        if session.mode == "sample":
+            session.threads.pop(threading.get_ident(), None)
+            session.requests += 1
+            return
+        profile = g.pop("profiler_profile")
+        profile.disable()
+        try:
+            session.add_profile(profile)
+        finally:
+            session._busy.release()
+
+
+def parse_signal(name: str) -> int:
+    """Signal number of PROFILER_SIGNAL: a name such as SIGPROF, or SIGRTMIN+n."""
+    name = name.strip().upper()
+    match = _RTMIN_OFFSET.fullmatch(name)
+    if match and hasattr(signal, "SIGRTMIN") and signal.SIGRTMIN + int(match.group(1)) <= signal.SIGRTMAX:
+        return signal.SIGRTMIN + int(match.group(1))
+    signum = getattr(signal, name, None) if name.startswith("SIG") and "_" not in name else None
+    if signum is None:
+        raise RuntimeError(f"Unknown PROFILER_SIGNAL '{name}'")
+    if name in GUNICORN_SIGNALS:
+        raise RuntimeError(
+            f"PROFILER_SIGNAL '{name}' is used by gunicorn; use SIGPROF or SIGRTMIN+n instead"
+        )
+    return signum
+
+
+class _SignalToggle:
+    """PROFILER_SIGNAL handler waking a thread that toggles the profiler, set up again in forked workers."""
+
+    def __init__(self, profiler: Profiler, signum: int):
+        self.profiler = profiler
+        self.signum = signum
+        self._requested = threading.Event()
+
+    def install(self) -> None:
+        # Called in the main thread: at create_app and right after fork (gunicorn --preload), since
+        # the toggle thread does not survive the fork
+        self._requested = threading.Event()
+        threading.Thread(target=self._run, args=(self._requested,), name="rdmotors-profiler-signal",
+                         daemon=True).start()
+        signal.signal(self.signum, self._handle)
+
+    def _handle(self, signum, frame):
+        # Runs in the main thread, possibly while it holds the profiler lock: only wake the toggle thread
+        self._requested.set()
+
+    def _run(self, requested: threading.Event) -> None:
+        while True:
+            requested.wait()
+            requested.clear()
+            try:
+                self.profiler.toggle()
+            except RuntimeError as e:
+                logging.warning("Profiler signal ignored: %s", e)
+
+
+def _install_signal(profiler: Profiler, signal_name: str) -> None:
+    signum = parse_signal(signal_name)
+    if threading.current_thread() is not threading.main_thread():
+        logging.warning("PROFILER_SIGNAL ignored: the app is not created in the main thread")
+        return
+    toggle = _SignalToggle(profiler, signum)
+    toggle.install()
+    if hasattr(os, "register_at_fork"):
+        os.register_at_fork(after_in_child=toggle.install)
+
+
+def prepare_output_dir(path: str) -> str:
+    """
+    Create the profile directory private to this user (mode 0700).
+
+    Raises:
+        RuntimeError: The path is not a directory, or another user owns it (it could hold planted files)
+    """
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode):
+        raise RuntimeError(f"PROFILER_OUTPUT_DIR '{path}' is not a directory")
+    if hasattr(os, "getuid"):
+        if info.st_uid != os.getuid():
+            raise RuntimeError(f"PROFILER_OUTPUT_DIR '{path}' is owned by uid {info.st_uid}, not by this process")
+        if info.st_mode & 0o077:
+            os.chmod(path, 0o700)
+    return path
+
+
+def get_profiler(app) -> Optional[Profiler]:
+    return app.extensions.get("profiler")
+
+
+def init_profiler(app) -> None:
+    """Install the profiler hooks and signal handler when PROFILER_ENABLED is set."""
+    if not app.config.get("PROFILER_ENABLED", False):
+        return
+    profiler = Profiler(
+        prepare_output_dir(app.config.get("PROFILER_OUTPUT_DIR") or os.path.join(app.instance_path, "profiles")),
+        max_seconds=app.config.get("PROFILER_MAX_SECONDS", 300),
+        default_seconds=app.config.get("PROFILER_DEFAULT_SECONDS", 30),
+        max_requests=app.config.get("PROFILER_MAX_REQUESTS", 100),
+        max_overhead=app.config.get("PROFILER_MAX_OVERHEAD", 0.02),
+    )
+    app.extensions["profiler"] = profiler
+    app.before_request(profiler.begin_request)
+    app.teardown_request(profiler.end_request)
+    if app.config.get("PROFILER_SIGNAL"):
+        _install_signal(profiler, app.config["PROFILER_SIGNAL"])
@@ -0,0 +1,177 @@
+"""SQL query recording on SQLAlchemy engine events.
+
+A ``QueryRecorder`` collects every statement executed while it is active,
+either for one request (``SQL_PROFILER_ENABLED``) or for a block of code
+(``record_queries()``, used by the ``query_budget`` test fixture). Statements
+are grouped by normalized SQL (literals and ``IN`` lists collapsed), so the
+same lazy load repeated for every row of a page - an N+1 pattern - shows up as
+one group with a high count and is logged with the endpoint.
+
+Independently, statements slower than ``SQL_SLOW_QUERY_MS`` are logged with
+their bound parameters and the endpoint that ran them.
+"""
+from __future__ import annotations
+
+import contextlib
+import logging
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Iterator, List, Optional, Tuple
+
+from flask import g, has_request_context, request
+
+from rdmotorsAPI.sql_events import StatementObserver, add_statement_observer
+
+MAX_LOGGED_PARAMETERS = 500
+
+_WHITESPACE = re.compile(r"\s+")
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = r"(?:\?|%s|:\w+|%\(\w+\)s)"
+_PLACEHOLDER_LISTS = re.compile(rf"\(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})*\s*\)")
+_local = threading.local()
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A block ran more statements (or repeated one more often) than its budget allows."""
+
+
+def normalize_sql(statement: str) -> str:
+    """Collapse whitespace, literals and placeholder lists so repeated queries group together."""
+    statement = _WHITESPACE.sub(" ", statement).strip()
+    statement = _LITERALS.sub("?", statement)
+    return _PLACEHOLDER_LISTS.sub("(...)", statement)
+
+
+@dataclass
+class QueryRecord:
+    statement: str
+    parameters: Any
+    duration: float
+
+
+class QueryRecorder:
+    """Statements executed while the recorder is active."""
+
+    def __init__(self):
+        self.queries: List[QueryRecord] = []
+
+    def record(self, statement: str, parameters: Any, duration: float) -> None:
+        self.queries.append(QueryRecord(statement, parameters, duration))
+
+    @property
+    def count(self) -> int:
+        return len(self.queries)
+
+    @property
+    def duration(self) -> float:
+        return sum(query.duration for query in self.queries)
+
+    def groups(self) -> Counter:
+        """Count of statements per normalized SQL."""
+        return Counter(normalize_sql(query.statement) for query in self.queries)
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Normalized statements executed at least threshold times (N+1 candidates), most frequent first."""
+        return [(sql, count) for sql, count in self.groups().most_common() if count >= threshold]
+
+    def report(self) -> str:
+        lines = [f"{self.count} queries in {self.duration * 1000:.1f} ms"]
+        lines.extend(f"  {count} x {sql}" for sql, count in self.groups().most_common())
+        return "\n".join(lines)
+
+    def check_budget(self, max_queries: int, max_repeats: Optional[int] = None) -> None:
+        """
+        Raise QueryBudgetExceeded when the recorded statements exceed a budget.
+
+        Args:
+            max_queries: Maximum number of statements
+            max_repeats: Maximum executions of one normalized statement
+        """
+        if self.count > max_queries:
+            raise QueryBudgetExceeded(f"Query budget {max_queries} exceeded: {self.report()}")
+        if max_repeats is not None and self.repeated(max_repeats + 1):
+            raise QueryBudgetExceeded(f"Statement repeated more than {max_repeats} times: {self.report()}")
+
+
+def _active_recorders() -> List[QueryRecorder]:
+    recorders = list(getattr(_local, "recorders", ()))
+    if has_request_context():
+        recorder = g.get("query_recorder")
+        if recorder is not None:
+            recorders.append(recorder)
+    return recorders
+
+
+@contextlib.contextmanager
+def record_queries() -> Iterator[QueryRecorder]:
+    """Record statements the current thread executes inside the block (the profiler must be installed)."""
+    recorder = QueryRecorder()
+    stack = _local.__dict__.setdefault("recorders", [])
+    stack.append(recorder)
+    try:
+        yield recorder
+    finally:
+        stack.remove(recorder)
+
+
+class QueryProfiler(StatementObserver):
+    """Statement observer feeding active recorders and the slow-query log."""
+
+    def __init__(self, slow_query_ms: float = 0):
+        self.slow_query_ms = slow_query_ms
+
+    def install(self, engine) -> None:
+        add_statement_observer(engine, self)
+
+    def finish(self, token, statement, parameters, duration, cursor):
+        for recorder in _active_recorders():
+            recorder.record(statement, parameters, duration)
+        if self.slow_query_ms and duration * 1000 >= self.slow_query_ms:
+            logging.warning(
+                "Slow query (%.1f ms) on %s: %s parameters=%.*r",
+                duration * 1000,
+                request.endpoint if has_request_context() else "<no request>",
+                _WHITESPACE.sub(" ", statement).strip(),
+                MAX_LOGGED_PARAMETERS,
+                parameters,
+            )
+
+
+def install_query_profiler(app) -> QueryProfiler:
+    """Attach the profiler to the app's engine once and return it."""
+    profiler = app.extensions.get("query_profiler")
+    if profiler is None:
+        from rdmotorsAPI import db
+
+        profiler = QueryProfiler(app.config.get("SQL_SLOW_QUERY_MS", 0))
+        with app.app_context():
+            profiler.install(db.engine)
+        app.extensions["query_profiler"] = profiler
+    return profiler
+
+
+def init_query_profiler(app) -> None:
+    """Install request query recording and the slow-query log when configured."""
+    profiling = app.config.get("SQL_PROFILER_ENABLED", False)
+    if not profiling and not app.config.get("SQL_SLOW_QUERY_MS", 0):
+        return
+    install_query_profiler(app)
+    if not profiling:
+        return
+    threshold = app.config.get("SQL_N_PLUS_ONE_THRESHOLD", 5)
+
+    @app.before_request
+    def start_query_recorder():
+        g.query_recorder = QueryRecorder()
+
+    @app.after_request
+    def report_query_recorder(response):
+        recorder = g.pop("query_recorder", None)
+        if recorder is None:
+            return response
+        for sql, count in recorder.repeated(threshold):
+            logging.warning("Possible N+1 on %s: %d x %s", request.endpoint, count, sql)
+        logging.debug("%s %s ran %s", request.method, request.path, recorder.report())
+        return response
@@ -0,0 +1,168 @@
+"""Rate limiter storage shared by all worker processes of one host.
+
+``memory://`` keeps counters per process, so under ``gunicorn -w 4`` every
+limit is four times looser than configured. ``SQLiteStorage`` keeps the
+counters in a local SQLite database in WAL mode instead; no external service
+is needed. Importing this module registers the ``sqlite://`` scheme with
+``limits``, so ``RATELIMIT_STORAGE_URI=sqlite:///var/run/rdmotors/ratelimit.db``
+is enough to use it.
+
+Each hit is a single UPSERT ... RETURNING statement, atomic under SQLite's
+write lock, on a per-thread connection. Counters are not durable data:
+``synchronous=OFF`` skips fsync, which keeps a hit well under a millisecond.
+Expired rows are deleted every ``PURGE_EVERY`` writes so the table stays as
+small as the set of active keys.
+
+Supports the fixed-window and sliding-window-counter strategies.
+"""
+from __future__ import annotations
+
+import itertools
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional, Tuple
+
+from limits.storage import SlidingWindowCounterSupport, Storage
+from limits.storage.base import TimestampedSlidingWindow
+
+PURGE_EVERY = 1000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ratelimit_counters (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL,
+    expires_at REAL NOT NULL
+) WITHOUT ROWID
+"""
+
+_INCR = """
+INSERT INTO ratelimit_counters (key, value, expires_at) VALUES (:key, :amount, :expires_at)
+ON CONFLICT (key) DO UPDATE SET
+    value = CASE WHEN expires_at <= :now THEN excluded.value ELSE value + excluded.value END,
+    expires_at = CASE WHEN expires_at <= :now THEN excluded.expires_at ELSE expires_at END
+RETURNING value
+"""
+
+
+class SQLiteStorage(Storage, SlidingWindowCounterSupport, TimestampedSlidingWindow):
+    """
+    ``limits`` storage backed by a SQLite database file.
+
+    URI: ``sqlite:///absolute/path/to/ratelimit.db``. Options (``RATELIMIT_STORAGE_OPTIONS``):
+    ``timeout`` seconds to wait for the write lock (default 1).
+    """
+
+    STORAGE_SCHEME = ["sqlite"]
+
+    def __init__(self, uri: Optional[str] = None, wrap_exceptions: bool = False, timeout: float = 1.0, **options):
+        self.path = (uri or "sqlite://")[len("sqlite://"):]
+        if not self.path:
+            raise ValueError("sqlite:// rate limit storage needs a database path, e.g. sqlite:///tmp/ratelimit.db")
+        self.timeout = float(timeout)
+        self._local = threading.local()
+        self._writes = itertools.count(1)
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connection() as connection:
+            connection.execute(_SCHEMA)
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread and process: connections must not cross a fork
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None,
+                                         check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=OFF")
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def _purge_expired(self, connection: sqlite3.Connection, now: float) -> None:
+        if next(self._writes) % PURGE_EVERY == 0:
+            connection.execute("DELETE FROM ratelimit_counters WHERE expires_at <= ?", (now,))
+
+    def incr(self, key: str, expiry: float, amount: int = 1) -> int:
+        """Increment a counter, starting a new window of expiry seconds when it expired."""
+        now = time.time()
+        connection = self._connection()
+        value = connection.execute(
+            _INCR, {"key": key, "amount": amount, "expires_at": now + expiry, "now": now}
+        ).fetchone()[0]
+        self._purge_expired(connection, now)
+        return value
+
+    def decr(self, key: str, amount: int = 1) -> int:
+        """Decrement a live counter (not below zero)."""
+        row = self._connection().execute(
+            "UPDATE ratelimit_counters SET value = MAX(value - ?, 0) WHERE key = ? AND expires_at > ? "
+            "RETURNING value",
+            (amount, key, time.time()),
+        ).fetchone()
+        return row[0] if row else 0
+
+    def _row(self, key: str) -> Optional[Tuple[int, float]]:
+        return self._connection().execute(
+            "SELECT value, expires_at FROM ratelimit_counters WHERE key = ? AND expires_at > ?",
+            (key, time.time()),
+        ).fetchone()
+
+    def get(self, key: str) -> int:
+        row = self._row(key)
+        return row[0] if row else 0
+
+    def get_expiry(self, key: str) -> float:
+        row = self._row(key)
+        return row[1] if row else time.time()
+
+    def clear(self, key: str) -> None:
+        self._connection().execute("DELETE FROM ratelimit_counters WHERE key = ?", (key,))
+
+    def reset(self) -> Optional[int]:
+        return self._connection().execute("DELETE FROM ratelimit_counters").rowcount
+
+    def check(self) -> bool:
+        try:
+            self._connection().execute("SELECT 1").fetchone()
+        except sqlite3.Error:
+            return False
+        return True
+
+    def acquire_sliding_window_entry(self, key: str, limit: int, expiry: int, amount: int = 1) -> bool:
+        if amount > limit:
+            return False
+        now = time.time()
+        previous_key, current_key = self.sliding_window_keys(key, expiry, now)
+        previous_count, previous_ttl, _, _ = self._sliding_window(previous_key, current_key, expiry, now)
+        # Increment first, then check: another process cannot slip in between a read and a write
+        current_count = self.incr(current_key, 2 * expiry, amount=amount)
+        if int(previous_count * previous_ttl / expiry + current_count) > limit:
+            self.decr(current_key, amount)
+            return False
+        return True
+
+    def _sliding_window(self, previous_key: str, current_key: str, expiry: int,
+                        now: float) -> Tuple[int, float, int, float]:
+        previous_count = self.get(previous_key)
+        current_count = self.get(current_key)
+        previous_ttl = (1 - (((now - expiry) / expiry) % 1)) * expiry if previous_count else 0.0
+        current_ttl = (1 - ((now / expiry) % 1)) * expiry + expiry
+        return previous_count, previous_ttl, current_count, current_ttl
+
+    def get_sliding_window(self, key: str, expiry: int) -> Tuple[int, float, int, float]:
+        now = time.time()
+        previous_key, current_key = self.sliding_window_keys(key, expiry, now)
+        return self._sliding_window(previous_key, current_key, expiry, now)
+
+    def clear_sliding_window(self, key: str, expiry: int) -> None:
+        previous_key, current_key = self.sliding_window_keys(key, expiry, time.time())
+        self.clear(previous_key)
+        self.clear(current_key)
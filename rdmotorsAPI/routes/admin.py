@@ -0,0 +1,135 @@
+"""Admin routes blueprint (diagnostics of the worker process serving the request)"""
+from flask import Blueprint, current_app, jsonify, request, send_from_directory
+from rdmotorsAPI.auth import require_api_key
+from rdmotorsAPI.memory import get_memory_profiler
+from rdmotorsAPI.profiler import get_profiler
+
+admin_bp = Blueprint('admin', __name__, url_prefix='/admin')
+
+
+def _profiler_disabled():
+    return jsonify({"error": "Not Found", "message": "Profiler is disabled (PROFILER_ENABLED)"}), 404
+
+
+def _profiler_status(profiler):
+    session = profiler.session
+    return {
+        "running": session is not None,
+        "session": session.status() if session else None,
+        "last_profile": profiler.last_profile,
+        "profiles": profiler.profiles(),
+    }
+
+
+@admin_bp.route("/profiler", methods=["GET"])
+@require_api_key
+def get_profiler_status():
+    """Get the profiler state of this worker and the available profiles"""
+    profiler = get_profiler(current_app)
+    if profiler is None:
+        return _profiler_disabled()
+    return jsonify(_profiler_status(profiler))
+
+
+@admin_bp.route("/profiler", methods=["POST"])
+@require_api_key
+def start_profiler():
+    """Start a profiling session in this worker"""
+    profiler = get_profiler(current_app)
+    if profiler is None:
+        return _profiler_disabled()
+    data = request.get_json(silent=True) or {}
+    try:
+        profiler.start(
+            mode=data.get("mode", "sample"),
+            seconds=data.get("seconds"),
+            interval_ms=data.get("interval_ms", 10),
+            endpoint=data.get("endpoint"),
+            fraction=data.get("fraction", 1.0),
+        )
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": "Bad Request", "message": str(e)}), 400
+    except RuntimeError as e:
+        return jsonify({"error": "Conflict", "message": str(e)}), 409
+    return jsonify(_profiler_status(profiler)), 202
+
+
+@admin_bp.route("/profiler", methods=["DELETE"])
+@require_api_key
+def stop_profiler():
+    """Stop the running profiling session early"""
+    profiler = get_profiler(current_app)
+    if profiler is None:
+        return _profiler_disabled()
+    session = profiler.stop()
+    if session is None:
+        return jsonify({"error": "Conflict", "message": "No profiling session is running"}), 409
+    return jsonify({"status": "stopping", "profile": session.status()["profile"]}), 202
+
+
+@admin_bp.route("/profiler/profiles/<path:filename>", methods=["GET"])
+@require_api_key
+def download_profile(filename):
+    """Download a profile file"""
+    profiler = get_profiler(current_app)
+    if profiler is None:
+        return _profiler_disabled()
+    return send_from_directory(profiler.output_dir, filename, as_attachment=True)
+
+
+def _memory_profiler_disabled():
+    return jsonify({"error": "Not Found", "message": "Memory profiler is disabled (MEMORY_PROFILER_ENABLED)"}), 404
+
+
+@admin_bp.route("/memory", methods=["GET"])
+@require_api_key
+def get_memory_status():
+    """Get RSS, tracemalloc and garbage collector state of this worker"""
+    profiler = get_memory_profiler(current_app)
+    if profiler is None:
+        return _memory_profiler_disabled()
+    return jsonify(profiler.status())
+
+
+@admin_bp.route("/memory/tracemalloc", methods=["POST"])
+@require_api_key
+def start_tracemalloc():
+    """Start tracemalloc in this worker and take the baseline snapshot"""
+    profiler = get_memory_profiler(current_app)
+    if profiler is None:
+        return _memory_profiler_disabled()
+    data = request.get_json(silent=True) or {}
+    try:
+        profiler.start(frames=data.get("frames"), seconds=data.get("seconds"))
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": "Bad Request", "message": str(e)}), 400
+    return jsonify(profiler.status()), 201
+
+
+@admin_bp.route("/memory/tracemalloc", methods=["GET"])
+@require_api_key
+def get_tracemalloc_diff():
+    """Get the top allocators, as growth since the baseline snapshot"""
+    profiler = get_memory_profiler(current_app)
+    if profiler is None:
+        return _memory_profiler_disabled()
+    group_by = request.args.get("group_by", "lineno")
+    limit = request.args.get("limit", 25, type=int)
+    try:
+        top = profiler.top(group_by=group_by, limit=max(1, min(limit, 500)))
+    except ValueError as e:
+        return jsonify({"error": "Bad Request", "message": str(e)}), 400
+    except RuntimeError as e:
+        return jsonify({"error": "Conflict", "message": str(e)}), 409
+    return jsonify({"group_by": group_by, "baseline_taken": profiler.baseline_taken, "top": top})
+
+
+@admin_bp.route("/memory/tracemalloc", methods=["DELETE"])
+@require_api_key
+def stop_tracemalloc():
+    """Stop tracemalloc and drop the baseline snapshot"""
+    profiler = get_memory_profiler(current_app)
+    if profiler is None:
+        return _memory_profiler_disabled()
+    profiler.stop()
+    return jsonify(profiler.status())
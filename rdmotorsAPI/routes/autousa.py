@@ -1,22 +1,39 @@
 """AutoUSA routes blueprint"""
-from flask import Blueprint, current_app, jsonify, request
-from rdmotorsAPI.models import AutoUsa, AutoUsaHistory, db
+from flask import Blueprint, Response, current_app, jsonify, request
+from sqlalchemy.orm import joinedload, selectinload
+from rdmotorsAPI.models import AutoUsa, AutoUsaHistory, PhotoJob, db
 from rdmotorsAPI.auth import require_firebase_auth
 from rdmotorsAPI.utils import get_pagination_params, validate_vin, parse_date, sanitize_string
+from rdmotorsAPI.photos.archive import iter_zip
+from rdmotorsAPI.photos.derivatives import DERIVATIVE_EXTENSIONS, DERIVATIVES_DIR
+from rdmotorsAPI.photos.chunked import (
+    UploadChecksumMismatch,
+    UploadNotFound,
+    UploadOffsetMismatch,
+    UploadTooLarge,
+    append_chunk,
+    create_upload,
+    finalize_upload,
+    get_upload,
+    purge_expired_uploads,
+)
+from rdmotorsAPI.photos.ingest import ZipLimitError
+from rdmotorsAPI.photos.jobs import enqueue_photo_job
+from rdmotorsAPI.photos.manifest import is_photo_name
+from rdmotorsAPI.photos.service import get_photo_storage, get_photos_staging_dir, ingest_archive
+from rdmotorsAPI.tracing import span
 from rdmotorsAPI import limiter  # noqa: E402
 import os
-import shutil
+import functools
 import pathlib
 import logging
-from zipfile import ZipFile
-from werkzeug.utils import secure_filename
+import uuid
+from zipfile import BadZipFile
 
 autousa_bp = Blueprint('autousa', __name__)
 
-
-def _get_photos_auto_dir():
-    """Get AutoUSA photos directory from app config."""
-    return current_app.config["PHOTOS_AUTO_DIR"]
+# AutoUsa.to_dict reads both locations; load them with the row instead of one query each
+WITH_LOCATIONS = (joinedload(AutoUsa.loc_now), joinedload(AutoUsa.loc_next))
 
 
 def _get_base_url():
@@ -24,13 +41,20 @@ def _get_base_url():
     return current_app.config["BASE_URL"]
 
 
+def _wants_async_upload():
+    """Check whether the client asked for asynchronous photo ingestion."""
+    if request.args.get("async", "").lower() in {"1", "true", "yes"}:
+        return True
+    return "respond-async" in request.headers.get("Prefer", "").lower()
+
+
 @autousa_bp.route("/autousa", methods=["GET"])
 @limiter.limit("100 per hour")
 @require_firebase_auth
 def get_autousa():
     """Get all autos with optional pagination"""
     page, per_page = get_pagination_params()
-    pagination = AutoUsa.query.paginate(page=page, per_page=per_page, error_out=False)
+    pagination = AutoUsa.query.options(*WITH_LOCATIONS).paginate(page=page, per_page=per_page, error_out=False)
     return jsonify({
         "data": [car.to_dict() for car in pagination.items],
         "pagination": {
@@ -46,7 +70,7 @@ def get_autousa():
 @require_firebase_auth
 def get_autousa_by_id(car_id):
     """Get auto by ID"""
-    car = AutoUsa.query.get(car_id)
+    car = db.session.get(AutoUsa, car_id, options=WITH_LOCATIONS)
     if car:
         return jsonify(car.to_dict())
     return jsonify({"error": "Auto not found"}), 404
@@ -109,11 +133,11 @@ def update_autousa_by_id(car_id):
 
     try:
         db.session.commit()
-        logging.info(f"Auto updated by ID: {car_id}")
+        logging.info("Auto updated by ID: %s", car_id)
         return jsonify(car.to_dict())
     except Exception as e:
         db.session.rollback()
-        logging.error(f"Error updating auto {car_id}: {str(e)}")
+        logging.error("Error updating auto %s: %s", car_id, e)
         return jsonify({"error": f"Commit failed: {str(e)}"}), 500
 
 
@@ -126,23 +150,21 @@ def delete_autousa_by_id(car_id):
         return jsonify({"error": "Auto not found"}), 404
     
     vin = car.vin
-    vin_folder = os.path.join(_get_photos_auto_dir(), vin)
-    if os.path.exists(vin_folder):
-        try:
-            shutil.rmtree(vin_folder)
-            logging.info(f"Deleted photos for auto ID {car_id} (VIN: {vin})")
-        except Exception as e:
-            logging.error(f"Error deleting photos for auto ID {car_id}: {str(e)}")
+    try:
+        if get_photo_storage().delete_gallery(vin):
+            logging.info("Deleted photos for auto ID %s (VIN: %s)", car_id, vin)
+    except Exception as e:
+        logging.error("Error deleting photos for auto ID %s: %s", car_id, e)
     
     try:
         AutoUsaHistory.query.filter_by(autousa_id=car.id).delete()
         db.session.delete(car)
         db.session.commit()
-        logging.info(f"Auto deleted by ID: {car_id}")
+        logging.info("Auto deleted by ID: %s", car_id)
         return jsonify({"message": "Auto deleted successfully"})
     except Exception as e:
         db.session.rollback()
-        logging.error(f"Error deleting auto {car_id}: {str(e)}")
+        logging.error("Error deleting auto %s: %s", car_id, e)
         return jsonify({"error": "Failed to delete auto", "message": str(e)}), 500
 
 
@@ -153,7 +175,7 @@ def get_autousa_by_vin(vin):
     if not validate_vin(vin):
         return jsonify({"error": "Invalid VIN format. VIN must be 17 alphanumeric characters"}), 400
     
-    car = AutoUsa.query.filter_by(vin=vin).first()
+    car = AutoUsa.query.options(*WITH_LOCATIONS).filter_by(vin=vin).first()
     if not car:
         return jsonify({"error": "Auto not found"}), 404
 
@@ -200,11 +222,11 @@ def upsert_autousa_by_vin(vin):
 
         try:
             db.session.commit()
-            logging.info(f"Auto updated by VIN: {vin}")
+            logging.info("Auto updated by VIN: %s", vin)
             return jsonify(car.to_dict()), 200
         except Exception as e:
             db.session.rollback()
-            logging.error(f"Error updating auto by VIN {vin}: {str(e)}")
+            logging.error("Error updating auto by VIN %s: %s", vin, e)
             return jsonify({"error": "Failed to update auto", "message": str(e)}), 500
 
     else:
@@ -224,11 +246,11 @@ def upsert_autousa_by_vin(vin):
             new_car = AutoUsa(**car_data)
             db.session.add(new_car)
             db.session.commit()
-            logging.info(f"Auto created by VIN: {vin}")
+            logging.info("Auto created by VIN: %s", vin)
             return jsonify(new_car.to_dict()), 201
         except Exception as e:
             db.session.rollback()
-            logging.error(f"Error creating auto by VIN {vin}: {str(e)}")
+            logging.error("Error creating auto by VIN %s: %s", vin, e)
             return jsonify({"error": "Failed to create auto", "message": str(e)}), 500
 
 
@@ -239,7 +261,10 @@ def get_autousa_history_by_vin(vin):
     if not validate_vin(vin):
         return jsonify({"error": "Invalid VIN format. VIN must be 17 alphanumeric characters"}), 400
     
-    car = AutoUsa.query.filter_by(vin=vin).first()
+    car = AutoUsa.query.options(
+        joinedload(AutoUsa.loc_now),
+        selectinload(AutoUsa.history).joinedload(AutoUsaHistory.location),
+    ).filter_by(vin=vin).first()
     if not car:
         return jsonify({"error": "Auto not found"}), 404
 
@@ -280,23 +305,21 @@ def delete_autousa_by_vin(vin):
     if not car:
         return jsonify({"error": "Auto not found"}), 404
 
-    vin_folder = os.path.join(_get_photos_auto_dir(), vin)
-    if os.path.exists(vin_folder):
-        try:
-            shutil.rmtree(vin_folder)
-            logging.info(f"Deleted photos for VIN: {vin}")
-        except Exception as e:
-            logging.error(f"Error deleting photos for VIN {vin}: {str(e)}")
-            return jsonify({"error": f"Failed to delete photos: {str(e)}"}), 500
+    try:
+        if get_photo_storage().delete_gallery(vin):
+            logging.info("Deleted photos for VIN: %s", vin)
+    except Exception as e:
+        logging.error("Error deleting photos for VIN %s: %s", vin, e)
+        return jsonify({"error": f"Failed to delete photos: {str(e)}"}), 500
 
     try:
         db.session.delete(car)
         db.session.commit()
-        logging.info(f"Auto deleted by VIN: {vin}")
+        logging.info("Auto deleted by VIN: %s", vin)
         return jsonify({"message": "Auto deleted successfully"}), 200
     except Exception as e:
         db.session.rollback()
-        logging.error(f"Error deleting auto by VIN {vin}: {str(e)}")
+        logging.error("Error deleting auto by VIN %s: %s", vin, e)
         return jsonify({"error": "Failed to delete auto", "message": str(e)}), 500
 
 
@@ -320,11 +343,11 @@ def add_autousa():
         new_car = AutoUsa(**car_data)
         db.session.add(new_car)
         db.session.commit()
-        logging.info(f"Auto created: {new_car.id} (VIN: {vin})")
+        logging.info("Auto created: %s (VIN: %s)", new_car.id, vin)
         return jsonify(new_car.to_dict()), 201
     except Exception as e:
         db.session.rollback()
-        logging.error(f"Error creating auto: {str(e)}")
+        logging.error("Error creating auto: %s", e)
         return jsonify({"error": "Failed to create auto", "message": str(e)}), 500
 
 
@@ -348,71 +371,314 @@ def upload_auto_photos(vin):
     if not file.filename.endswith('.zip'):
         return jsonify({"error": 'File must be a .zip'}), 400
 
-    vin_folder = os.path.join(_get_photos_auto_dir(), vin)
-    os.makedirs(vin_folder, exist_ok=True)
+    staging_root = get_photos_staging_dir()
+    os.makedirs(staging_root, exist_ok=True)
 
-    temp_path = os.path.join(vin_folder, 'temp.zip')
-    file.save(temp_path)
-
-    SKIP_NAMES = {"DS_Store"}
-    allowed_ext = {'.jpg', '.jpeg', '.png'}
-
-    try:
-        with ZipFile(temp_path, 'r') as zip_ref:
-            for zip_info in zip_ref.infolist():
-                # Ігноруємо AppleDouble, __MACOSX і службові файли від macOS
-                if ("__MACOSX" in zip_info.filename or
-                    zip_info.filename.startswith("._")):
-                    continue
+    temp_path = os.path.join(staging_root, f"{vin}.{uuid.uuid4().hex}.zip")
+    with span("photos.save_upload", vin=vin) as save_span:
+        file.save(temp_path)
+        if save_span is not None:
+            save_span.set_attribute("file.size", os.path.getsize(temp_path))
 
-                safe_name = secure_filename(pathlib.Path(zip_info.filename).name)
-                if not safe_name or safe_name in SKIP_NAMES:
-                    continue
+    return _ingest_uploaded_archive(vin, temp_path)
 
-                ext = pathlib.Path(safe_name).suffix.lower()
-                if ext not in allowed_ext:
-                    continue
 
-                dest_path = os.path.join(vin_folder, safe_name)
-                with zip_ref.open(zip_info) as source, open(dest_path, 'wb') as target:
-                    shutil.copyfileobj(source, target)
+def _ingest_uploaded_archive(vin, temp_path):
+    """Ingest a fully received archive synchronously or as a background job."""
+    if _wants_async_upload():
+        try:
+            with span("photos.enqueue_job", vin=vin):
+                job = enqueue_photo_job(vin, temp_path)
+        except Exception as e:
+            logging.error("Error queueing photo upload for VIN %s: %s", vin, e)
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return jsonify({"error": "Failed to queue upload", "message": str(e)}), 500
+        status_url = f"{_get_base_url()}/autousa/jobs/{job.id}"
+        response = jsonify({"job_id": job.id, "status": job.status, "status_url": status_url})
+        response.headers["Location"] = status_url
+        return response, 202
 
+    try:
+        with span("photos.ingest", vin=vin):
+            ingest_archive(temp_path, vin)
+    except ZipLimitError as e:
+        logging.warning("Rejected photo upload for VIN %s: %s", vin, e)
+        return jsonify({"error": "Archive too large", "message": str(e)}), 413
+    except BadZipFile as e:
+        return jsonify({"error": f'Failed to unzip: {str(e)}'}), 400
     except Exception as e:
-        logging.error(f"Error uploading photos for VIN {vin}: {str(e)}")
+        logging.error("Error uploading photos for VIN %s: %s", vin, e)
         return jsonify({"error": f'Failed to unzip: {str(e)}'}), 500
     finally:
         if os.path.exists(temp_path):
             os.remove(temp_path)
 
-    logging.info(f"Photos uploaded successfully for VIN: {vin}")
+    logging.info("Photos uploaded successfully for VIN: %s", vin)
     return jsonify({'message': f"Photos uploaded successfully for VIN {vin}"}), 201
 
 
+def _get_chunked_uploads_dir():
+    """Get directory holding resumable upload sessions."""
+    return os.path.join(get_photos_staging_dir(), "uploads")
+
+
+@autousa_bp.route("/autousa/<string:vin>/uploads", methods=["POST"])
+@limiter.limit("20 per hour")
+@require_firebase_auth
+def init_chunked_upload(vin):
+    """Start a resumable chunked photo archive upload"""
+    if not validate_vin(vin):
+        return jsonify({"error": "Invalid VIN format. VIN must be 17 alphanumeric characters"}), 400
+
+    if not AutoUsa.query.filter_by(vin=vin).first():
+        return jsonify({"error": "Auto not found"}), 404
+
+    data = request.get_json(silent=True) or {}
+    try:
+        size = int(data.get("size"))
+    except (TypeError, ValueError):
+        return jsonify({"error": "size (total archive bytes) is required"}), 400
+
+    uploads_dir = _get_chunked_uploads_dir()
+    purge_expired_uploads(uploads_dir, current_app.config.get("PHOTO_UPLOAD_SESSION_TTL", 24 * 3600))
+    try:
+        state = create_upload(
+            uploads_dir,
+            vin,
+            size,
+            checksum=data.get("sha256"),
+            max_archive_bytes=current_app.config.get("PHOTO_UPLOAD_MAX_ARCHIVE_BYTES"),
+        )
+    except UploadTooLarge as e:
+        return jsonify({"error": "Archive too large", "message": str(e)}), 413
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    state["chunk_size"] = current_app.config.get("PHOTO_UPLOAD_CHUNK_BYTES", 8 * 1024 * 1024)
+    return jsonify(state), 201
+
+
+@autousa_bp.route("/autousa/<string:vin>/uploads/<string:upload_id>", methods=["GET"])
+@require_firebase_auth
+def get_chunked_upload(vin, upload_id):
+    """Get received offset of a chunked upload (used to resume)"""
+    try:
+        state = get_upload(_get_chunked_uploads_dir(), upload_id)
+    except UploadNotFound:
+        return jsonify({"error": "Upload not found"}), 404
+    if state["vin"] != vin:
+        return jsonify({"error": "Upload not found"}), 404
+    return jsonify(state)
+
+
+@autousa_bp.route("/autousa/<string:vin>/uploads/<string:upload_id>", methods=["PUT", "PATCH"])
+@require_firebase_auth
+def put_upload_chunk(vin, upload_id):
+    """Append a chunk at the offset given in the Upload-Offset header"""
+    try:
+        offset = int(request.headers.get("Upload-Offset", ""))
+    except ValueError:
+        return jsonify({"error": "Upload-Offset header is required"}), 400
+
+    uploads_dir = _get_chunked_uploads_dir()
+    try:
+        state = get_upload(uploads_dir, upload_id)
+        if state["vin"] != vin:
+            raise UploadNotFound(upload_id)
+        new_offset = append_chunk(
+            uploads_dir,
+            upload_id,
+            offset,
+            request.stream,
+            checksum=request.headers.get("X-Chunk-SHA256"),
+            max_chunk_bytes=current_app.config.get("PHOTO_UPLOAD_MAX_CHUNK_BYTES"),
+        )
+    except UploadNotFound:
+        return jsonify({"error": "Upload not found"}), 404
+    except UploadOffsetMismatch as e:
+        return jsonify({"error": "Offset mismatch", "offset": e.expected}), 409
+    except UploadChecksumMismatch as e:
+        return jsonify({"error": str(e), "offset": offset}), 400
+    except UploadTooLarge as e:
+        return jsonify({"error": "Chunk too large", "message": str(e)}), 413
+
+    return jsonify({"upload_id": upload_id, "offset": new_offset, "size": state["size"]})
+
+
+@autousa_bp.route("/autousa/<string:vin>/uploads/<string:upload_id>/finalize", methods=["POST"])
+@require_firebase_auth
+def finalize_chunked_upload(vin, upload_id):
+    """Verify a completed chunked upload and ingest it like a regular upload"""
+    uploads_dir = _get_chunked_uploads_dir()
+    temp_path = os.path.join(get_photos_staging_dir(), f"{vin}.{upload_id}.zip")
+    try:
+        state = get_upload(uploads_dir, upload_id)
+        if state["vin"] != vin:
+            raise UploadNotFound(upload_id)
+        finalize_upload(uploads_dir, upload_id, temp_path)
+    except UploadNotFound:
+        return jsonify({"error": "Upload not found"}), 404
+    except UploadOffsetMismatch as e:
+        return jsonify({"error": "Upload incomplete", "offset": e.expected}), 409
+    except UploadChecksumMismatch as e:
+        return jsonify({"error": str(e)}), 400
+
+    return _ingest_uploaded_archive(vin, temp_path)
+
+
+@autousa_bp.route("/autousa/jobs/<string:job_id>", methods=["GET"])
+@require_firebase_auth
+def get_photo_job(job_id):
+    """Get status of an asynchronous photo upload"""
+    job = db.session.get(PhotoJob, job_id)
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job.to_dict())
+
+
+def _photo_files(vin, manifest, base_url):
+    """Build photo entries (URL, dimensions, responsive sizes) from a gallery manifest."""
+    storage = get_photo_storage()
+
+    def url(path):
+        # CDN or presigned URL when the backend has one, otherwise served by this API
+        return storage.url_for(vin, path) or f"{base_url}/photos/autousa/{vin}/{path}"
+
+    files = []
+    for photo in manifest["photos"]:
+        sizes = [
+            {"url": url(d["name"]), "width": d["width"], "height": d["height"]}
+            for d in photo.get("derivatives", [])
+        ]
+        files.append({
+            "url": url(photo["name"]),
+            "width": photo["width"],
+            "height": photo["height"],
+            "size": photo["size"],
+            "sizes": sizes,
+            "srcset": ", ".join(f"{size['url']} {size['width']}w" for size in sizes),
+        })
+    return files
+
+
 @autousa_bp.route("/autousa/<string:vin>/photos", methods=["GET"])
 def get_auto_photos(vin):
     """Get photos for auto by VIN"""
     if not validate_vin(vin):
         return jsonify({"error": "Invalid VIN format. VIN must be 17 alphanumeric characters"}), 400
-    
-    vin_folder = os.path.join(_get_photos_auto_dir(), vin)
-    if not os.path.exists(vin_folder):
-        return jsonify({"error": "No photos found for this VIN"}), 404
-
-    files = []
-    allowed_ext = {'.jpg', '.jpeg', '.png'}
 
     try:
-        for f in sorted(os.listdir(vin_folder)):
-            if f.startswith('.') or f == "DS_Store":
-                continue
+        with span("photos.load_manifest", vin=vin):
+            manifest = get_photo_storage().load_manifest(vin)
+    except Exception as e:
+        logging.error("Error reading photos for VIN %s: %s", vin, e)
+        return jsonify({"error": "Failed to read photos", "message": str(e)}), 500
 
-            ext = pathlib.Path(f).suffix.lower()
-            if ext not in allowed_ext:
-                continue
+    if manifest is None:
+        return jsonify({"error": "No photos found for this VIN"}), 404
 
-            files.append(f"{_get_base_url()}/photos/autousa/{vin}/{f}")
+    with span("photos.build_urls", vin=vin, photos=len(manifest["photos"])):
+        files = _photo_files(vin, manifest, _get_base_url())
+    return jsonify({"vin": vin, "photos": [f["url"] for f in files], "files": files})
 
-        return jsonify({"vin": vin, "photos": files})
+
+@autousa_bp.route("/autousa/<string:vin>/photos/archive", methods=["GET"])
+@limiter.limit("60 per hour")
+def download_auto_photos(vin):
+    """Download all photos of an auto as a streamed ZIP archive"""
+    if not validate_vin(vin):
+        return jsonify({"error": "Invalid VIN format. VIN must be 17 alphanumeric characters"}), 400
+
+    storage = get_photo_storage()
+    try:
+        manifest = storage.load_manifest(vin)
     except Exception as e:
-        logging.error(f"Error reading photos for VIN {vin}: {str(e)}")
+        logging.error("Error reading photos for VIN %s: %s", vin, e)
         return jsonify({"error": "Failed to read photos", "message": str(e)}), 500
+
+    if not manifest or not manifest["photos"]:
+        return jsonify({"error": "No photos found for this VIN"}), 404
+
+    files = [
+        (photo["name"], photo["size"], functools.partial(storage.open, vin, photo["name"]))
+        for photo in manifest["photos"]
+    ]
+    response = Response(iter_zip(files), mimetype="application/zip", direct_passthrough=True)
+    response.headers["Content-Disposition"] = f'attachment; filename="{vin}-photos.zip"'
+    response.headers["Cache-Control"] = "no-store"
+    return response
+
+
+@autousa_bp.route("/autousa/photos", methods=["GET", "POST"])
+@limiter.limit("60 per hour")  # One request loads up to PHOTO_BATCH_MAX_VINS manifests
+def get_auto_photos_batch():
+    """Get cover photo and photo count for many VINs (GET ?vins=A,B or POST {"vins": [...]})"""
+    if request.method == "POST":
+        data = request.get_json(silent=True) or {}
+        vins = data.get("vins")
+        full = bool(data.get("full"))
+        if not isinstance(vins, list) or not all(isinstance(vin, str) for vin in vins):
+            return jsonify({"error": "vins must be a list of VIN strings"}), 400
+    else:
+        vins = [vin for value in request.args.getlist("vins") for vin in value.split(",") if vin]
+        full = request.args.get("full", "").lower() in {"1", "true", "yes"}
+
+    vins = list(dict.fromkeys(vin.strip().upper() for vin in vins))
+    if not vins:
+        return jsonify({"error": "At least one VIN is required"}), 400
+    max_vins = current_app.config.get("PHOTO_BATCH_MAX_VINS", 200)
+    if len(vins) > max_vins:
+        return jsonify({"error": f"At most {max_vins} VINs per request"}), 400
+    invalid = [vin for vin in vins if not validate_vin(vin)]
+    if invalid:
+        return jsonify({"error": "Invalid VIN format. VIN must be 17 alphanumeric characters", "vins": invalid}), 400
+
+    storage = get_photo_storage()
+    base_url = _get_base_url()
+    results = []
+    for vin in vins:
+        try:
+            manifest = storage.load_manifest(vin)
+        except Exception as e:
+            logging.error("Error reading photos for VIN %s: %s", vin, e)
+            manifest = None
+        photos = manifest["photos"] if manifest else []
+        # Only the cover is serialized unless the full list was asked for
+        files = _photo_files(vin, {"photos": photos if full else photos[:1]}, base_url)
+        entry = {
+            "vin": vin,
+            "count": len(photos),
+            "cover": files[0]["url"] if files else None,
+            "cover_srcset": files[0]["srcset"] if files else None,
+        }
+        if full:
+            entry["photos"] = [f["url"] for f in files]
+            entry["files"] = files
+        results.append(entry)
+
+    return jsonify({"data": results})
+
+
+@autousa_bp.route("/photos/autousa/<string:vin>/<string:filename>", methods=["GET"])
+def serve_auto_photo(vin, filename):
+    """Serve a single AutoUSA photo file"""
+    if not validate_vin(vin):
+        return jsonify({"error": "Invalid VIN format. VIN must be 17 alphanumeric characters"}), 400
+
+    if not is_photo_name(filename):
+        return jsonify({"error": "Photo not found"}), 404
+
+    return get_photo_storage().send(vin, filename, max_age=3600)
+
+
+@autousa_bp.route("/photos/autousa/<string:vin>/sizes/<int:width>/<string:filename>", methods=["GET"])
+def serve_auto_photo_size(vin, width, filename):
+    """Serve a responsive-size derivative of an AutoUSA photo"""
+    if not validate_vin(vin):
+        return jsonify({"error": "Invalid VIN format. VIN must be 17 alphanumeric characters"}), 400
+
+    if filename.startswith('.') or pathlib.Path(filename).suffix.lower() not in DERIVATIVE_EXTENSIONS:
+        return jsonify({"error": "Photo not found"}), 404
+
+    return get_photo_storage().send(vin, f"{DERIVATIVES_DIR}/{width}/{filename}", max_age=3600)
@@ -51,11 +51,11 @@ def add_car():
         new_car = Car(**data)
         db.session.add(new_car)
         db.session.commit()
-        logging.info(f"Car created: {new_car.car_id}")
+        logging.info("Car created: %s", new_car.car_id)
         return jsonify(new_car.to_dict()), 201
     except Exception as e:
         db.session.rollback()
-        logging.error(f"Error creating car: {str(e)}")
+        logging.error("Error creating car: %s", e)
         return jsonify({"error": "Failed to create car", "message": str(e)}), 500
 
 
@@ -77,11 +77,11 @@ def update_car(car_id):
                 setattr(car, key, value)
 
         db.session.commit()
-        logging.info(f"Car updated: {car_id}")
+        logging.info("Car updated: %s", car_id)
         return jsonify(car.to_dict())
     except Exception as e:
         db.session.rollback()
-        logging.error(f"Error updating car {car_id}: {str(e)}")
+        logging.error("Error updating car %s: %s", car_id, e)
         return jsonify({"error": "Failed to update car", "message": str(e)}), 500
 
 
@@ -96,9 +96,9 @@ def delete_car(car_id):
     try:
         db.session.delete(car)
         db.session.commit()
-        logging.info(f"Car deleted: {car_id}")
+        logging.info("Car deleted: %s", car_id)
         return jsonify({"message": "Car deleted successfully"})
     except Exception as e:
         db.session.rollback()
-        logging.error(f"Error deleting car {car_id}: {str(e)}")
+        logging.error("Error deleting car %s: %s", car_id, e)
         return jsonify({"error": "Failed to delete car", "message": str(e)}), 500
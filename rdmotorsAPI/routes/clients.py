@@ -66,11 +66,11 @@ def add_client():
         new_client = Client(**data)
         db.session.add(new_client)
         db.session.commit()
-        logging.info(f"Client created: {new_client.client_id}")
+        logging.info("Client created: %s", new_client.client_id)
         return jsonify(new_client.to_dict()), 201
     except Exception as e:
         db.session.rollback()
-        logging.error(f"Error creating client: {str(e)}")
+        logging.error("Error creating client: %s", e)
         return jsonify({"error": "Failed to create client", "message": str(e)}), 500
 
 
@@ -109,11 +109,11 @@ def update_client(client_id):
                 setattr(client, key, value)
 
         db.session.commit()
-        logging.info(f"Client updated: {client_id}")
+        logging.info("Client updated: %s", client_id)
         return jsonify(client.to_dict())
     except Exception as e:
         db.session.rollback()
-        logging.error(f"Error updating client {client_id}: {str(e)}")
+        logging.error("Error updating client %s: %s", client_id, e)
         return jsonify({"error": "Failed to update client", "message": str(e)}), 500
 
 
@@ -129,9 +129,9 @@ def delete_client(client_id):
     try:
         db.session.delete(client)
         db.session.commit()
-        logging.info(f"Client deleted: {client_id}")
+        logging.info("Client deleted: %s", client_id)
         return jsonify({"message": "Client deleted successfully"})
     except Exception as e:
         db.session.rollback()
-        logging.error(f"Error deleting client {client_id}: {str(e)}")
+        logging.error("Error deleting client %s: %s", client_id, e)
         return jsonify({"error": "Failed to delete client", "message": str(e)}), 500
@@ -73,11 +73,11 @@ def add_service():
         new_service = Service(**data)
         db.session.add(new_service)
         db.session.commit()
-        logging.info(f"Service created: {new_service.service_id}")
+        logging.info("Service created: %s", new_service.service_id)
         return jsonify(new_service.to_dict()), 201
     except Exception as e:
         db.session.rollback()
-        logging.error(f"Error creating service: {str(e)}")
+        logging.error("Error creating service: %s", e)
         return jsonify({"error": "Failed to create service", "message": str(e)}), 500
 
 
@@ -100,11 +100,11 @@ def update_service(service_id):
                 setattr(service, key, value)
 
         db.session.commit()
-        logging.info(f"Service updated: {service_id}")
+        logging.info("Service updated: %s", service_id)
         return jsonify(service.to_dict())
     except Exception as e:
         db.session.rollback()
-        logging.error(f"Error updating service {service_id}: {str(e)}")
+        logging.error("Error updating service %s: %s", service_id, e)
         return jsonify({"error": "Failed to update service", "message": str(e)}), 500
 
 
@@ -120,9 +120,9 @@ def delete_service(service_id):
     try:
         db.session.delete(service)
         db.session.commit()
-        logging.info(f"Service deleted: {service_id}")
+        logging.info("Service deleted: %s", service_id)
         return jsonify({"message": "Service deleted successfully"})
     except Exception as e:
         db.session.rollback()
-        logging.error(f"Error deleting service {service_id}: {str(e)}")
+        logging.error("Error deleting service %s: %s", service_id, e)
         return jsonify({"error": "Failed to delete service", "message": str(e)}), 500
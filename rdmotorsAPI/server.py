@@ -1,24 +1,36 @@
 """Main server file - entry point for the API"""
-from flask import jsonify, request, make_response, send_from_directory
+from flask import jsonify, request
 from werkzeug.exceptions import HTTPException
 from datetime import datetime
 import os
 import logging
 from rdmotorsAPI import create_app, db
-from rdmotorsAPI.config import PHOTOS_DIR
-
-# Configure logging
-log_dir = os.getenv("LOG_DIR", os.path.dirname(os.path.abspath(__file__)))
-log_file = os.path.join(log_dir, "autousa_photos.log")
-os.makedirs(log_dir, exist_ok=True)
-
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s [%(levelname)s] %(message)s',
-    handlers=[
-        logging.FileHandler(log_file),
-        logging.StreamHandler()
-    ]
+from rdmotorsAPI.config import (
+    LOG_BACKUP_COUNT,
+    LOG_DIR,
+    LOG_FILE,
+    LOG_FORMAT,
+    LOG_INFO_SAMPLE_RATE,
+    LOG_LEVEL,
+    LOG_MAX_BYTES,
+    LOG_QUEUE_SIZE,
+    PHOTOS_DIR,
+)
+from rdmotorsAPI.file_serving import send_file_response
+from rdmotorsAPI.logging_pipeline import configure_logging
+from rdmotorsAPI.server_timing import timed
+from rdmotorsAPI.static_manifest import send_static_asset
+from rdmotorsAPI.utils import serve_spa_index
+
+# Configure logging: records are written by a background thread (see rdmotorsAPI.logging_pipeline)
+configure_logging(
+    os.path.join(LOG_DIR, LOG_FILE),
+    level=LOG_LEVEL,
+    log_format=LOG_FORMAT,
+    max_bytes=LOG_MAX_BYTES,
+    backup_count=LOG_BACKUP_COUNT,
+    info_sample_rate=LOG_INFO_SAMPLE_RATE,
+    queue_size=LOG_QUEUE_SIZE,
 )
 
 # Create Flask app
@@ -45,7 +57,7 @@ def register_error_handlers(app):
             return jsonify({"error": e.name, "description": e.description, "code": e.code}), e.code
 
         logging.error(
-            f"Exception occurred at {request.method} {request.path}",
+            "Exception occurred at %s %s", request.method, request.path,
             exc_info=True
         )
         return jsonify({"error": "Internal Server Error", "message": "An unexpected error occurred"}), 500
@@ -57,12 +69,13 @@ register_error_handlers(app)
 def register_middleware(app):
     """Register middleware functions"""
     @app.before_request
+    @timed("hooks")
     def validate_json():
         # Skip JSON validation for endpoints that are not JSON-only.
         endpoint = request.endpoint or ""
         if request.method == "OPTIONS":
             return
-        if endpoint.endswith("upload_auto_photos") or endpoint.endswith("get_auto_photos"):
+        if endpoint.endswith(("upload_auto_photos", "get_auto_photos", "put_upload_chunk", "finalize_chunked_upload")):
             return
         if endpoint in {"serve_photo", "serve_spa", "session.session_logout"}:
             return
@@ -71,6 +84,7 @@ def register_middleware(app):
                 return jsonify({"error": "Content-Type must be application/json"}), 400
 
     @app.after_request
+    @timed("hooks")
     def add_security_headers(response):
         """Add security headers to all responses"""
         response.headers['X-Content-Type-Options'] = 'nosniff'
@@ -87,7 +101,7 @@ register_middleware(app)
 @app.route('/photos/services/<path:filename>')
 def serve_photo(filename):
     """Serve service photos"""
-    resp = make_response(send_from_directory(PHOTOS_DIR, filename))
+    resp = send_file_response(PHOTOS_DIR, filename, "photos/services")
     resp.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
     resp.headers['Pragma'] = 'no-cache'
     resp.headers['Expires'] = '0'
@@ -98,11 +112,10 @@ def serve_photo(filename):
 @app.route("/<path:path>")
 def serve_spa(path):
     """Serve SPA frontend"""
-    full_path = os.path.join(app.static_folder, path)
-    if os.path.exists(full_path):
-        return send_from_directory(app.static_folder, path)
-    else:
-        return send_from_directory(app.static_folder, "index.html")
+    response = send_static_asset(path) if path else None
+    if response is None:
+        return serve_spa_index()
+    return response
 
 
 # Health check endpoint
@@ -118,7 +131,7 @@ def health_check():
             "timestamp": datetime.utcnow().isoformat()
         }), 200
     except Exception as e:
-        logging.error(f"Health check failed: {str(e)}")
+        logging.error("Health check failed: %s", e)
         return jsonify({
             "status": "unhealthy",
             "database": "disconnected",
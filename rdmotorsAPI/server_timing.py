@@ -0,0 +1,181 @@
+"""Opt-in per-request phase timings sent as a ``Server-Timing`` header.
+
+With ``SERVER_TIMING_ENABLED`` every request gets a ``ServerTiming`` recorder
+on ``flask.g``. Phases are added by:
+
+- ``phase(name)`` / ``@timed(name)`` around code paths: auth, ``to_dict``,
+  the rate limiter check and the hooks in ``server.py``
+- the shared SQL statement listener of ``sql_events`` (``sql``, with the statement count)
+- the JSON provider (``json``: ``jsonify`` serialization)
+
+and the totals are sent as ``Server-Timing: auth;dur=0.4, sql;dur=3.1;desc="5 queries", ...``
+(visible in the browser dev tools) and logged with a ``server_timing`` record
+attribute. Nested phases of the same name (``to_dict`` calling ``to_dict``) are
+counted once.
+
+When disabled no hooks, listeners or providers are installed; ``phase`` and
+``timed`` only check that no recorder exists.
+"""
+from __future__ import annotations
+
+import contextlib
+import logging
+import time
+from functools import wraps
+from typing import Dict, Optional
+
+from flask import g, has_request_context, request
+from flask.json.provider import DefaultJSONProvider
+from flask_limiter import Limiter
+
+from rdmotorsAPI.sql_events import StatementObserver, add_statement_observer
+
+G_KEY = "server_timing"
+_NULL_PHASE = contextlib.nullcontext()
+
+
+class _Phase:
+    __slots__ = ("timing", "name", "started")
+
+    def __init__(self, timing: "ServerTiming", name: str):
+        self.timing = timing
+        self.name = name
+        self.started = 0.0
+
+    def __enter__(self):
+        self.timing._active.add(self.name)
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.timing.add(self.name, time.perf_counter() - self.started)
+        self.timing._active.discard(self.name)
+        return False
+
+
+class ServerTiming:
+    """Accumulated phase durations of one request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.durations: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+        self._active = set()
+
+    def add(self, name: str, seconds: float) -> None:
+        self.durations[name] = self.durations.get(name, 0.0) + seconds
+        self.counts[name] = self.counts.get(name, 0) + 1
+
+    def phase(self, name: str):
+        if name in self._active:
+            return _NULL_PHASE
+        return _Phase(self, name)
+
+    def as_milliseconds(self) -> Dict[str, float]:
+        timings = {name: round(seconds * 1000, 3) for name, seconds in self.durations.items()}
+        timings["total"] = round((time.perf_counter() - self.started) * 1000, 3)
+        return timings
+
+    def header_value(self, timings: Dict[str, float]) -> str:
+        metrics = []
+        for name, milliseconds in timings.items():
+            metric = f"{name};dur={milliseconds}"
+            if name == "sql":
+                metric += f';desc="{self.counts.get(name, 0)} queries"'
+            metrics.append(metric)
+        return ", ".join(metrics)
+
+
+def current_timing() -> Optional[ServerTiming]:
+    """Get the recorder of the current request, or None when timing is off."""
+    if not has_request_context():
+        return None
+    return g.get(G_KEY)
+
+
+def phase(name: str):
+    """Context manager timing a block as the named phase of the current request."""
+    timing = current_timing()
+    if timing is None:
+        return _NULL_PHASE
+    return timing.phase(name)
+
+
+def timed(name: str):
+    """Decorator timing every call of a function as the named phase."""
+    def decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            with phase(name):
+                return f(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class TimedLimiter(Limiter):
+    """Limiter whose checks (middleware and ``@limiter.limit``) are timed as ``ratelimit``."""
+
+    def _check_request_limit(self, *args, **kwargs):
+        with phase("ratelimit"):
+            return super()._check_request_limit(*args, **kwargs)
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """JSON provider timing serialization as ``json``."""
+
+    def dumps(self, obj, **kwargs):
+        with phase("json"):
+            return super().dumps(obj, **kwargs)
+
+
+class _SQLTiming(StatementObserver):
+    """Adds every statement of a timed request to its ``sql`` phase."""
+
+    def start(self, statement, parameters, executemany):
+        return current_timing()
+
+    def finish(self, timing, statement, parameters, duration, cursor):
+        if timing is not None:
+            timing.add("sql", duration)
+
+    def fail(self, timing, statement, parameters, duration, error):
+        if timing is not None:
+            timing.add("sql", duration)
+
+
+_SQL_TIMING = _SQLTiming()
+
+
+def init_server_timing(app) -> None:
+    """Install request timing when SERVER_TIMING_ENABLED is set (call before other hooks are registered)."""
+    if not app.config.get("SERVER_TIMING_ENABLED", False):
+        return
+
+    from rdmotorsAPI import db
+
+    app.json = TimedJSONProvider(app)
+    with app.app_context():
+        engine = db.engine
+    add_statement_observer(engine, _SQL_TIMING)
+    log_threshold = app.config.get("SERVER_TIMING_LOG_THRESHOLD_MS", 0)
+
+    # Registered first: runs before every other before_request hook and after every other after_request hook
+    @app.before_request
+    def start_server_timing():
+        setattr(g, G_KEY, ServerTiming())
+
+    @app.after_request
+    def add_server_timing(response):
+        timing = g.pop(G_KEY, None)
+        if timing is None:
+            return response
+        timings = timing.as_milliseconds()
+        response.headers["Server-Timing"] = timing.header_value(timings)
+        if timings["total"] >= log_threshold:
+            logging.info(
+                "Server timing %s %s %d: %s",
+                request.method, request.path, response.status_code,
+                " ".join(f"{name}={milliseconds}ms" for name, milliseconds in timings.items()),
+                extra={"server_timing": timings, "sql_queries": timing.counts.get("sql", 0)},
+            )
+        return response
@@ -0,0 +1,78 @@
+"""One set of SQLAlchemy engine listeners shared by the SQL diagnostics.
+
+Server timing, the query profiler and tracing all need the duration of every
+statement. Rather than each installing its own ``before_cursor_execute`` /
+``after_cursor_execute`` pair with its own stack on ``conn.info``, the engine
+gets a single pair (plus ``handle_error``) that times the statement once and
+passes the duration to every ``StatementObserver`` added with
+``add_statement_observer``. ``handle_error`` pops the entry of a failed
+statement, so nothing accumulates on pooled connections.
+"""
+from __future__ import annotations
+
+import time
+import weakref
+from typing import Any, List
+
+from sqlalchemy import event
+
+CONN_INFO_KEY = "sql_statements"
+_listeners: "weakref.WeakKeyDictionary[Any, _EngineListener]" = weakref.WeakKeyDictionary()
+
+
+class StatementObserver:
+    """Receives the statements of an engine; subclasses override the hooks they need."""
+
+    def start(self, statement: str, parameters: Any, executemany: bool) -> Any:
+        """Called before execution; the return value is passed back to finish or fail."""
+        return None
+
+    def finish(self, token: Any, statement: str, parameters: Any, duration: float, cursor) -> None:
+        """Called after a successful execution with its duration in seconds."""
+
+    def fail(self, token: Any, statement: str, parameters: Any, duration: float, error: BaseException) -> None:
+        """Called when the execution raised."""
+
+
+class _EngineListener:
+    def __init__(self, engine):
+        self.observers: List[StatementObserver] = []
+        event.listen(engine, "before_cursor_execute", self.before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self.after_cursor_execute)
+        event.listen(engine, "handle_error", self.handle_error)
+
+    def before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        observers = tuple(self.observers)
+        tokens = [observer.start(statement, parameters, executemany) for observer in observers]
+        conn.info.setdefault(CONN_INFO_KEY, []).append((time.perf_counter(), observers, tokens))
+
+    def after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        stack = conn.info.get(CONN_INFO_KEY)
+        if not stack:
+            return
+        started, observers, tokens = stack.pop()
+        duration = time.perf_counter() - started
+        for observer, token in zip(observers, tokens):
+            observer.finish(token, statement, parameters, duration, cursor)
+
+    @staticmethod
+    def handle_error(exception_context):
+        # A failed statement gets no after_cursor_execute: release its entry here
+        connection = exception_context.connection
+        stack = connection.info.get(CONN_INFO_KEY) if connection is not None else None
+        if not stack:
+            return
+        started, observers, tokens = stack.pop()
+        duration = time.perf_counter() - started
+        for observer, token in zip(observers, tokens):
+            observer.fail(token, exception_context.statement, exception_context.parameters, duration,
+                          exception_context.original_exception)
+
+
+def add_statement_observer(engine, observer: StatementObserver) -> None:
+    """Feed every statement the engine executes to observer (listeners are installed once per engine)."""
+    listener = _listeners.get(engine)
+    if listener is None:
+        listener = _listeners[engine] = _EngineListener(engine)
+    if observer not in listener.observers:
+        listener.observers.append(observer)
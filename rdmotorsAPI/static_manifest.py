@@ -0,0 +1,239 @@
+"""In-memory manifest of the SPA static folder.
+
+The manifest is built once and refreshed only when the folder changes (checked
+at most every ``STATIC_MANIFEST_CHECK_INTERVAL`` seconds by stat-ing the files). It records
+every asset with its size, ETag and precompressed gzip/brotli variants so SPA
+requests are answered without touching the filesystem.
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+from flask import current_app, request
+
+from rdmotorsAPI.file_serving import FILE_SERVE_MODE_DIRECT, get_file_serve_mode, send_file_response
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip variants are always available
+    brotli = None
+
+# Vite/webpack style content hashes: app.3f9a1c2b.js, index-BfA3x9_Q.css
+HASHED_NAME_RE = re.compile(r"[.-][A-Za-z0-9_]{8,}\.[A-Za-z0-9]+$")
+COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json", "image/svg+xml",
+                      "application/xml", "application/manifest+json", "font/ttf", "font/otf")
+MIN_COMPRESS_SIZE = 512
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+DEFAULT_CACHE_CONTROL = "public, max-age=3600"
+INDEX_CACHE_CONTROL = "no-cache"
+# Photo trees may live under the static folder; they have their own routes and are never indexed.
+EXCLUDED_TOP_DIRS = {"photos"}
+
+
+@dataclass
+class StaticAsset:
+    """Single file of the static folder."""
+    path: str
+    size: int
+    mtime: float
+    etag: str
+    mimetype: str
+    hashed: bool
+    body: Optional[bytes] = None
+    variants: Dict[str, bytes] = field(default_factory=dict)
+    disk_variants: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def cache_control(self) -> str:
+        if self.hashed:
+            return IMMUTABLE_CACHE_CONTROL
+        if self.path == "index.html":
+            return INDEX_CACHE_CONTROL
+        return DEFAULT_CACHE_CONTROL
+
+
+def _is_compressible(mimetype: str) -> bool:
+    return mimetype.startswith(COMPRESSIBLE_TYPES)
+
+
+def _compress_variants(body: bytes) -> Dict[str, bytes]:
+    """Precompute compressed variants that are actually smaller than the body."""
+    variants = {"gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants["br"] = brotli.compress(body, quality=11)
+    return {encoding: data for encoding, data in variants.items() if len(data) < len(body)}
+
+
+class StaticManifest:
+    """Manifest of a static folder, rebuilt when the folder signature changes."""
+
+    def __init__(self, root: str, max_inline_bytes: int = 512 * 1024, check_interval: float = 2.0):
+        self.root = root
+        self.max_inline_bytes = max_inline_bytes
+        self.check_interval = check_interval
+        self.assets: Dict[str, StaticAsset] = {}
+        self._signature = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _walk(self):
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = [
+                d for d in dirnames
+                if not d.startswith(".") and not (dirpath == self.root and d in EXCLUDED_TOP_DIRS)
+            ]
+            yield dirpath, filenames
+
+    def _folder_signature(self):
+        """Change detector: mtimes of the directories and (mtime, size) of every file.
+
+        Directory mtimes catch added, removed and renamed files; the file stats catch
+        files overwritten in place (favicon.ico, robots.txt, un-hashed assets).
+        """
+        signature = []
+        for dirpath, filenames in self._walk():
+            try:
+                signature.append((dirpath, os.stat(dirpath).st_mtime_ns))
+            except OSError:
+                continue
+            for name in filenames:
+                if name.startswith("."):
+                    continue
+                full_path = os.path.join(dirpath, name)
+                try:
+                    stat = os.stat(full_path)
+                except OSError:
+                    continue
+                signature.append((full_path, stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+
+    def _load_asset(self, rel_path: str, full_path: str, stat: os.stat_result, names) -> StaticAsset:
+        mimetype = mimetypes.guess_type(rel_path)[0] or "application/octet-stream"
+        asset = StaticAsset(
+            path=rel_path,
+            size=stat.st_size,
+            mtime=stat.st_mtime,
+            etag=f"{stat.st_mtime_ns:x}-{stat.st_size:x}",
+            mimetype=mimetype,
+            hashed=bool(HASHED_NAME_RE.search(os.path.basename(rel_path))),
+        )
+        base_name = os.path.basename(full_path)
+        for encoding, suffix in (("br", ".br"), ("gzip", ".gz")):
+            if base_name + suffix in names:
+                asset.disk_variants[encoding] = rel_path + suffix
+
+        if stat.st_size <= self.max_inline_bytes:
+            with open(full_path, "rb") as f:
+                asset.body = f.read()
+            asset.etag = hashlib.md5(asset.body).hexdigest()
+            if _is_compressible(mimetype) and stat.st_size >= MIN_COMPRESS_SIZE:
+                asset.variants = _compress_variants(asset.body)
+        return asset
+
+    def build(self) -> None:
+        """Scan the static folder and replace the manifest atomically."""
+        assets: Dict[str, StaticAsset] = {}
+        signature = self._folder_signature()
+        for dirpath, filenames in self._walk():
+            names = set(filenames)
+            for name in filenames:
+                if name.startswith(".") or name.endswith((".gz", ".br")):
+                    continue
+                full_path = os.path.join(dirpath, name)
+                rel_path = os.path.relpath(full_path, self.root).replace(os.sep, "/")
+                try:
+                    stat = os.stat(full_path)
+                    assets[rel_path] = self._load_asset(rel_path, full_path, stat, names)
+                except OSError:
+                    continue
+        self.assets = assets
+        self._signature = signature
+
+    def refresh(self) -> None:
+        """Rebuild the manifest if the folder changed since the last check."""
+        now = time.monotonic()
+        if self._signature is not None and now - self._checked_at < self.check_interval:
+            return
+        with self._lock:
+            if self._signature is not None and now - self._checked_at < self.check_interval:
+                return
+            self._checked_at = now
+            if self._folder_signature() != self._signature:
+                self.build()
+
+    def get(self, path: str) -> Optional[StaticAsset]:
+        self.refresh()
+        return self.assets.get(path)
+
+
+def get_static_manifest() -> StaticManifest:
+    """Get (or lazily create) the manifest for the current app's static folder."""
+    manifest = current_app.extensions.get("static_manifest")
+    if manifest is None or manifest.root != current_app.static_folder:
+        manifest = StaticManifest(
+            current_app.static_folder,
+            max_inline_bytes=current_app.config.get("STATIC_MANIFEST_MAX_INLINE_BYTES", 512 * 1024),
+            check_interval=current_app.config.get("STATIC_MANIFEST_CHECK_INTERVAL", 2.0),
+        )
+        current_app.extensions["static_manifest"] = manifest
+    return manifest
+
+
+def init_static_manifest(app) -> None:
+    """Build the static manifest at startup."""
+    with app.app_context():
+        get_static_manifest().refresh()
+
+
+def _negotiate_encoding(available) -> Optional[str]:
+    """Pick the best encoding accepted by the client among available variants."""
+    accepted = request.accept_encodings
+    for encoding in ("br", "gzip"):
+        if encoding in available and accepted[encoding]:
+            return encoding
+    return None
+
+
+def send_static_asset(path: str):
+    """
+    Send asset from the static manifest.
+
+    Returns:
+        Flask response, or None when the path is not a known asset
+    """
+    asset = get_static_manifest().get(path)
+    if asset is None:
+        return None
+
+    if asset.body is None or get_file_serve_mode() != FILE_SERVE_MODE_DIRECT:
+        filename = asset.path
+        encoding = None
+        if get_file_serve_mode() == FILE_SERVE_MODE_DIRECT:
+            encoding = _negotiate_encoding(asset.disk_variants)
+            if encoding:
+                filename = asset.disk_variants[encoding]
+        response = send_file_response(current_app.static_folder, filename, "static")
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+            response.mimetype = asset.mimetype
+        response.headers["Cache-Control"] = asset.cache_control
+        response.vary.add("Accept-Encoding")
+        return response
+
+    encoding = _negotiate_encoding(asset.variants)
+    body = asset.variants[encoding] if encoding else asset.body
+    response = current_app.response_class(body, mimetype=asset.mimetype)
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    response.set_etag(f"{asset.etag}-{encoding}" if encoding else asset.etag)
+    response.headers["Cache-Control"] = asset.cache_control
+    response.vary.add("Accept-Encoding")
+    return response.make_conditional(request)
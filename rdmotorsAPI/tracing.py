@@ -0,0 +1,343 @@
+"""Lightweight request tracing with W3C ``traceparent`` propagation.
+
+With ``TRACING_ENABLED`` every request gets a root span. The trace ID comes
+from an incoming ``traceparent`` header (so nginx, a load balancer or the
+browser SDK can start the trace), or a new one is created. The response
+carries ``traceresponse: 00-<trace-id>-<span-id>-<flags>``, and log records
+get a ``trace_id`` attribute. Child spans are created with ``span(name)``
+around auth, Firebase calls and photo file I/O; every SQL statement gets a
+``db.query`` span from engine events.
+
+Finished spans are exported as JSON lines (``TRACING_EXPORTER=file``, written
+by a background thread to ``TRACING_FILE``) or kept in memory
+(``TRACING_EXPORTER=memory``, for tests). A slow request is followed end to end
+by grepping its trace ID in the proxy access log, the span files of all workers
+and the application log.
+
+``TRACING_SAMPLE_RATE`` applies to traces started here; for incoming
+``traceparent`` headers the caller's sampled flag is respected. Unsampled
+requests still propagate IDs but create no child spans.
+"""
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import json
+import logging
+import os
+import queue
+import random
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from flask import g, request
+
+from rdmotorsAPI.sql_events import StatementObserver, add_statement_observer
+
+MAX_STATEMENT_LENGTH = 2000
+_TRACEPARENT = re.compile(r"([0-9a-f]{2})-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})")
+_NULL_SPAN = contextlib.nullcontext()
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("rdmotors_span", default=None)
+
+
+def _new_id(bits: int) -> str:
+    return f"{random.getrandbits(bits) or 1:0{bits // 4}x}"
+
+
+def parse_traceparent(header: Optional[str]):
+    """Return (trace_id, parent_span_id, sampled) from a traceparent header, or None when invalid."""
+    match = _TRACEPARENT.fullmatch((header or "").strip().lower())
+    if match is None:
+        return None
+    version, trace_id, span_id, flags = match.groups()
+    if version == "ff" or trace_id == "0" * 32 or span_id == "0" * 16:
+        return None
+    return trace_id, span_id, bool(int(flags, 16) & 1)
+
+
+class Span:
+    """One timed operation of a trace."""
+
+    __slots__ = ("tracer", "trace_id", "span_id", "parent_id", "name", "attributes", "sampled",
+                 "start_time", "end_time", "status", "_started")
+
+    def __init__(self, tracer: "Tracer", trace_id: str, parent_id: Optional[str], name: str,
+                 sampled: bool = True, attributes: Optional[Dict[str, Any]] = None):
+        self.tracer = tracer
+        self.trace_id = trace_id
+        self.span_id = _new_id(64)
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = dict(attributes or {})
+        self.sampled = sampled
+        self.start_time = time.time_ns()
+        self.end_time: Optional[int] = None
+        self.status = "ok"
+        self._started = time.perf_counter_ns()
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def child(self, name: str, **attributes) -> "Span":
+        return Span(self.tracer, self.trace_id, self.span_id, name, self.sampled, attributes)
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def record_error(self, error: BaseException) -> None:
+        self.status = "error"
+        self.attributes["error.type"] = type(error).__name__
+        self.attributes["error.message"] = str(error)[:500]
+
+    def end(self, duration: Optional[float] = None) -> None:
+        """Finish the span; duration (seconds) is given when the caller already measured it."""
+        if self.end_time is not None:
+            return
+        if duration is None:
+            self.end_time = self.start_time + time.perf_counter_ns() - self._started
+        else:
+            self.end_time = self.start_time + int(duration * 1e9)
+        if self.sampled:
+            self.tracer.export(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_id,
+            "name": self.name,
+            "start_time_unix_nano": self.start_time,
+            "end_time_unix_nano": self.end_time,
+            "duration_ms": round(((self.end_time or self.start_time) - self.start_time) / 1e6, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+            "service": self.tracer.service_name,
+            "pid": os.getpid(),
+        }
+
+
+class InMemorySpanExporter:
+    """Keeps finished spans in a list (tests)."""
+
+    def __init__(self):
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.spans.clear()
+
+    def flush(self) -> None:
+        pass
+
+
+class FileSpanExporter:
+    """
+    Appends spans as JSON lines from a background thread.
+
+    ``{pid}`` in the path is replaced by the process ID, so gunicorn workers
+    write separate files. Spans are dropped (and counted) when the queue is full.
+    """
+
+    def __init__(self, path: str, queue_size: int = 10000):
+        self.path = path
+        self.queue_size = queue_size
+        self.dropped = 0
+        self._queue: Optional[queue.Queue] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _ensure_writer(self) -> queue.Queue:
+        # Started lazily and again after fork: the writer thread does not survive it
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._queue = queue.Queue(self.queue_size)
+                    threading.Thread(target=self._write, args=(self._queue,), name="rdmotors-span-writer",
+                                     daemon=True).start()
+                    self._pid = os.getpid()
+        return self._queue
+
+    def _write(self, spans: queue.Queue) -> None:
+        path = self.path.replace("{pid}", str(os.getpid()))
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            while True:
+                span = spans.get()
+                try:
+                    if span is not None:
+                        f.write(json.dumps(span.to_dict(), default=str) + "\n")
+                    if span is None or spans.empty():
+                        f.flush()
+                except (OSError, ValueError) as e:
+                    logging.error("Failed to write span to %s: %s", path, e)
+                finally:
+                    spans.task_done()
+
+    def export(self, span: Span) -> None:
+        try:
+            self._ensure_writer().put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self) -> None:
+        """Wait until queued spans are written."""
+        if self._pid == os.getpid():
+            self._queue.put(None)
+            self._queue.join()
+
+
+class Tracer:
+    """Creates request spans and hands finished spans to the exporter."""
+
+    def __init__(self, exporter, sample_rate: float = 1.0, service_name: str = "rdmotorsAPI"):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self.service_name = service_name
+
+    def start_request_span(self, name: str, traceparent: Optional[str] = None, **attributes) -> Span:
+        parent = parse_traceparent(traceparent)
+        if parent is not None:
+            trace_id, parent_id, sampled = parent
+        else:
+            trace_id, parent_id = _new_id(128), None
+            sampled = self.sample_rate >= 1 or random.random() < self.sample_rate
+        return Span(self, trace_id, parent_id, name, sampled, attributes)
+
+    def export(self, span: Span) -> None:
+        self.exporter.export(span)
+
+
+def current_span() -> Optional[Span]:
+    """Innermost open span of the current request, or None."""
+    return _current_span.get()
+
+
+def current_trace_id() -> Optional[str]:
+    active = _current_span.get()
+    return active.trace_id if active is not None else None
+
+
+@contextlib.contextmanager
+def _child_span(parent: Span, name: str, attributes: Dict[str, Any]):
+    child = parent.child(name, **attributes)
+    token = _current_span.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.record_error(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        child.end()
+
+
+def span(name: str, **attributes):
+    """Context manager recording a child span of the current span (no-op when not tracing)."""
+    parent = _current_span.get()
+    if parent is None or not parent.sampled:
+        return _NULL_SPAN
+    return _child_span(parent, name, attributes)
+
+
+class _QuerySpans(StatementObserver):
+    """A ``db.query`` child span of the current span for every statement."""
+
+    def start(self, statement, parameters, executemany):
+        parent = _current_span.get()
+        if parent is None or not parent.sampled:
+            return None
+        return parent.child(
+            "db.query", **{"db.statement": statement[:MAX_STATEMENT_LENGTH], "db.executemany": executemany},
+        )
+
+    def finish(self, query_span, statement, parameters, duration, cursor):
+        if query_span is None:
+            return
+        if cursor.rowcount is not None and cursor.rowcount >= 0:
+            query_span.set_attribute("db.rowcount", cursor.rowcount)
+        query_span.end(duration)
+
+    def fail(self, query_span, statement, parameters, duration, error):
+        if query_span is not None:
+            query_span.record_error(error)
+            query_span.end(duration)
+
+
+_QUERY_SPANS = _QuerySpans()
+
+
+def _create_exporter(app):
+    kind = (app.config.get("TRACING_EXPORTER") or "file").strip().lower()
+    if kind == "memory":
+        return InMemorySpanExporter()
+    if kind == "file":
+        return FileSpanExporter(app.config["TRACING_FILE"])
+    raise RuntimeError(f"Unsupported TRACING_EXPORTER '{kind}'. Use one of: file, memory")
+
+
+def get_tracer(app) -> Optional[Tracer]:
+    return app.extensions.get("tracer")
+
+
+def init_tracing(app) -> None:
+    """Install request spans and SQL statement spans when TRACING_ENABLED is set."""
+    if not app.config.get("TRACING_ENABLED", False):
+        return
+
+    from rdmotorsAPI import db
+
+    tracer = Tracer(
+        _create_exporter(app),
+        sample_rate=app.config.get("TRACING_SAMPLE_RATE", 1.0),
+        service_name=app.config.get("TRACING_SERVICE_NAME", "rdmotorsAPI"),
+    )
+    app.extensions["tracer"] = tracer
+    with app.app_context():
+        engine = db.engine
+    add_statement_observer(engine, _QUERY_SPANS)
+
+    @app.before_request
+    def start_request_span():
+        root = tracer.start_request_span(
+            f"{request.method} {request.url_rule.rule if request.url_rule else request.path}",
+            request.headers.get("traceparent"),
+            **{
+                "http.method": request.method,
+                "http.target": request.full_path.rstrip("?"),
+                "http.endpoint": request.endpoint,
+                "request_id": g.get("request_id"),
+            },
+        )
+        g.trace_span = root
+        _current_span.set(root)
+
+    @app.after_request
+    def add_traceresponse(response):
+        root = g.get("trace_span")
+        if root is not None:
+            root.set_attribute("http.status_code", response.status_code)
+            if response.status_code >= 500:
+                root.status = "error"
+            response.headers["traceresponse"] = root.traceparent
+        return response
+
+    @app.teardown_request
+    def end_request_span(exc=None):
+        root = g.pop("trace_span", None)
+        if root is None:
+            return
+        if exc is not None:
+            root.record_error(exc)
+        _current_span.set(None)
+        root.end()
+
@@ -3,6 +3,7 @@ from flask import current_app, has_app_context, request
 from datetime import datetime
 import bleach
 from rdmotorsAPI.config import BASE_URL
+from rdmotorsAPI.static_manifest import send_static_asset
 
 
 def get_base_url():
@@ -31,8 +32,11 @@ def should_serve_spa():
 
 
 def serve_spa_index():
-    """Serve SPA entrypoint from the configured static folder."""
-    return current_app.send_static_file("index.html")
+    """Serve SPA entrypoint from the in-memory static manifest."""
+    response = send_static_asset("index.html")
+    if response is None:
+        return current_app.send_static_file("index.html")
+    return response
 
 
 def get_photo_url(filename):
@@ -1,9 +1,11 @@
 """Pytest configuration and fixtures"""
+import contextlib
 import os
 import shutil
 import pytest
 from rdmotorsAPI import create_app, db
 from rdmotorsAPI.config import Config
+from rdmotorsAPI.query_profiler import install_query_profiler, record_queries
 from rdmotorsAPI.models import Service, Location, AutoUsa, Client, Car, AutoUsaHistory
 
 
@@ -31,6 +33,10 @@ class TestConfig(Config):
         "static",
     )
     STATIC_FOLDER = STATIC_DIR
+    STATIC_MANIFEST_CHECK_INTERVAL = 0
+    PHOTO_DERIVATIVE_WORKERS = 0
+    PHOTO_JOB_RUNNER = "inline"
+    RATELIMIT_STORAGE_URI = "memory://"
 
 
 @pytest.fixture
@@ -110,6 +116,25 @@ def sample_location(app):
         return location
 
 
+@pytest.fixture
+def query_budget(app):
+    """
+    Assert SQL statements of a block stay within a budget.
+
+    Usage: ``with query_budget(3, max_repeats=1): client.get(...)``
+    """
+    install_query_profiler(app)
+
+    @contextlib.contextmanager
+    def budget(max_queries, max_repeats=None):
+        db.session.remove()  # a fresh session, like a real request: fixture rows must not hide lazy loads
+        with record_queries() as recorder:
+            yield recorder
+        recorder.check_budget(max_queries, max_repeats)
+
+    return budget
+
+
 @pytest.fixture
 def sample_autousa(app, sample_location):
     """Create a sample AutoUSA for testing"""
@@ -1,4 +1,6 @@
 """Tests for AutoUSA endpoints"""
+import os
+
 import pytest
 
 
@@ -70,3 +72,43 @@ class TestAutoUSAHistory:
         assert response.status_code == 200
         data = response.get_json()
         assert isinstance(data, list)
+
+
+class TestAutoUSAPhotoServing:
+    """Test AutoUSA photo file delivery"""
+
+    def _write_photo(self, app, vin, name="1.jpg", data=b"jpeg-bytes"):
+        vin_folder = os.path.join(app.config["PHOTOS_AUTO_DIR"], vin)
+        os.makedirs(vin_folder, exist_ok=True)
+        with open(os.path.join(vin_folder, name), "wb") as f:
+            f.write(data)
+
+    def test_serve_photo_direct(self, client, app):
+        """Test photo bytes are streamed in direct mode"""
+        self._write_photo(app, "1HGBH41JXMN109186")
+        response = client.get('/photos/autousa/1HGBH41JXMN109186/1.jpg')
+        assert response.status_code == 200
+        assert response.data == b"jpeg-bytes"
+        assert "X-Accel-Redirect" not in response.headers
+
+    def test_serve_photo_x_accel_redirect(self, client, app):
+        """Test photo delivery is offloaded to the proxy"""
+        self._write_photo(app, "1HGBH41JXMN109186")
+        app.config["FILE_SERVE_MODE"] = "x-accel-redirect"
+        response = client.get('/photos/autousa/1HGBH41JXMN109186/1.jpg')
+        assert response.status_code == 200
+        assert response.data == b""
+        assert response.headers["X-Accel-Redirect"] == "/_protected/photos/autousa/1HGBH41JXMN109186/1.jpg"
+        assert response.mimetype == "image/jpeg"
+
+    def test_serve_photo_x_accel_missing_file(self, client, app):
+        """Test missing photo is not offloaded"""
+        app.config["FILE_SERVE_MODE"] = "x-accel-redirect"
+        response = client.get('/photos/autousa/1HGBH41JXMN109186/missing.jpg')
+        assert response.status_code == 404
+
+    def test_serve_photo_rejects_other_files(self, client, app):
+        """Test non-image files are not served"""
+        self._write_photo(app, "1HGBH41JXMN109186", name="notes.txt")
+        response = client.get('/photos/autousa/1HGBH41JXMN109186/notes.txt')
+        assert response.status_code == 404
@@ -0,0 +1,78 @@
+"""Tests for the endpoint benchmark suite"""
+import pytest
+
+from benchmarks.__main__ import main
+from benchmarks.cases import all_cases, select_cases
+from benchmarks.harness import (
+    AUTH,
+    GALLERIES,
+    compare_results,
+    create_benchmark_app,
+    load_results,
+    run_suite,
+    save_results,
+    seed_database,
+)
+from rdmotorsAPI.datagen import SCALES as DATA_SCALES
+
+
+@pytest.fixture(scope="module")
+def seeded(tmp_path_factory):
+    app = create_benchmark_app(str(tmp_path_factory.mktemp("bench")))
+    return app, seed_database(app, "tiny")
+
+
+def results_with(**p50):
+    return {"meta": {}, "results": {name: {"p50_ms": value} for name, value in p50.items()}}
+
+
+class TestSuite:
+    """Test the seeded app and the timed cases"""
+
+    def test_seeding(self, seeded):
+        app, data = seeded
+        assert data.autos_total == DATA_SCALES["tiny"].autos
+        assert len(data.vins) == len(data.auto_ids) == DATA_SCALES["tiny"].autos
+        client = app.test_client()
+        assert client.get(f"/autousa/vin/{data.vins[0]}/history", headers=AUTH).status_code == 200
+        photos = client.get(f"/autousa/{data.gallery_vins[0]}/photos").get_json()
+        assert len(photos["files"]) == GALLERIES["tiny"][1]
+
+    def test_every_case_runs_without_errors(self, seeded):
+        app, data = seeded
+        results = run_suite(app, all_cases(), data, iterations=3, warmup=1, scale="tiny")
+        assert set(results["results"]) == {case.name for case in all_cases()}
+        for name, result in results["results"].items():
+            assert result["errors"] == [], name
+            assert 0 < result["p50_ms"] <= result["p95_ms"] <= result["max_ms"]
+            assert result["throughput_rps"] > 0
+        assert results["meta"]["scale"] == "tiny"
+
+    def test_select_cases(self):
+        names = [case.name for case in select_cases(["autousa.photos", "clients.list"])]
+        assert names == ["autousa.photos", "autousa.photos_batch", "clients.list"]
+
+
+class TestCompare:
+    """Test regression detection between results files"""
+
+    def test_flags_regressions_beyond_threshold(self):
+        baseline = results_with(slow=10.0, fast=10.0, same=10.0, noise=0.2, gone=1.0)
+        current = results_with(slow=13.0, fast=5.0, same=11.0, noise=0.4, added=1.0)
+        rows = {row["case"]: row for row in compare_results(baseline, current, threshold=0.2)}
+        assert rows["slow"]["status"] == "regression"
+        assert rows["slow"]["change"] == pytest.approx(0.3)
+        assert rows["fast"]["status"] == "improvement"
+        assert rows["same"]["status"] == "ok"
+        assert rows["noise"]["status"] == "ok"
+        assert rows["gone"]["status"] == "missing"
+        assert rows["added"]["status"] == "new"
+
+    def test_cli_exit_status(self, tmp_path, capsys):
+        save_results(results_with(case=10.0), str(tmp_path / "base.json"))
+        save_results(results_with(case=15.0), str(tmp_path / "current.json"))
+        assert load_results(str(tmp_path / "base.json"))["results"]["case"]["p50_ms"] == 10.0
+        assert main(["compare", str(tmp_path / "base.json"), str(tmp_path / "current.json")]) == 1
+        assert "regression" in capsys.readouterr().out
+        assert main(["compare", str(tmp_path / "base.json"), str(tmp_path / "current.json"),
+                     "--threshold", "0.6"]) == 0
@@ -0,0 +1,57 @@
+"""Tests for response compression"""
+import gzip
+
+from rdmotorsAPI.models import Location, db
+
+
+def _add_locations(count):
+    for i in range(count):
+        db.session.add(Location(country="USA", description=f"Port of Savannah terminal {i}"))
+    db.session.commit()
+
+
+class TestResponseCompression:
+    """Test negotiated compression in the after_request chain"""
+
+    def test_large_json_is_gzipped(self, client, app):
+        """Test JSON above the threshold is compressed when accepted"""
+        _add_locations(100)
+        response = client.get('/locations', headers={'Accept-Encoding': 'gzip'})
+        assert response.status_code == 200
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in response.headers['Vary']
+        plain = client.get('/locations').data
+        assert gzip.decompress(response.data) == plain
+        assert len(response.data) < len(plain)
+
+    def test_small_json_is_not_compressed(self, client, app):
+        """Test bodies under the threshold are sent as-is"""
+        _add_locations(1)
+        response = client.get('/locations', headers={'Accept-Encoding': 'gzip'})
+        assert 'Content-Encoding' not in response.headers
+
+    def test_not_compressed_without_accept_encoding(self, client, app):
+        """Test identity response when the client does not accept compression"""
+        _add_locations(100)
+        response = client.get('/locations', headers={'Accept-Encoding': 'identity'})
+        assert 'Content-Encoding' not in response.headers
+
+    def test_identical_bodies_reuse_compressed_bytes(self, client, app):
+        """Test compressed bytes are reused for identical bodies"""
+        _add_locations(100)
+        cache = app.extensions['compression_cache']
+        client.get('/locations', headers={'Accept-Encoding': 'gzip'})
+        hits = cache.hits
+        client.get('/locations', headers={'Accept-Encoding': 'gzip'})
+        assert cache.hits == hits + 1
+
+    def test_streamed_response_is_compressed(self, app):
+        """Test streaming mode compresses chunk by chunk"""
+        @app.route('/_test/export')
+        def export():
+            return app.response_class((f"row,{i}\n" for i in range(1000)), mimetype='text/csv')
+
+        response = app.test_client().get('/_test/export', headers={'Accept-Encoding': 'gzip'})
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert 'Content-Length' not in response.headers
+        assert gzip.decompress(response.data).startswith(b"row,0\n")
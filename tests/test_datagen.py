@@ -0,0 +1,118 @@
+"""Tests for the synthetic data generator"""
+import os
+
+import pytest
+
+from rdmotorsAPI import db
+from rdmotorsAPI.datagen import (
+    SCALES,
+    DataScale,
+    container_check_digit,
+    generate_data,
+    generate_photo_folders,
+    generated_vins,
+    make_vin,
+    vin_check_digit,
+)
+from rdmotorsAPI.models import AutoUsa, AutoUsaHistory, Car, Client, Location, Service
+from rdmotorsAPI.photos.service import get_blob_store, get_photo_storage, resolve_vin_folder
+
+SCALE = DataScale(locations=12, autos=120, max_hops=4, cars=15, services=5, clients=25)
+
+
+def table_rows(model):
+    return [row.to_dict() for row in model.query.order_by(*model.__table__.primary_key.columns)]
+
+
+class TestIdentifiers:
+    """Test VIN and container number generation"""
+
+    def test_vin_check_digit(self):
+        assert vin_check_digit("1M8GDM9AXKP042788") == "X"
+        assert vin_check_digit("11111111111111111") == "1"
+
+    def test_vins_are_valid_and_unique(self):
+        vins = [make_vin(index, seed=7) for index in range(50_000)]
+        assert len(set(vins)) == len(vins)
+        for vin in vins[:1000]:
+            assert len(vin) == 17
+            assert not set(vin) & set("IOQ")
+            assert vin[8] == vin_check_digit(vin)
+        assert make_vin(3, seed=7) == vins[3]
+        assert make_vin(3, seed=8) != vins[3]
+
+    def test_container_check_digit(self):
+        assert container_check_digit("CSQU305438") == "3"
+        assert container_check_digit("MSKU907032") == "3"
+
+
+class TestGenerateData:
+    """Test bulk generation of the tables"""
+
+    def test_counts_and_relations(self, app):
+        report = generate_data(SCALE, seed=1, batch_size=50)
+        assert report.rows["locations"] == Location.query.count() == 12
+        assert report.rows["autousa"] == AutoUsa.query.count() == 120
+        assert report.rows["cars"] == Car.query.count() == 15
+        assert report.rows["services"] == Service.query.count() == 5
+        assert report.rows["clients"] == Client.query.count() == 25
+        assert report.rows["autousa_history"] == AutoUsaHistory.query.count() > 0
+        assert report.id_ranges["autousa"] == (1, 120)
+
+        for auto in AutoUsa.query.all():
+            assert auto.vin[8] == vin_check_digit(auto.vin)
+            assert len(auto.history) <= SCALE.max_hops
+            dates = []
+            for hop in sorted(auto.history, key=lambda hop: hop.arrival_date):
+                assert hop.arrival_date < hop.departure_date
+                dates += [hop.arrival_date, hop.departure_date]
+            dates.append(auto.arrival_date)
+            assert dates == sorted(dates)
+            assert (auto.container_number is not None) == bool(auto.history)
+
+    def test_deterministic_from_seed(self, app):
+        generate_data(SCALE, seed=5, batch_size=40)
+        first = [table_rows(model) for model in (Location, AutoUsa, Car, Service, Client)]
+        db.drop_all()
+        db.create_all()
+        generate_data(SCALE, seed=5, batch_size=40)
+        assert [table_rows(model) for model in (Location, AutoUsa, Car, Service, Client)] == first
+
+    def test_second_run_appends(self, app):
+        generate_data(SCALE, seed=5)
+        report = generate_data(SCALE, seed=5)
+        assert report.id_ranges["autousa"] == (121, 240)
+        assert AutoUsa.query.count() == 240
+        assert Client.query.count() == 50
+
+    def test_new_rows_after_generation_get_fresh_ids(self, app):
+        generate_data(SCALE, seed=5)
+        db.session.add(Location(country="USA", description="New yard"))
+        db.session.commit()
+        assert Location.query.filter_by(description="New yard").one().location_id == 13
+
+    def test_scales(self):
+        assert SCALES["large"].autos >= 1_000_000
+
+
+class TestPhotoFolders:
+    """Test generated photo galleries"""
+
+    def test_galleries_are_served(self, app, client):
+        report = generate_data(SCALE, seed=3)
+        vins = generated_vins(report, limit=4)
+        assert len(vins) == 4
+        assert generate_photo_folders(vins, photos_per_gallery=5, seed=3, pool_size=3) == (4, 20)
+
+        photos = client.get(f'/autousa/{vins[0]}/photos').get_json()
+        assert [url.rsplit("/", 1)[1] for url in photos["photos"]] == ["01.png", "02.png", "03.png", "04.png", "05.png"]
+        response = client.get(f'/photos/autousa/{vins[0]}/01.png')
+        assert response.status_code == 200
+        assert response.data.startswith(b"\x89PNG")
+        response.close()
+
+        # Galleries share the blobs of the image pool
+        hashes = {photo["sha256"] for vin in vins for photo in get_photo_storage().load_manifest(vin)["photos"]}
+        assert len(hashes) <= 3
+        assert sum(get_blob_store().refcount(sha256) for sha256 in hashes) == 20
+        assert os.path.isdir(resolve_vin_folder(vins[0]))
@@ -0,0 +1,139 @@
+"""Tests for the queued JSON logging pipeline and request IDs"""
+import json
+import logging
+import os
+import queue
+
+import pytest
+
+from rdmotorsAPI import logging_pipeline
+from rdmotorsAPI.logging_pipeline import (
+    DroppingQueueHandler,
+    InfoSamplingFilter,
+    configure_logging,
+)
+
+
+@pytest.fixture
+def restore_root_logger():
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    yield
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    for handler in handlers:
+        root.addHandler(handler)
+    root.setLevel(level)
+
+
+def read_json_lines(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+class TestRequestIds:
+    """Test request ID assignment"""
+
+    def test_generated_and_echoed(self, client):
+        first = client.get('/locations').headers['X-Request-ID']
+        second = client.get('/locations').headers['X-Request-ID']
+        assert first and second and first != second
+
+    def test_incoming_id_is_kept_when_valid(self, client):
+        response = client.get('/locations', headers={'X-Request-ID': 'lb-1234.abc'})
+        assert response.headers['X-Request-ID'] == 'lb-1234.abc'
+
+        response = client.get('/locations', headers={'X-Request-ID': 'bad id with spaces'})
+        assert response.headers['X-Request-ID'] != 'bad id with spaces'
+
+
+class TestLoggingPipeline:
+    """Test the queue handler, JSON records, rotation and sampling"""
+
+    def test_json_records_with_request_id(self, app, tmp_path, restore_root_logger):
+        log_file = str(tmp_path / "api.log")
+        listener = configure_logging(log_file, log_format="json")
+        with app.test_request_context('/', headers={'X-Request-ID': 'req-42'}):
+            app.preprocess_request()
+            logging.info("Auto created: %s", 7, extra={"vin": "1HGCM82633A004352"})
+            try:
+                raise ValueError("boom")
+            except ValueError:
+                logging.error("Failed", exc_info=True)
+        logging.warning("Outside a request")
+        listener.stop()
+
+        created, failed, outside = read_json_lines(log_file)
+        assert created["message"] == "Auto created: 7"
+        assert created["level"] == "INFO"
+        assert created["request_id"] == "req-42"
+        assert created["vin"] == "1HGCM82633A004352"
+        assert "ValueError: boom" in failed["exception"]
+        assert outside["request_id"] == "-"
+
+    def test_rotation(self, tmp_path, restore_root_logger):
+        log_file = str(tmp_path / "api.log")
+        listener = configure_logging(log_file, max_bytes=1000, backup_count=2)
+        for i in range(50):
+            logging.warning("Line %d %s", i, "x" * 50)
+        listener.stop()
+        assert os.path.exists(log_file + ".1")
+        assert os.path.exists(log_file + ".2")
+        assert not os.path.exists(log_file + ".3")
+
+    def test_external_rotation_is_followed(self, tmp_path, restore_root_logger):
+        log_file = str(tmp_path / "api.log")
+        listener = configure_logging(log_file)
+        logging.warning("Before rotation")
+        listener.stop()
+        os.rename(log_file, log_file + ".1")
+
+        listener = configure_logging(log_file)
+        file_handler = listener.handlers[1]
+        assert isinstance(file_handler, logging.handlers.WatchedFileHandler)
+        os.rename(log_file, log_file + ".2")
+        logging.warning("After rotation")
+        listener.stop()
+
+        assert [line["message"] for line in read_json_lines(log_file)] == ["After rotation"]
+        assert [line["message"] for line in read_json_lines(log_file + ".1")] == ["Before rotation"]
+
+    def test_pid_file_is_reopened_in_forked_worker(self, tmp_path, restore_root_logger, monkeypatch):
+        log_file = str(tmp_path / "api-{pid}.log")
+        listener = configure_logging(log_file, max_bytes=1000)
+        master_path = str(tmp_path / f"api-{os.getpid()}.log")
+        assert listener.handlers[1].baseFilename == master_path
+
+        monkeypatch.setattr(os, "getpid", lambda: 4242)
+        listener.stop()  # the writer thread does not survive fork
+        logging_pipeline._restart_after_fork()
+        worker_handler = listener.handlers[1]
+        assert isinstance(worker_handler, logging.handlers.RotatingFileHandler)
+        assert worker_handler.baseFilename == str(tmp_path / "api-4242.log")
+        logging.warning("From the worker")
+        listener.stop()
+
+        assert [line["message"] for line in read_json_lines(str(tmp_path / "api-4242.log"))] == ["From the worker"]
+        assert read_json_lines(master_path) == []
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        handler = DroppingQueueHandler(queue.Queue(2))
+        for i in range(5):
+            handler.handle(logging.makeLogRecord({"msg": "record %d", "args": (i,)}))
+        assert handler.queue.qsize() == 2
+        assert handler.dropped == 3
+        assert handler.queue.get_nowait().msg == "record 0"
+
+    def test_info_sampling_is_per_request(self):
+        sampling = InfoSamplingFilter(0.5)
+
+        def keep(level, request_id):
+            return sampling.filter(logging.makeLogRecord({"levelno": level, "request_id": request_id}))
+
+        request_ids = [f"request-{i}" for i in range(200)]
+        kept = [request_id for request_id in request_ids if keep(logging.INFO, request_id)]
+        assert 50 < len(kept) < 150
+        assert all(keep(logging.INFO, request_id) for request_id in kept)
+        assert all(keep(logging.WARNING, request_id) for request_id in request_ids)
+        assert not any(InfoSamplingFilter(0.0).filter(logging.makeLogRecord({"levelno": logging.INFO}))
+                       for _ in range(20))
@@ -0,0 +1,55 @@
+"""Tests for the shared SQLite rate limiter storage"""
+import sqlite3
+
+from limits import parse
+from limits.storage import storage_from_string
+from limits.strategies import FixedWindowRateLimiter, SlidingWindowCounterRateLimiter
+
+from rdmotorsAPI import create_app, limiter
+from rdmotorsAPI.ratelimit import SQLiteStorage
+from tests.conftest import TestConfig
+
+
+class TestSQLiteStorage:
+    """Test limiter counters kept in a SQLite database"""
+
+    def test_counters_are_shared_between_workers(self, tmp_path):
+        uri = f"sqlite://{tmp_path / 'ratelimit.db'}"
+        # Two storages on one file stand for two worker processes
+        first = FixedWindowRateLimiter(storage_from_string(uri))
+        second = FixedWindowRateLimiter(storage_from_string(uri))
+        item = parse("4/minute")
+
+        hits = [worker.hit(item, "1.2.3.4") for worker in (first, second) * 3]
+        assert hits == [True, True, True, True, False, False]
+        assert second.get_window_stats(item, "1.2.3.4").remaining == 0
+        assert first.hit(item, "5.6.7.8")
+
+    def test_expired_window_restarts(self, tmp_path):
+        storage = SQLiteStorage(f"sqlite://{tmp_path / 'ratelimit.db'}")
+        assert storage.incr("key", expiry=-1) == 1
+        assert storage.get("key") == 0
+        assert storage.incr("key", expiry=60, amount=2) == 2
+        assert storage.incr("key", expiry=60) == 3
+        storage.clear("key")
+        assert storage.get("key") == 0
+
+    def test_sliding_window_counter(self, tmp_path):
+        sliding = SlidingWindowCounterRateLimiter(SQLiteStorage(f"sqlite://{tmp_path / 'ratelimit.db'}"))
+        item = parse("3/minute")
+        assert [sliding.hit(item, "key") for _ in range(4)] == [True, True, True, False]
+
+    def test_app_uses_configured_storage(self, tmp_path):
+        class SQLiteLimiterConfig(TestConfig):
+            RATELIMIT_STORAGE_URI = f"sqlite://{tmp_path / 'ratelimit.db'}"
+
+        create_app(SQLiteLimiterConfig)
+        assert isinstance(limiter.storage, SQLiteStorage)
+
+    def test_storage_errors_do_not_fail_requests(self, app, client, monkeypatch):
+        def broken(*args, **kwargs):
+            raise sqlite3.OperationalError("database is locked")
+
+        monkeypatch.setattr(limiter.limiter.storage, "incr", broken)
+        assert app.config["RATELIMIT_SWALLOW_ERRORS"]
+        assert client.get("/services").status_code == 200
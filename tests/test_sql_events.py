@@ -0,0 +1,52 @@
+"""Tests for the shared SQL statement listener"""
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from rdmotorsAPI.sql_events import CONN_INFO_KEY, StatementObserver, add_statement_observer
+
+
+class RecordingObserver(StatementObserver):
+    def __init__(self, name):
+        self.name = name
+        self.events = []
+
+    def start(self, statement, parameters, executemany):
+        return self.name
+
+    def finish(self, token, statement, parameters, duration, cursor):
+        self.events.append(("finish", token, statement, duration))
+
+    def fail(self, token, statement, parameters, duration, error):
+        self.events.append(("fail", token, statement, type(error).__name__))
+
+
+class TestStatementObservers:
+    """Test statements are timed once and fanned out to every observer"""
+
+    def test_observers_share_one_duration(self):
+        engine = create_engine("sqlite://")
+        first, second = RecordingObserver("first"), RecordingObserver("second")
+        add_statement_observer(engine, first)
+        add_statement_observer(engine, second)
+        add_statement_observer(engine, first)
+
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+
+        assert len(first.events) == len(second.events) == 1
+        assert first.events[0][:3] == ("finish", "first", "SELECT 1")
+        assert first.events[0][3] == second.events[0][3] > 0
+
+    def test_failed_statement_is_released(self):
+        engine = create_engine("sqlite://")
+        observer = RecordingObserver("observer")
+        add_statement_observer(engine, observer)
+
+        with engine.connect() as connection:
+            for _ in range(3):
+                with pytest.raises(OperationalError):
+                    connection.execute(text("SELECT * FROM missing_table"))
+            assert connection.info[CONN_INFO_KEY] == []
+
+        assert observer.events == [("fail", "observer", "SELECT * FROM missing_table", "OperationalError")] * 3
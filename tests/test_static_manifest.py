@@ -0,0 +1,70 @@
+"""Tests for the SPA static manifest"""
+import gzip
+import os
+
+from rdmotorsAPI.static_manifest import get_static_manifest, send_static_asset
+
+
+def _write_static(app, rel_path, data):
+    full_path = os.path.join(app.static_folder, rel_path)
+    os.makedirs(os.path.dirname(full_path), exist_ok=True)
+    with open(full_path, "wb") as f:
+        f.write(data)
+
+
+class TestStaticManifest:
+    """Test manifest building and asset responses"""
+
+    def test_hashed_asset_gets_gzip_and_immutable_cache(self, app):
+        """Test hashed assets are served precompressed with long cache lifetime"""
+        body = b"console.log('rd motors');\n" * 100
+        _write_static(app, "assets/index-BfA3x9_Q.js", body)
+        with app.test_request_context(headers={"Accept-Encoding": "gzip"}):
+            response = send_static_asset("assets/index-BfA3x9_Q.js")
+            assert response.headers["Content-Encoding"] == "gzip"
+            assert "immutable" in response.headers["Cache-Control"]
+            assert "Accept-Encoding" in response.headers["Vary"]
+            assert gzip.decompress(response.get_data()) == body
+
+    def test_identity_when_encoding_not_accepted(self, app):
+        """Test uncompressed body is served when client does not accept gzip/br"""
+        body = b"body { color: red; }\n" * 100
+        _write_static(app, "assets/style.css", body)
+        with app.test_request_context(headers={"Accept-Encoding": "identity"}):
+            response = send_static_asset("assets/style.css")
+            assert "Content-Encoding" not in response.headers
+            assert response.get_data() == body
+            assert response.headers["Cache-Control"] == "public, max-age=3600"
+
+    def test_unknown_asset_returns_none(self, app):
+        """Test unknown paths are left to the SPA fallback"""
+        with app.test_request_context():
+            assert send_static_asset("missing.js") is None
+
+    def test_index_is_kept_in_memory_and_refreshed(self, app):
+        """Test index.html is served from memory and reloaded on change"""
+        with app.test_request_context():
+            asset = get_static_manifest().get("index.html")
+            assert asset.body is not None
+            assert asset.cache_control == "no-cache"
+
+        _write_static(app, "index.html", b"<html>new build</html>")
+        os.utime(app.static_folder, None)
+        with app.test_request_context():
+            response = send_static_asset("index.html")
+            assert response.get_data() == b"<html>new build</html>"
+
+    def test_file_overwritten_in_place_is_reloaded(self, app):
+        """Test a changed un-hashed asset is picked up although no directory changed"""
+        _write_static(app, "robots.txt", b"User-agent: *\n")
+        with app.test_request_context():
+            assert send_static_asset("robots.txt").get_data() == b"User-agent: *\n"
+
+        folder_stat = os.stat(app.static_folder)
+        robots = os.path.join(app.static_folder, "robots.txt")
+        with open(robots, "wb") as f:
+            f.write(b"User-agent: *\nDisallow: /admin\n")
+        os.utime(robots, ns=(folder_stat.st_atime_ns, folder_stat.st_mtime_ns + 10**9))
+        os.utime(app.static_folder, ns=(folder_stat.st_atime_ns, folder_stat.st_mtime_ns))
+        with app.test_request_context():
+            assert send_static_asset("robots.txt").get_data() == b"User-agent: *\nDisallow: /admin\n"